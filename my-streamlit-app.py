@@ -1,6 +1,33 @@
 import streamlit as st
 import pandas as pd
 import io
+import os
+
+from soumu_dates import format_date
+from soumu_schema import memory_report
+from soumu_load_cache import get_load_cache
+from soumu_export import DOWNLOAD_FORMATS
+from soumu_similar import DEFAULT_SIMILAR_INDEX_PATH
+
+# 並べ替えできる列
+SORT_COLUMNS = ["発表日", "部局", "内容", "対象期間"]
+
+# 1ページの表示件数
+PAGE_SIZES = [50, 100, 200, 500]
+
+# 類似の報道資料の表示件数
+SIMILAR_COUNT = 10
+
+# スクレイパーが保存した類似検索のインデックス（起動したディレクトリによらず、このファイルと同じディレクトリから探す）
+SIMILAR_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_SIMILAR_INDEX_PATH)
+
+def release_label(df, position):
+    """
+    選択肢に表示する報道資料の名前（発表日と内容）
+    """
+    date = df['発表日'].iloc[position]
+    content = df['内容'].iloc[position]
+    return f"{format_date(date)} {content}" if pd.notna(date) else str(content)
 
 st.title("📊 総務省報道資料分析アプリ")
 st.write("CSVファイルをアップロードして報道資料を分析できます")
@@ -9,15 +36,17 @@ st.write("CSVファイルをアップロードして報道資料を分析でき
 uploaded_file = st.file_uploader(
     "CSVファイルをアップロードしてください",
     type=['csv'],
-    help="総務省報道資料のCSVファイルをアップロードしてください"
+    help="総務省報道資料のCSVファイル（UTF-8 / Shift_JIS / CP932）をアップロードしてください"
 )
 
 if uploaded_file is not None:
     try:
-        # CSVファイルを読み込み
-        df = pd.read_csv(uploaded_file, encoding='utf-8')
+        # CSVファイルを読み込み（同じ内容のファイルは2回目以降キャッシュから。文字エンコーディングは自動判定）
+        corpus = get_load_cache().load(uploaded_file.getvalue(), uploaded_file.name)
+        df = corpus.df
         
         st.success("✅ CSVファイルが正常に読み込まれました！")
+        st.caption(f"文字エンコーディング: {corpus.encoding} / {memory_report(corpus.baseline_bytes, corpus.memory_bytes)}")
         
         # データの基本情報を表示
         st.subheader("📈 データ概要")
@@ -30,49 +59,94 @@ if uploaded_file is not None:
             st.metric("部局数", df['部局'].nunique())
         
         with col3:
-            st.metric("期間", f"{df['発表日'].min()} ～ {df['発表日'].max()}")
+            dates = df['発表日'].dropna()
+            st.metric("期間", f"{format_date(dates.min())} ～ {format_date(dates.max())}" if len(dates) else "-")
         
         # 検索機能
         st.subheader("🔍 検索機能")
-        search_term = st.text_input("キーワードで検索", placeholder="例: 電波法、放送、統計")
+        search_term = st.text_input(
+            "キーワードで検索",
+            placeholder="例: 電波法、放送 OR 統計",
+            help='空白区切りで全てを含む（AND）、OR で区切るといずれかを含む、"..." で空白を含む語句'
+        )
         
         if search_term:
-            # 内容と部局で検索
-            mask = (df['内容'].str.contains(search_term, case=False, na=False) | 
-                   df['部局'].str.contains(search_term, case=False, na=False))
-            filtered_df = df[mask]
-            st.write(f"検索結果: {len(filtered_df)}件")
-        else:
-            filtered_df = df
+            # 内容と部局で検索（n-gramインデックス。全角・半角、大文字・小文字は区別しない）
+            st.write(f"検索結果: {len(corpus.query(search_term))}件")
         
-        # データテーブル表示
+        # データテーブル表示（並べ替えとページ分割はサーバー側で行い、表示するページだけを送る）
         st.subheader("📋 報道資料一覧")
+        sort_col, order_col, size_col = st.columns(3)
+        with sort_col:
+            sort_by = st.selectbox("並べ替え", [col for col in SORT_COLUMNS if col in df.columns])
+        with order_col:
+            ascending = st.radio("順序", ["降順", "昇順"], horizontal=True) == "昇順"
+        with size_col:
+            page_size = st.selectbox("表示件数", PAGE_SIZES, index=1)
+        
+        positions = corpus.query(search_term, sort_by, ascending)
+        page_count = max(1, -(-len(positions) // page_size))
+        # 検索条件・並べ替えが変わったら1ページ目に戻す
+        page = st.number_input("ページ", min_value=1, max_value=page_count, value=1,
+                               key=f"page_{search_term}_{sort_by}_{ascending}_{page_size}")
+        st.caption(f"{page} / {page_count}ページ（{len(positions)}件）")
+        page_positions = positions[(page - 1) * page_size:page * page_size]
         st.dataframe(
-            filtered_df,
+            df.iloc[page_positions],
             use_container_width=True,
-            hide_index=True
+            hide_index=True,
+            column_config={"発表日": st.column_config.DateColumn("発表日", format="YYYY/MM/DD")}
         )
         
-        # 部局別集計
-        st.subheader("📊 部局別集計")
-        dept_counts = df['部局'].value_counts()
+        # 類似の報道資料（表示中のページの報道資料から選ぶ）
+        st.subheader("🔗 類似の報道資料")
+        if len(page_positions):
+            selected = st.selectbox(
+                "報道資料を選択",
+                page_positions.tolist(),
+                format_func=lambda position: release_label(df, position)
+            )
+            with st.spinner("類似検索インデックスを作成しています..."):
+                similar = corpus.similar_index(SIMILAR_INDEX_PATH).most_similar(selected, k=SIMILAR_COUNT)
+            if similar:
+                similar_df = df.iloc[[position for position, _ in similar]].copy()
+                similar_df.insert(0, "類似度", [round(score, 3) for _, score in similar])
+                st.dataframe(
+                    similar_df,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={"発表日": st.column_config.DateColumn("発表日", format="YYYY/MM/DD")}
+                )
+            else:
+                st.write("類似の報道資料は見つかりませんでした")
+        
+        # 部局別・日付別集計（集計済みの件数から作る。検索中は検索結果の件数）
+        dept_counts, daily_counts = corpus.chart_counts(search_term)
+        scope = "（検索結果）" if search_term else ""
+        st.subheader(f"📊 部局別集計{scope}")
         st.bar_chart(dept_counts)
         
-        # 日付別集計
-        st.subheader("📅 日付別集計")
-        df['発表日'] = pd.to_datetime(df['発表日'])
-        daily_counts = df.groupby(df['発表日'].dt.date).size()
+        st.subheader(f"📅 日付別集計{scope}")
         st.line_chart(daily_counts)
         
-        # ダウンロード機能
+        # ダウンロード機能（ファイルは作成ボタンを押したときだけ作り、検索条件・形式ごとにキャッシュする）
         st.subheader("💾 データダウンロード")
-        csv_data = filtered_df.to_csv(index=False, encoding='utf-8-sig')
-        st.download_button(
-            label="検索結果をCSVでダウンロード",
-            data=csv_data,
-            file_name=f"filtered_press_releases_{search_term or 'all'}.csv",
-            mime="text/csv"
-        )
+        export_name = st.selectbox("形式", list(DOWNLOAD_FORMATS), format_func=lambda name: DOWNLOAD_FORMATS[name][2])
+        export = corpus.cached_export(export_name, search_term, sort_by, ascending)
+        if export is None and st.button("ダウンロード用のファイルを作成"):
+            with st.spinner("ファイルを作成しています..."):
+                export = corpus.export(export_name, search_term, sort_by, ascending)
+        if export is not None:
+            data, dropped = export
+            if dropped:
+                st.warning(f"⚠️ {sum(dropped.values())}文字はこの形式で表現できないため除外しました")
+            suffix, mime, _ = DOWNLOAD_FORMATS[export_name]
+            st.download_button(
+                label="検索結果をダウンロード",
+                data=data,
+                file_name=f"filtered_press_releases_{search_term or 'all'}{suffix}",
+                mime=mime
+            )
         
     except Exception as e:
         st.error(f"❌ ファイルの読み込み中にエラーが発生しました: {str(e)}")
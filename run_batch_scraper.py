@@ -8,6 +8,7 @@
 import sys
 import os
 from soumu_scraper import main, main_single_month
+from soumu_watch import main as watch_main
 
 def show_menu():
     """メニューを表示"""
@@ -16,13 +17,15 @@ def show_menu():
     print("=" * 60)
     print("1. 一括スクレイピング（2009年1月～現在）")
     print("2. 単一月スクレイピング（2025年1月のみ）")
-    print("3. 終了")
+    print("3. 差分スクレイピング（新しい月・失敗した月のみ／中断時は続きから）")
+    print("4. 監視モード（当月の新着を定期的に確認してCSVに追記）")
+    print("5. 終了")
     print("-" * 60)
 
 if __name__ == "__main__":
     while True:
         show_menu()
-        choice = input("選択してください (1-3): ").strip()
+        choice = input("選択してください (1-5): ").strip()
         
         if choice == "1":
             print("\n一括スクレイピングを開始します...")
@@ -31,7 +34,7 @@ if __name__ == "__main__":
             
             if confirm in ['y', 'yes']:
                 try:
-                    main()
+                    main([])
                 except KeyboardInterrupt:
                     print("\n\n⚠️  スクレイピングが中断されました")
                 except Exception as e:
@@ -49,11 +52,30 @@ if __name__ == "__main__":
                 print(f"\n❌ エラーが発生しました: {e}")
                 
         elif choice == "3":
+            print("\n差分スクレイピングを開始します...")
+            try:
+                main(["--incremental"])
+            except KeyboardInterrupt:
+                print("\n\n⚠️  スクレイピングが中断されました")
+                print("💡 もう一度「3」を選ぶと、中断した月から再開します")
+            except Exception as e:
+                print(f"\n❌ エラーが発生しました: {e}")
+                
+        elif choice == "4":
+            print("\n監視モードを開始します（Ctrl+Cで終了）...")
+            try:
+                watch_main(["--csv", "soumu_press_releases_watch.csv"])
+            except KeyboardInterrupt:
+                print("\n\n⚠️  監視を終了しました")
+            except Exception as e:
+                print(f"\n❌ エラーが発生しました: {e}")
+                
+        elif choice == "5":
             print("終了します")
             break
             
         else:
-            print("無効な選択です。1-3を選択してください。")
+            print("無効な選択です。1-5を選択してください。")
         
         input("\nEnterキーを押して続行...")
         print("\n" + "=" * 60)
@@ -16,6 +16,7 @@ if __name__ == "__main__":
         main()
     except KeyboardInterrupt:
         print("\n\n⚠️  スクレイピングが中断されました")
+        print("💡 --incremental を付けて再実行すると、中断した月から再開できます")
         sys.exit(1)
     except Exception as e:
         print(f"\n❌ エラーが発生しました: {e}")
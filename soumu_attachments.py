@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+総務省報道資料の添付ファイル（PDF・Excel等）のダウンロード
+- 詳細ページの取得結果（soumu_crawler の details.jsonl）から添付ファイルのURLを集める
+- 添付ファイルはメモリに溜めずにチャンク単位でディスクへ書き込む
+- 内容のSHA-256をファイル名にして保存する（同じ内容のファイルは1つだけ保存）
+- 中断したダウンロードはHTTPのRangeリクエスト（If-Rangeで同じファイルか確認）で途中から再開する
+- 報道資料ごとの添付ファイルの対応をマニフェストに記録する
+使用方法: python soumu_attachments.py
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from soumu_http import get_session, DEFAULT_RETRY, RETRY_STATUS_CODES
+from soumu_manifest import write_atomic
+from soumu_scraper import HostRateLimiter, DEFAULT_RATE_PER_HOST, print_fetch_error
+from soumu_crawler import DetailLog, DEFAULT_DETAILS_PATH
+
+# 添付ファイルの保存先（既定）
+DEFAULT_ATTACHMENTS_DIR = "soumu_attachments"
+
+# 既定の並列数
+DEFAULT_DOWNLOAD_WORKERS = 4
+
+# 1回に読み書きするバイト数
+CHUNK_SIZE = 64 * 1024
+
+# マニフェストを保存する間隔（ダウンロード件数）
+CHECKPOINT_INTERVAL = 20
+
+# Content-Rangeヘッダー（206: "bytes 開始-終了/全体"、416: "bytes */全体"）
+CONTENT_RANGE_PATTERN = re.compile(r"bytes\s+(\d+)-\d+/(?:\d+|\*)")
+UNSATISFIED_RANGE_PATTERN = re.compile(r"bytes\s+\*/(\d+)")
+
+class AttachmentStore:
+    """
+    内容のSHA-256をキーにした添付ファイルの保存先
+    - objects/<先頭2文字>/<SHA-256>: 添付ファイル本体
+    - partial/<URLのSHA-256>.part: ダウンロード途中のファイル（.part.json にETag等）
+    - manifest.json: 報道資料ごとの添付ファイル、添付ファイルURLとSHA-256の対応
+    """
+    def __init__(self, root=DEFAULT_ATTACHMENTS_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.partial_dir = os.path.join(root, "partial")
+        self.manifest_path = os.path.join(root, "manifest.json")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.partial_dir, exist_ok=True)
+        self.lock = threading.Lock()
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        else:
+            manifest = {}
+        self.releases = manifest.get("releases", {})
+        self.files = manifest.get("files", {})
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def partial_path(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.partial_dir, key + ".part")
+
+    def is_downloaded(self, url):
+        entry = self.files.get(url)
+        return entry is not None and os.path.exists(self.object_path(entry["sha256"]))
+
+    def add_file(self, url, digest, size, content_type):
+        with self.lock:
+            self.files[url] = {
+                "sha256": digest,
+                "size": size,
+                "content_type": content_type,
+                "downloaded_at": datetime.now().isoformat(timespec="seconds"),
+            }
+
+    def set_release(self, release_url, attachments):
+        with self.lock:
+            self.releases[release_url] = [
+                {"名前": attachment["名前"], "URL": attachment["URL"]} for attachment in attachments
+            ]
+
+    def attachments_of(self, release_url):
+        """
+        報道資料の添付ファイル（名前・URL・SHA-256・保存先）を返す
+        """
+        result = []
+        for attachment in self.releases.get(release_url, []):
+            entry = self.files.get(attachment["URL"], {})
+            digest = entry.get("sha256")
+            result.append(dict(attachment, sha256=digest,
+                               path=self.object_path(digest) if digest else None))
+        return result
+
+    def save(self):
+        with self.lock:
+            text = json.dumps({"releases": self.releases, "files": self.files},
+                              ensure_ascii=False, indent=1, sort_keys=True)
+        write_atomic(self.manifest_path, text)
+
+def _resume_validator(part_path, meta_path):
+    """
+    途中まで保存したファイルの続きを取得するためのIf-Rangeの値（ETag、なければLast-Modified）
+    - どちらも記録されていない場合はNone（サーバー側のファイルが変わっていても分からない）
+    """
+    if not os.path.exists(part_path) or not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    return meta.get("etag") or meta.get("last_modified")
+
+def _range_matches(response, offset):
+    """
+    Rangeリクエストの応答が保存済みの部分（offsetバイト）に続くものか
+    - 206: Content-Rangeの開始位置がoffsetと同じ
+    - 416: Content-Rangeの全体のサイズがoffsetと同じ（保存済みの部分が既に全体）
+    - Content-Rangeがない・読めない場合は続きと判断しない
+    """
+    value = response.headers.get("Content-Range", "")
+    if response.status_code == 206:
+        match = CONTENT_RANGE_PATTERN.match(value)
+    else:
+        match = UNSATISFIED_RANGE_PATTERN.match(value)
+    return match is not None and int(match.group(1)) == offset
+
+def download_attachment(url, store, session=None, retry=DEFAULT_RETRY, timeout=60):
+    """
+    添付ファイルを1件ダウンロードして保存する
+    - チャンク単位でディスクに書き込み、書き終えたファイルのSHA-256を保存先の名前にする
+    - 途中まで保存済みの場合はRangeとIf-Rangeで続きから取得する（ETag / Last-Modifiedが変わっていれば最初から）。
+      ETag / Last-Modifiedを記録していない場合は、途中まで保存したファイルを捨てて最初から取得する
+    - 206のContent-Rangeの開始位置、416のContent-Rangeの全体のサイズが保存済みの部分と合わない場合も、
+      途中まで保存したファイルを捨てて最初から取得する
+    - 接続エラー・タイムアウト・429/5xxは retry の待機時間・時間上限に従ってリトライする
+    - 戻り値: (SHA-256, バイト数, 新規に保存したかどうか)
+    """
+    session = session or get_session()
+    part_path = store.partial_path(url)
+    meta_path = part_path + ".json"
+
+    deadline = time.monotonic() + retry.budget
+    attempt = 0
+    while True:
+        validator = _resume_validator(part_path, meta_path)
+        if validator is None and os.path.exists(part_path):
+            # 続きを取得しても同じファイルの続きか確かめられない
+            os.remove(part_path)
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            # ETag / Last-Modifiedが変わっていればサーバーは全体（200）を返す
+            headers["If-Range"] = validator
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                if response.status_code in RETRY_STATUS_CODES:
+                    raise requests.HTTPError(f"{response.status_code} Server Error: {url}", response=response)
+                if response.status_code in (206, 416) and not _range_matches(response, offset):
+                    if not offset:
+                        # Rangeを送っていないのに部分的な応答が返った
+                        raise requests.HTTPError(f"{response.status_code} 不正な部分応答: {url}", response=response)
+                    # 保存済みの部分の続きではない（サーバー側のファイルが変わった）
+                    print(f"保存済みの部分と合わないため最初から取得します: {url}"
+                          f"（{response.status_code} Content-Range: {response.headers.get('Content-Range')}）")
+                    os.remove(part_path)
+                    continue
+                if response.status_code == 416:
+                    # 保存済みの部分が既に全体
+                    content_type = None
+                else:
+                    response.raise_for_status()
+                    resumed = response.status_code == 206
+                    content_type = response.headers.get("Content-Type")
+                    write_atomic(meta_path, json.dumps({"url": url, "etag": response.headers.get("ETag"),
+                                                        "last_modified": response.headers.get("Last-Modified")}))
+                    with open(part_path, "ab" if resumed else "wb") as f:
+                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                            f.write(chunk)
+            break
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code not in RETRY_STATUS_CODES:
+                raise
+            error = e
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            error = e
+
+        wait = retry.delay(attempt)
+        attempt += 1
+        if attempt > retry.max_retries or time.monotonic() + wait >= deadline:
+            raise error
+        print(f"再開 {attempt}/{retry.max_retries}（{wait:.1f}秒後）: {url}（{error}）")
+        time.sleep(wait)
+
+    # 保存したファイル全体のSHA-256を計算する
+    digest = hashlib.sha256()
+    size = 0
+    with open(part_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    digest = digest.hexdigest()
+
+    object_path = store.object_path(digest)
+    created = not os.path.exists(object_path)
+    if created:
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        os.replace(part_path, object_path)
+    else:
+        # 同じ内容のファイルは保存済み
+        os.remove(part_path)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    store.add_file(url, digest, size, content_type)
+    return digest, size, created
+
+def download_all(details_path=DEFAULT_DETAILS_PATH, root=DEFAULT_ATTACHMENTS_DIR,
+                 workers=DEFAULT_DOWNLOAD_WORKERS, rate_limit=DEFAULT_RATE_PER_HOST):
+    """
+    詳細ページの取得結果に含まれる添付ファイルを全てダウンロードする
+    - ダウンロード済みのURLはスキップする
+    - 戻り値: {'保存': 件数, '重複': 件数, 'スキップ': 件数, '失敗': 件数}
+    """
+    log = DetailLog(details_path)
+    log.close()
+    store = AttachmentStore(root)
+    limiter = HostRateLimiter(rate_limit)
+
+    urls = []
+    for release_url, entry in log.entries.items():
+        attachments = entry.get("添付ファイル", [])
+        store.set_release(release_url, attachments)
+        urls.extend(attachment["URL"] for attachment in attachments)
+    urls = list(dict.fromkeys(urls))
+    targets = [url for url in urls if not store.is_downloaded(url)]
+
+    stats = {"保存": 0, "重複": 0, "スキップ": len(urls) - len(targets), "失敗": 0}
+    print(f"添付ファイル: {len(urls)}件（取得対象 {len(targets)}件 / 取得済み {stats['スキップ']}件）")
+
+    def download(url):
+        limiter.acquire(url)
+        return download_attachment(url, store)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(download, url): url for url in targets}
+        for i, future in enumerate(as_completed(futures), 1):
+            try:
+                _, _, created = future.result()
+                stats["保存" if created else "重複"] += 1
+            except Exception as e:
+                stats["失敗"] += 1
+                print_fetch_error(e)
+            if i % CHECKPOINT_INTERVAL == 0:
+                store.save()
+            if i % 100 == 0 or i == len(targets):
+                print(f"[{i}/{len(targets)}] 保存 {stats['保存']}件 / 重複 {stats['重複']}件 / 失敗 {stats['失敗']}件")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        store.save()
+
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="総務省報道資料の添付ファイルのダウンロード")
+    parser.add_argument("--details", default=DEFAULT_DETAILS_PATH,
+                        help="詳細ページの取得結果（soumu_crawler.py の出力）")
+    parser.add_argument("--output-dir", default=DEFAULT_ATTACHMENTS_DIR, help="添付ファイルの保存先")
+    parser.add_argument("--workers", type=int, default=DEFAULT_DOWNLOAD_WORKERS, help="並列数")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_PER_HOST,
+                        help="ホストごとの最大リクエスト数/秒")
+    args = parser.parse_args(argv)
+
+    print("=== 総務省報道資料 添付ファイルのダウンロード ===")
+    stats = download_all(args.details, args.output_dir, workers=args.workers, rate_limit=args.rate_limit)
+
+    print(f"\n✅ ダウンロード完了！")
+    print(f"📁 保存先: {args.output_dir}")
+    print(f"📊 保存 {stats['保存']}件 / 重複 {stats['重複']}件 / "
+          f"スキップ {stats['スキップ']}件 / 失敗 {stats['失敗']}件")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  ダウンロードが中断されました")
+        print("💡 再実行すると、途中まで保存したファイルは続きから取得します")
+        sys.exit(1)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+総務省報道資料スクレイピングのベンチマーク（ネットワーク接続なし）
+- 一覧ページの解析: 保存済みのHTML（benchmark_fixtures/）を scrape_soumu_press_releases でオフライン再生
+- CSV保存: 全期間のCSV（soumu_press_releases_all_*.csv）を save_to_csv で保存
+- 集計: main() の詳細統計（部局別・年別・月別）
+- 分析アプリ: my-streamlit-app.py の検索・部局別集計・日付別集計・CSVダウンロード
+- 全期間のCSVを拡大した合成データ（10万件・100万件）でも同じ処理を計測する
+- 結果をJSONで保存し、基準（ベースライン）より閾値を超えて遅くなった処理があれば終了コード1で終了する
+使用方法: python soumu_benchmark.py --baseline benchmark_baseline.json
+"""
+
+import os
+import re
+import io
+import sys
+import glob
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+from datetime import datetime
+
+import pandas as pd
+
+import soumu_scraper
+from soumu_http import ResponseCache, fetch_page
+from soumu_sinks import COLUMNS
+from soumu_dates import parse_dates
+from soumu_export import EXPORT_FORMATS
+from soumu_search import NgramIndex
+
+# 一覧ページのHTMLの保存先（index.json にファイル名とURL・Content-Typeの対応）
+DEFAULT_FIXTURES_DIR = "benchmark_fixtures"
+
+# 全期間のCSV（エンコーディング別のファイルは除く）
+SOURCE_CSV_PATTERN = re.compile(r"soumu_press_releases_all_\d{8}_\d{6}\.csv$")
+
+# 合成データの件数
+SCALE_SIZES = {"100k": 100_000, "1m": 1_000_000}
+
+# データセットの既定（full: 全期間のCSVそのまま）
+DEFAULT_SIZES = ("full", "100k", "1m")
+
+# 既定の繰り返し回数（中央値で比較する）
+DEFAULT_REPEAT = 3
+
+# 基準より遅くなったとみなす割合（0.2 = 20%）
+DEFAULT_THRESHOLD = 0.2
+
+# 分析アプリの検索語（入力欄の例と同じ）
+SEARCH_TERMS = ["電波法", "放送", "統計"]
+
+# データセットごとのベンチマーク（名前の [ ] の前。full では app_index_search も計測する）
+SIZE_BENCHMARKS = ("save_to_csv", "save_to_csv_all_formats", "main_statistics", "app_search",
+                   "app_department_counts", "app_daily_counts", "app_download")
+
+def find_source_csv(directory="."):
+    """
+    最新の全期間のCSVを探す
+    """
+    paths = sorted(path for path in glob.glob(os.path.join(directory, "soumu_press_releases_all_*.csv"))
+                   if SOURCE_CSV_PATTERN.search(os.path.basename(path)))
+    if not paths:
+        raise FileNotFoundError("全期間のCSV（soumu_press_releases_all_YYYYMMDD_HHMMSS.csv）が見つかりません")
+    return paths[-1]
+
+def load_source(path):
+    return pd.read_csv(path, encoding="utf-8-sig", usecols=COLUMNS, dtype=str, keep_default_na=False)
+
+def scale_up(df, size):
+    """
+    全期間のデータから行を復元抽出して指定件数の合成データを作る
+    - リンクURLは行ごとに一意にする
+    """
+    scaled = df.sample(n=size, replace=True, random_state=0).reset_index(drop=True)
+    scaled["リンクURL"] = scaled["リンクURL"] + "?n=" + pd.Series(range(size)).astype(str)
+    return scaled
+
+def load_fixtures(fixtures_dir, cache_dir):
+    """
+    保存済みのHTMLをレスポンスキャッシュに読み込み、オフライン再生するURLのリストを返す
+    """
+    with open(os.path.join(fixtures_dir, "index.json"), encoding="utf-8") as f:
+        index = json.load(f)
+    cache = ResponseCache(cache_dir)
+    urls = []
+    for filename, entry in sorted(index.items()):
+        with open(os.path.join(fixtures_dir, filename), "rb") as f:
+            cache.put(entry["url"], f.read(), {"Content-Type": entry["content_type"]})
+        urls.append(entry["url"])
+    return cache, urls
+
+def record_fixtures(months, fixtures_dir=DEFAULT_FIXTURES_DIR):
+    """
+    実際の一覧ページを取得して保存する（YYMM形式の月のリスト）
+    """
+    index_path = os.path.join(fixtures_dir, "index.json")
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+    os.makedirs(fixtures_dir, exist_ok=True)
+    for month in months:
+        url = f"https://www.soumu.go.jp/menu_news/s-news/{month}m.html"
+        page = fetch_page(url)
+        filename = f"{month}m.html"
+        with open(os.path.join(fixtures_dir, filename), "wb") as f:
+            f.write(page.content)
+        index[filename] = {"url": url, "content_type": page.headers.get("Content-Type", "text/html")}
+        print(f"保存: {filename}（{len(page.content)}バイト）")
+        time.sleep(1)
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+# 分析アプリ（my-streamlit-app.py）と同じ処理
+
+def app_search(df, term):
+    mask = (df['内容'].str.contains(term, case=False, na=False) |
+            df['部局'].str.contains(term, case=False, na=False))
+    return df[mask]
+
+def app_department_counts(df):
+    return df['部局'].value_counts()
+
+def app_daily_counts(df):
+    # pd.to_datetime は「2025年9月9日」形式を解釈できないため、スクレイパーと同じ変換を使う
+    dates = parse_dates(df['発表日'])
+    return df.groupby(dates.dt.date).size()
+
+def app_download(df):
+    return df.to_csv(index=False, encoding='utf-8-sig')
+
+def build_benchmarks(sizes, fixtures_dir, workdir, pattern=None):
+    """
+    (名前, 処理, 件数) のリストを作る
+    - pattern: 名前に含む文字列で対象を絞る（対象のないデータセット・インデックスは作らない）
+    """
+    def selected(name):
+        return not pattern or pattern in name
+
+    benchmarks = []
+
+    parse_names = {parser: f"parse_fixtures[{parser}]" for parser in sorted(soumu_scraper.PARSER_BACKENDS)}
+    if any(selected(name) for name in parse_names.values()):
+        cache, urls = load_fixtures(fixtures_dir, os.path.join(workdir, "cache"))
+        for parser, name in parse_names.items():
+            def parse_fixtures(parser=parser):
+                for url in urls:
+                    soumu_scraper.scrape_soumu_press_releases(url, cache=cache, offline=True, parser=parser)
+            benchmarks.append((name, parse_fixtures, len(urls)))
+
+    source = None
+    for size in sizes:
+        index_name = f"app_index_search[{size}]" if size == "full" else None
+        names = [f"{name}[{size}]" for name in SIZE_BENCHMARKS] + ([index_name] if index_name else [])
+        if not any(selected(name) for name in names):
+            # 100万件の合成データなどを作らずに済ませる
+            continue
+        if source is None:
+            source = load_source(find_source_csv())
+        df = source if size == "full" else scale_up(source, SCALE_SIZES[size])
+        rows = len(df)
+        output = os.path.join(workdir, f"bench_{size}.csv")
+        benchmarks.extend([
+            (f"save_to_csv[{size}]", lambda df=df, output=output: soumu_scraper.save_to_csv(df, output), rows),
+            (f"save_to_csv_all_formats[{size}]",
+             lambda df=df, output=output: soumu_scraper.save_to_csv(df, output, list(EXPORT_FORMATS)), rows),
+            (f"main_statistics[{size}]", lambda df=df: soumu_scraper.print_statistics(df), rows),
+            (f"app_search[{size}]", lambda df=df: [app_search(df, term) for term in SEARCH_TERMS], rows),
+            (f"app_department_counts[{size}]", lambda df=df: app_department_counts(df), rows),
+            (f"app_daily_counts[{size}]", lambda df=df: app_daily_counts(df), rows),
+            (f"app_download[{size}]", lambda df=df: app_download(app_search(df, SEARCH_TERMS[0])), rows),
+        ])
+        if index_name and selected(index_name):
+            # n-gramインデックスでの検索（インデックスの作成は計測に含めない）
+            index = NgramIndex.from_frame(df)
+            benchmarks.append((index_name,
+                               lambda df=df, index=index: [df.iloc[index.search(term)] for term in SEARCH_TERMS],
+                               rows))
+    return [benchmark for benchmark in benchmarks if selected(benchmark[0])]
+
+def time_benchmark(func, repeat):
+    """
+    処理を繰り返し実行して所要時間（秒）のリストを返す（表示は捨てる）
+    """
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT, fixtures_dir=DEFAULT_FIXTURES_DIR, pattern=None):
+    """
+    ベンチマークを実行して結果（JSONに保存する形式）を返す
+    - pattern: 名前に含む文字列で対象を絞る
+    """
+    workdir = tempfile.mkdtemp(prefix="soumu_benchmark_")
+    results = {}
+    try:
+        for name, func, rows in build_benchmarks(sizes, fixtures_dir, workdir, pattern):
+            # 100万件の処理は1回だけ計測する
+            timings = time_benchmark(func, 1 if rows >= SCALE_SIZES["1m"] else repeat)
+            results[name] = {
+                "median": statistics.median(timings),
+                "min": min(timings),
+                "runs": timings,
+                "rows": rows,
+            }
+            print(f"  {name}: 中央値 {results[name]['median'] * 1000:.1f}ms（{len(timings)}回, {rows}件）")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    基準と比較し、閾値を超えて遅くなった処理の名前のリストを返す
+    """
+    regressions = []
+    print(f"\n=== 基準との比較（閾値 +{threshold:.0%}）===")
+    for name, current in results["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"  {name}: 基準なし")
+            continue
+        ratio = current["median"] / base["median"]
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            mark = "❌"
+        else:
+            mark = "✅"
+        print(f"  {mark} {name}: {base['median'] * 1000:.1f}ms → {current['median'] * 1000:.1f}ms（{ratio - 1:+.0%}）")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="総務省報道資料スクレイピングのベンチマーク（オフライン）")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES),
+                        help=f"データセット（カンマ区切り: full, {', '.join(SCALE_SIZES)}）")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="繰り返し回数（中央値で比較）")
+    parser.add_argument("--filter", help="名前にこの文字列を含むベンチマークだけを実行する")
+    parser.add_argument("--fixtures-dir", default=DEFAULT_FIXTURES_DIR, help="一覧ページのHTMLの保存先")
+    parser.add_argument("--output", default=None, help="結果の保存先（既定: benchmark_YYYYMMDD_HHMMSS.json）")
+    parser.add_argument("--baseline", help="比較する基準の結果（JSON）")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="基準よりこの割合を超えて遅くなったら失敗とする（0.2 = 20%%）")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="今回の結果を --baseline のファイルに保存する（比較はしない）")
+    parser.add_argument("--record-fixtures", metavar="YYMM,...",
+                        help="実際の一覧ページを取得して保存する（ネットワーク接続あり）")
+    args = parser.parse_args(argv)
+
+    if args.record_fixtures:
+        record_fixtures(args.record_fixtures.split(","), args.fixtures_dir)
+        return 0
+
+    print("=== 総務省報道資料スクレイピング ベンチマーク ===")
+    results = run_benchmarks(args.sizes.split(","), args.repeat, args.fixtures_dir, args.filter)
+
+    output = args.output or f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n📁 結果: {output}")
+
+    if args.baseline and args.save_baseline:
+        shutil.copyfile(output, args.baseline)
+        print(f"📁 基準を保存しました: {args.baseline}")
+        return 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)}件の処理が基準より遅くなりました: {', '.join(regressions)}")
+            return 1
+        print("\n✅ 基準より遅くなった処理はありません")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
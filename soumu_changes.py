@@ -0,0 +1,128 @@
+"""
+前回の取得結果（スナップショット）との差分（変更セット）
+- 各レコードに安定したID（soumu_dataset.stable_id）を付け、前回のスナップショットと比べる
+- 変更セット: 追加（added）・削除（removed）・内容の変更（modified）をJSON Lines形式で保存する
+- 内容（件名）の変更は履歴ファイルに追記する
+- 削除は今回取得できた月（対象期間）の中だけで判定する（取得に失敗した月のレコードは削除扱いにしない）
+"""
+
+import os
+import json
+import gzip
+from datetime import datetime
+
+import pandas as pd
+
+from soumu_manifest import write_atomic, DEFAULT_STATE_DIR
+from soumu_dataset import stable_ids
+from soumu_sinks import COLUMNS
+
+# 前回の取得結果（スナップショット）の保存先（既定）
+DEFAULT_SNAPSHOT_PATH = os.path.join(DEFAULT_STATE_DIR, "snapshot.json.gz")
+
+# 内容（件名）の変更履歴の保存先（既定）
+DEFAULT_TITLE_HISTORY_PATH = os.path.join(DEFAULT_STATE_DIR, "title_history.jsonl")
+
+# 変更セットの保存先（既定）
+DEFAULT_CHANGES_DIR = "soumu_changes"
+
+# 変更の種類
+CHANGE_TYPES = ('added', 'removed', 'modified')
+
+def with_ids(df):
+    """
+    id列（安定したレコードID）を先頭に付けたDataFrameを返す（IDの重複は最初の行を残す）
+    """
+    df = df[COLUMNS].copy()
+    df.insert(0, 'id', stable_ids(df))
+    return df.drop_duplicates('id')
+
+def load_snapshot(path=DEFAULT_SNAPSHOT_PATH):
+    """
+    前回のスナップショットを読み込む（なければNone）
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        records = json.loads(gzip.decompress(f.read()).decode('utf-8'))
+    return pd.DataFrame(records, columns=['id'] + COLUMNS)
+
+def save_snapshot(snapshot, path=DEFAULT_SNAPSHOT_PATH):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    text = json.dumps(snapshot.to_dict('records'), ensure_ascii=False, separators=(',', ':'))
+    write_atomic(path, gzip.compress(text.encode('utf-8')))
+
+def diff_snapshots(previous, current):
+    """
+    前回と今回のスナップショット（id列付き）を比べる
+    - 戻り値: {'added': DataFrame, 'removed': DataFrame, 'modified': DataFrame（変更前の内容の列付き）}
+    - 削除は今回のスナップショットに含まれる対象期間の中だけで判定する
+    """
+    previous_ids = pd.Index(previous['id'])
+    current_ids = pd.Index(current['id'])
+
+    added = current[~current_ids.isin(previous_ids)]
+    fetched_periods = set(current['対象期間'])
+    removed = previous[~previous_ids.isin(current_ids) & previous['対象期間'].isin(fetched_periods)]
+
+    merged = current.merge(previous[['id', '内容']], on='id', suffixes=('', '_previous'))
+    modified = merged[merged['内容'] != merged['内容_previous']].rename(columns={'内容_previous': '変更前の内容'})
+
+    return {'added': added, 'removed': removed, 'modified': modified}
+
+def next_snapshot(previous, current):
+    """
+    今回のスナップショットに、今回取得しなかった月の前回のレコードを加える
+    """
+    if previous is None:
+        return current
+    carried = previous[~previous['対象期間'].isin(set(current['対象期間']))]
+    return pd.concat([current, carried], ignore_index=True)
+
+def write_change_set(changes, path):
+    """
+    変更セットをJSON Lines形式で保存する（1行1レコード、'変更' に added / removed / modified）
+    """
+    lines = []
+    for change in CHANGE_TYPES:
+        for record in changes[change].to_dict('records'):
+            lines.append(json.dumps(dict({'変更': change}, **record), ensure_ascii=False))
+    write_atomic(path, ''.join(line + '\n' for line in lines))
+
+def append_title_history(modified, path=DEFAULT_TITLE_HISTORY_PATH, detected_at=None):
+    """
+    内容（件名）の変更を履歴ファイルに追記する
+    """
+    if modified.empty:
+        return
+    detected_at = detected_at or datetime.now().isoformat(timespec='seconds')
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in modified.to_dict('records'):
+            f.write(json.dumps({'id': record['id'], '検出日時': detected_at, 'リンクURL': record['リンクURL'],
+                                '変更前': record['変更前の内容'], '変更後': record['内容']},
+                               ensure_ascii=False) + '\n')
+
+def record_changes(df, snapshot_path=DEFAULT_SNAPSHOT_PATH, changes_dir=DEFAULT_CHANGES_DIR,
+                   history_path=DEFAULT_TITLE_HISTORY_PATH):
+    """
+    今回の取得結果を前回のスナップショットと比べて変更セットを保存し、スナップショットを更新する
+    - 戻り値: (変更セットのパス, {'added': 件数, 'removed': 件数, 'modified': 件数})
+      初回（前回のスナップショットがない場合）はパスがNone
+    """
+    current = with_ids(df)
+    previous = load_snapshot(snapshot_path)
+    path = None
+    counts = {change: 0 for change in CHANGE_TYPES}
+
+    if previous is not None:
+        changes = diff_snapshots(previous, current)
+        counts = {change: len(rows) for change, rows in changes.items()}
+        os.makedirs(changes_dir, exist_ok=True)
+        path = os.path.join(changes_dir, f"changes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+        write_change_set(changes, path)
+        append_title_history(changes['modified'], history_path)
+
+    save_snapshot(next_snapshot(previous, current), snapshot_path)
+    return path, counts
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+総務省報道資料の詳細ページ取得（クロール）
+- 一覧から取得した各リンクURLの詳細ページを取得し、本文・添付ファイル・最終更新日を抽出する
+- 並列数とホストごとのリクエスト間隔を制限する
+- 取得結果は1ページごとにJSON Lines形式で追記する（中断しても取得済みのページは残る）
+- 取得済みのページは次回以降スキップする（--refresh の場合はETagで条件付きGETし、変更のあったページだけ取得）
+使用方法: python soumu_crawler.py --input soumu_press_releases_all_YYYYMMDD_HHMMSS.csv
+"""
+
+import os
+import sys
+import json
+import argparse
+import threading
+import urllib.parse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import pandas as pd
+
+from soumu_http import fetch_page, NegativeCache, DEFAULT_NOT_FOUND_PATH
+from soumu_scraper import HostRateLimiter, lxml_source, clean_text, DEFAULT_RATE_PER_HOST, print_fetch_error
+from soumu_store import PressReleaseStore
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+# 詳細ページの取得結果の保存先（既定）
+DEFAULT_DETAILS_PATH = os.path.join("soumu_state", "details.jsonl")
+
+# 既定の並列数
+DEFAULT_CRAWL_WORKERS = 4
+
+# 添付ファイルとみなす拡張子
+ATTACHMENT_EXTENSIONS = ('.pdf', '.xls', '.xlsx', '.xlsm', '.doc', '.docx', '.ppt', '.pptx', '.csv', '.zip', '.txt')
+
+# 本文を探す要素（上から順に探し、最初に見つかったものを使う）
+CONTENT_XPATHS = ['//*[@id="contentsWrapper"]', '//*[@id="contents"]', '//main', '//*[@id="main"]', '//body']
+
+# 本文から除く要素
+EXCLUDED_TAGS = ['script', 'style', 'noscript', 'nav', 'header', 'footer']
+
+# 本文の改行位置とするブロック要素
+BLOCK_TAGS = ['p', 'div', 'br', 'li', 'tr', 'table', 'dt', 'dd', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+
+def extract_detail(html, url, header_encoding=None):
+    """
+    詳細ページのHTMLから本文と添付ファイルを抽出する
+    - html: レスポンス本文のバイト列（header_encoding はレスポンスヘッダーの文字エンコーディング）または文字列
+    - XML宣言（<?xml ... encoding="Shift_JIS"?>）のあるXHTMLのページも、UTF-8のバイト列にしてから解析する
+    - 戻り値: {'タイトル', '本文', '添付ファイル': [{'名前', 'URL'}]}
+    """
+    if lxml_html is None:
+        raise ImportError("詳細ページの解析にはlxmlが必要です: pip install lxml")
+
+    parser = lxml_html.HTMLParser(encoding='utf-8')
+    document = lxml_html.fromstring(lxml_source(html, header_encoding), parser=parser)
+    title = clean_text(document.findtext('.//title') or '')
+
+    content = document
+    for xpath in CONTENT_XPATHS:
+        found = document.xpath(xpath)
+        if found:
+            content = found[0]
+            break
+
+    attachments = []
+    seen = set()
+    for link in content.iter('a'):
+        href = link.get('href')
+        if not href:
+            continue
+        absolute = urllib.parse.urljoin(url, href)
+        path = urllib.parse.urlparse(absolute).path.lower()
+        if path.endswith(ATTACHMENT_EXTENSIONS) and absolute not in seen:
+            seen.add(absolute)
+            attachments.append({'名前': clean_text(link.text_content()), 'URL': absolute})
+
+    for element in content.xpath('.//' + ' | .//'.join(EXCLUDED_TAGS)):
+        element.drop_tree()
+    for element in content.iter(*BLOCK_TAGS):
+        element.tail = '\n' + (element.tail or '')
+    lines = (clean_text(line) for line in content.text_content().splitlines())
+    body = '\n'.join(line for line in lines if line)
+
+    return {'タイトル': title, '本文': body, '添付ファイル': attachments}
+
+class DetailLog:
+    """
+    詳細ページの取得結果（JSON Lines）
+    - 1ページ1行で追記し、同じURLは後の行を優先する
+    """
+    def __init__(self, path=DEFAULT_DETAILS_PATH):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 中断時に書きかけだった行
+                        continue
+                    self.entries[entry['URL']] = entry
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'a', encoding='utf-8')
+        self.lock = threading.Lock()
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def validators(self, url):
+        """
+        前回の取得時のETag / Last-Modified（どちらもなければNone）
+        """
+        entry = self.entries.get(url) or {}
+        if not entry.get('ETag') and not entry.get('最終更新日'):
+            return None
+        return {'etag': entry.get('ETag'), 'last_modified': entry.get('最終更新日')}
+
+    def append(self, entry):
+        """
+        取得結果を1行追記する（チェックポイント）
+        """
+        with self.lock:
+            self.entries[entry['URL']] = entry
+            self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def crawl_details(urls, output=DEFAULT_DETAILS_PATH, workers=DEFAULT_CRAWL_WORKERS,
+                  rate_limit=DEFAULT_RATE_PER_HOST, refresh=False, not_found_path=DEFAULT_NOT_FOUND_PATH):
+    """
+    詳細ページを取得して本文・添付ファイル・最終更新日を保存する
+    - urls: 詳細ページのURL（重複・空文字は除く）
+    - output: 取得結果の保存先（JSON Lines）
+    - workers: 並列数
+    - rate_limit: ホストごとの最大リクエスト数/秒
+    - refresh: 取得済みのページもETag / Last-Modifiedで条件付きGETし、変更があれば取り直す
+    - 戻り値: {'取得': 件数, '未変更': 件数, 'スキップ': 件数, '失敗': 件数}
+    """
+    urls = list(dict.fromkeys(url for url in urls if url))
+    log = DetailLog(output)
+    negative_cache = NegativeCache(not_found_path) if not_found_path else None
+    limiter = HostRateLimiter(rate_limit)
+
+    targets = urls if refresh else [url for url in urls if url not in log]
+    stats = {'取得': 0, '未変更': 0, 'スキップ': len(urls) - len(targets), '失敗': 0}
+    print(f"詳細ページ: {len(urls)}件（取得対象 {len(targets)}件 / 取得済み {stats['スキップ']}件）")
+
+    def crawl(url):
+        limiter.acquire(url)
+        validators = log.validators(url)
+        page = fetch_page(url, negative_cache=negative_cache, validators=validators)
+        if page.not_modified:
+            return url, None
+        detail = extract_detail(page.content, url, page.encoding)
+        entry = {
+            'URL': url,
+            'ETag': page.headers.get('ETag'),
+            '最終更新日': page.headers.get('Last-Modified'),
+            '取得日時': datetime.now().isoformat(timespec='seconds'),
+        }
+        entry.update(detail)
+        return url, entry
+
+    def completed():
+        # 取得中のページを workers * 2 件までに限り、終わった分だけ次を投入する
+        # （全件を一度に投入すると、待機中のタスクだけで対象のURL数に比例してメモリを使う）
+        remaining = iter(targets)
+        pending = set()
+        while True:
+            for url in remaining:
+                pending.add(executor.submit(crawl, url))
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from done
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for i, future in enumerate(completed(), 1):
+            try:
+                url, entry = future.result()
+            except Exception as e:
+                stats['失敗'] += 1
+                print_fetch_error(e)
+                continue
+            if entry is None:
+                stats['未変更'] += 1
+            else:
+                log.append(entry)
+                stats['取得'] += 1
+            if i % 100 == 0 or i == len(targets):
+                print(f"[{i}/{len(targets)}] 取得 {stats['取得']}件 / 未変更 {stats['未変更']}件 / 失敗 {stats['失敗']}件")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        log.close()
+
+    return stats
+
+def load_detail_urls(input_path=None, sqlite_path=None):
+    """
+    一覧のCSVまたはSQLiteデータベースから詳細ページのURLを読み込む
+    """
+    if sqlite_path:
+        with PressReleaseStore(sqlite_path) as store:
+            rows = store.conn.execute("SELECT リンクURL FROM press_releases ORDER BY 日付 DESC").fetchall()
+        return [row[0] for row in rows]
+    df = pd.read_csv(input_path, encoding='utf-8-sig', usecols=['リンクURL'], dtype=str, keep_default_na=False)
+    return df['リンクURL'].tolist()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="総務省報道資料の詳細ページ取得")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="一覧のCSVファイル（UTF-8）")
+    source.add_argument("--sqlite", help="一覧のSQLiteデータベース")
+    parser.add_argument("--output", default=DEFAULT_DETAILS_PATH, help="取得結果の保存先（JSON Lines）")
+    parser.add_argument("--workers", type=int, default=DEFAULT_CRAWL_WORKERS, help="並列数")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_PER_HOST,
+                        help="ホストごとの最大リクエスト数/秒")
+    parser.add_argument("--refresh", action="store_true",
+                        help="取得済みのページも条件付きGETで確認し、変更があれば取り直す")
+    args = parser.parse_args(argv)
+
+    print("=== 総務省報道資料 詳細ページ取得 ===")
+    urls = load_detail_urls(args.input, args.sqlite)
+    stats = crawl_details(urls, output=args.output, workers=args.workers,
+                          rate_limit=args.rate_limit, refresh=args.refresh)
+
+    print(f"\n✅ 詳細ページ取得完了！")
+    print(f"📁 保存ファイル: {args.output}")
+    print(f"📊 取得 {stats['取得']}件 / 未変更 {stats['未変更']}件 / "
+          f"スキップ {stats['スキップ']}件 / 失敗 {stats['失敗']}件")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  詳細ページの取得が中断されました")
+        print("💡 再実行すると、取得済みのページをスキップして続きから取得します")
+        sys.exit(1)
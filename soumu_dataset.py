@@ -0,0 +1,98 @@
+"""
+報道資料の列指向データセット（Parquet / Arrow）
+- 年ごとにパーティション分割して保存する（year=YYYY/）
+- 発表日は日付型、部局・対象期間は辞書エンコード、レコードIDは リンクURL と発表日から作る
+- 読み込み時は必要な年・列だけを読む
+- pyarrowが必要
+"""
+
+import hashlib
+
+import pandas as pd
+
+from soumu_dates import parse_dates
+
+# データセットの保存先（既定）
+DEFAULT_DATASET_DIR = "soumu_dataset"
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+    except ImportError:
+        raise ImportError("Parquet出力にはpyarrowが必要です: pip install pyarrow")
+    return pyarrow, pyarrow.dataset
+
+def record_id(link_url, date_str):
+    """
+    報道資料のレコードID（リンクURLと発表日から作る16桁の16進数）
+    """
+    key = f"{link_url or ''}|{date_str or ''}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+def stable_id(link_url, date_str, content=None):
+    """
+    報道資料の安定したレコードID（取得し直しても、内容の文言が修正されても変わらない）
+    - リンクURLがある場合はリンクURLと発表日から作る
+    - リンクURLがない場合は発表日と内容から作る
+    """
+    if link_url:
+        return record_id(link_url, date_str)
+    return record_id('', f"{date_str}|{content}")
+
+def stable_ids(df):
+    """
+    DataFrameの各行の安定したレコードID
+    """
+    return [stable_id(link_url, date_str, content)
+            for link_url, date_str, content in zip(df['リンクURL'], df['発表日'], df['内容'])]
+
+def to_arrow_table(df):
+    """
+    報道資料のDataFrameを型付きのArrowテーブルに変換する
+    """
+    pa, _ = _require_pyarrow()
+    dates = parse_dates(df['発表日'])
+    # 発表日を変換できない行は対象期間の年を使う
+    years = dates.dt.year.fillna(
+        pd.to_numeric(df['対象期間'].str.extract(r'(\d{4})年')[0], errors='coerce')
+    )
+    ids = stable_ids(df)
+
+    return pa.table({
+        'id': pa.array(ids, pa.string()),
+        '発表日': pa.array(dates.dt.date, pa.date32()),
+        '内容': pa.array(df['内容'], pa.string()),
+        '部局': pa.array(df['部局'], pa.string()).dictionary_encode(),
+        'リンクURL': pa.array(df['リンクURL'], pa.string()),
+        '対象期間': pa.array(df['対象期間'], pa.string()).dictionary_encode(),
+        'year': pa.array(years, pa.int16()),
+    })
+
+def write_dataset(df, root=DEFAULT_DATASET_DIR):
+    """
+    報道資料を年ごとに分割したParquetデータセットとして保存する
+    - 含まれる年のパーティションは置き換え、それ以外の年はそのまま残す
+    """
+    pa, ds = _require_pyarrow()
+    table = to_arrow_table(df)
+    ds.write_dataset(
+        table, root, format="parquet",
+        partitioning=ds.partitioning(pa.schema([('year', pa.int16())]), flavor="hive"),
+        existing_data_behavior="delete_matching",
+    )
+    return root
+
+def read_dataset(root=DEFAULT_DATASET_DIR, columns=None, years=None):
+    """
+    Parquetデータセットを読み込む
+    - columns: 読み込む列（Noneなら全て）
+    - years: 読み込む年（例: range(2020, 2026)）。該当しない年のファイルは読まない
+    """
+    pa, ds = _require_pyarrow()
+    dataset = ds.dataset(
+        root, format="parquet",
+        partitioning=ds.partitioning(pa.schema([('year', pa.int16())]), flavor="hive"),
+    )
+    filter_ = ds.field('year').isin(list(years)) if years is not None else None
+    return dataset.to_table(columns=columns, filter=filter_).to_pandas(date_as_object=False)
@@ -0,0 +1,81 @@
+"""
+発表日の正規化・日付型への変換
+- 西暦（2025年9月9日、2025/9/9、2025-09-09）と和暦（令和7年9月9日、平成元年1月8日、R7.9.9）に対応
+- 全角数字・全角記号はNFKCで半角に揃える
+- 期間（2025年9月9日～10日）は開始日を使う
+- 同じ文字列は一度だけ解析する（報道資料の発表日は種類が少ないため、ほとんどがキャッシュから返る）
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+import pandas as pd
+
+# 元号の開始年の前年（元号の年 + オフセット = 西暦）
+ERA_OFFSETS = {
+    '明治': 1867, 'M': 1867,
+    '大正': 1911, 'T': 1911,
+    '昭和': 1925, 'S': 1925,
+    '平成': 1988, 'H': 1988,
+    '令和': 2018, 'R': 2018,
+}
+
+_DATE_PATTERN = re.compile(
+    r'(?:(?P<era>明治|大正|昭和|平成|令和)|(?<![A-Za-z])(?P<era_abbr>[MTSHR]))?\s*'
+    r'(?P<year>\d{1,4}|元)\s*[年./-]\s*'
+    r'(?P<month>\d{1,2})\s*[月./-]\s*'
+    r'(?P<day>\d{1,2})'
+)
+
+@lru_cache(maxsize=None)
+def parse_date(text):
+    """
+    発表日の文字列を pd.Timestamp に変換する（変換できない場合は pd.NaT）
+    """
+    if not isinstance(text, str):
+        return pd.NaT
+    match = _DATE_PATTERN.search(unicodedata.normalize('NFKC', text))
+    if not match:
+        return pd.NaT
+
+    era = match.group('era') or match.group('era_abbr')
+    year = match.group('year')
+    if era:
+        year = ERA_OFFSETS[era] + (1 if year == '元' else int(year))
+    elif year == '元' or len(year) != 4:
+        # 元号のない「元年」や2桁の年は解釈しない
+        return pd.NaT
+    else:
+        year = int(year)
+
+    try:
+        return pd.Timestamp(year, int(match.group('month')), int(match.group('day')))
+    except ValueError:
+        return pd.NaT
+
+def format_date(timestamp):
+    """
+    日付を「2025年9月9日」形式の文字列にする
+    """
+    return f"{timestamp.year}年{timestamp.month}月{timestamp.day}日"
+
+def parse_dates(values):
+    """
+    発表日の列を datetime64 に変換する（変換できない値は NaT）
+    - 重複を除いた値だけを解析し、結果を割り当てる
+    """
+    values = pd.Series(values)
+    mapping = {value: parse_date(value) for value in pd.unique(values)}
+    return pd.to_datetime(values.map(mapping))
+
+def normalize_dates(values):
+    """
+    発表日の列を「2025年9月9日」形式にそろえる（変換できない値はそのまま）
+    """
+    values = pd.Series(values)
+    mapping = {}
+    for value in pd.unique(values):
+        timestamp = parse_date(value)
+        mapping[value] = value if pd.isna(timestamp) else format_date(timestamp)
+    return values.map(mapping)
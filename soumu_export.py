@@ -0,0 +1,174 @@
+"""
+報道資料のファイル出力（複数エンコーディング・形式）
+- 文字列の正規化はベクトル化した1回の処理で行う
+- 行のシリアライズは1回だけ行い、同じテキストを各エンコーディングに変換して出力先へ書き込む
+- Shift_JIS / CP932 など旧来のエンコーディングは指定されたときだけ出力する
+- エンコーディングで表現できずに除外した文字を記録する
+"""
+
+import io
+import os
+import codecs
+import tempfile
+from collections import Counter
+
+# 出力形式: 名前 -> (ファイル名の接尾辞, エンコーディング, 区切り文字, 改行文字, 説明)
+EXPORT_FORMATS = {
+    'utf8': ('.csv', 'utf-8-sig', ',', '\n', 'UTF-8 BOM - Mac/Googleスプレッドシート/最新Excel用'),
+    'shift_jis': ('_shift_jis.csv', 'shift_jis', ',', '\n', 'Shift_JIS - Windows Excel用'),
+    'cp932': ('_cp932.csv', 'cp932', ',', '\n', 'CP932 - Windows Excel用'),
+    'excel': ('_excel.csv', 'cp932', ',', '\r\n', 'Excel専用 - CP932・CRLF改行'),
+    'tsv': ('_text.txt', 'utf-8', '\t', '\n', 'テキスト形式（TSV） - 確実に読める'),
+}
+
+# 分析アプリでダウンロードできる形式: 名前 -> (ファイル名の接尾辞, MIMEタイプ, 説明)
+DOWNLOAD_FORMATS = {
+    'utf8': ('.csv', 'text/csv', EXPORT_FORMATS['utf8'][4]),
+    'excel': ('_excel.csv', 'text/csv', EXPORT_FORMATS['excel'][4]),
+    'shift_jis': ('_shift_jis.csv', 'text/csv', EXPORT_FORMATS['shift_jis'][4]),
+    'cp932': ('_cp932.csv', 'text/csv', EXPORT_FORMATS['cp932'][4]),
+    'tsv': ('_text.txt', 'text/tab-separated-values', EXPORT_FORMATS['tsv'][4]),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet', 'Parquet - pandas/Arrow用（pyarrowが必要）'),
+}
+
+# 既定で出力する形式（旧来のエンコーディングは指定時のみ）
+DEFAULT_EXPORT_FORMATS = ('utf8', 'tsv')
+
+# TSVに出力する列
+TSV_COLUMNS = ['発表日', '内容', '部局', 'リンクURL', '対象期間']
+
+# 1回にシリアライズする行数
+CHUNK_ROWS = 10000
+
+def normalize_text_columns(df):
+    """
+    文字列の列を正規化する（改行・タブ・連続する空白を単一の空白にし、前後の空白を除去）
+    """
+    df_clean = df.copy(deep=False)
+    for col in df_clean.columns:
+        if df_clean[col].dtype == 'object' or str(df_clean[col].dtype) in ('string', 'str'):
+            df_clean[col] = df_clean[col].astype(str).str.replace(r'\s+', ' ', regex=True).str.strip()
+        elif df_clean[col].dtype == 'category':
+            # カテゴリ型はカテゴリ（種類ごとの値）だけを正規化する
+            categories = df_clean[col].cat.categories
+            normalized = categories.astype(str).str.replace(r'\s+', ' ', regex=True).str.strip()
+            df_clean[col] = df_clean[col].map(dict(zip(categories, normalized)))
+    return df_clean
+
+def output_path(filename, name):
+    """
+    出力形式に対応するファイル名を返す
+    """
+    suffix = EXPORT_FORMATS[name][0]
+    base = filename[:-4] if filename.lower().endswith('.csv') else filename
+    if name == 'utf8':
+        return filename
+    return base + suffix
+
+class _EncodedSink:
+    """
+    1つの出力ファイル（エンコーディングごと）
+    - 表現できない文字は除外し、文字ごとの件数を記録する
+    """
+    def __init__(self, path, encoding, newline):
+        self.path = path
+        self.newline = newline
+        self.file = open(path, 'wb')
+        if encoding == 'utf-8-sig':
+            # BOMは先頭に1回だけ書き込む
+            self.file.write(codecs.BOM_UTF8)
+            encoding = 'utf-8'
+        self.encoding = encoding
+        self.dropped = Counter()
+
+    def write(self, text):
+        if self.newline != '\n':
+            # 正規化済みの値は改行を含まないため、行末だけが置き換わる
+            text = text.replace('\n', self.newline)
+        try:
+            data = text.encode(self.encoding)
+        except UnicodeEncodeError:
+            self._count_dropped(text)
+            data = text.encode(self.encoding, errors='ignore')
+        self.file.write(data)
+
+    def _count_dropped(self, text):
+        for char in set(text):
+            try:
+                char.encode(self.encoding)
+            except UnicodeEncodeError:
+                self.dropped[char] += text.count(char)
+
+    def close(self):
+        self.file.close()
+
+def export_press_releases(df, filename, formats=DEFAULT_EXPORT_FORMATS):
+    """
+    DataFrameを指定した形式で出力する
+    - filename: UTF-8 CSVのファイル名（他の形式は接尾辞を付けたファイル名）
+    - formats: 出力形式の名前（EXPORT_FORMATS のキー）
+    - 戻り値: {形式名: (ファイル名, 除外した文字のCounter)}
+    """
+    unknown = [name for name in formats if name not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"不明な出力形式: {', '.join(unknown)}")
+
+    df_clean = normalize_text_columns(df)
+    csv_sinks = {}
+    tsv_sinks = {}
+    for name in formats:
+        _, encoding, sep, newline, _ = EXPORT_FORMATS[name]
+        sink = _EncodedSink(output_path(filename, name), encoding, newline)
+        (tsv_sinks if sep == '\t' else csv_sinks)[name] = sink
+
+    try:
+        tsv_columns = [col for col in TSV_COLUMNS if col in df_clean.columns]
+        if tsv_sinks:
+            header = '\t'.join(tsv_columns) + '\n'
+            for sink in tsv_sinks.values():
+                sink.write(header)
+
+        for start in range(0, max(len(df_clean), 1), CHUNK_ROWS):
+            chunk = df_clean.iloc[start:start + CHUNK_ROWS]
+            if csv_sinks:
+                # CSVのシリアライズは1回だけ行い、各エンコーディングの出力先へ書き込む
+                text = chunk.to_csv(index=False, header=(start == 0), lineterminator='\n')
+                for sink in csv_sinks.values():
+                    sink.write(text)
+            if tsv_sinks and len(chunk) and tsv_columns:
+                # 正規化済みの値はタブ・改行を含まないため、そのまま連結する
+                columns = [chunk[col].astype(str) for col in tsv_columns]
+                lines = columns[0].str.cat(columns[1:], sep='\t')
+                text = '\n'.join(lines) + '\n'
+                for sink in tsv_sinks.values():
+                    sink.write(text)
+    finally:
+        for sink in list(csv_sinks.values()) + list(tsv_sinks.values()):
+            sink.close()
+
+    report = {}
+    for name in formats:
+        sink = csv_sinks.get(name) or tsv_sinks.get(name)
+        report[name] = (sink.path, sink.dropped)
+    return report
+
+def export_bytes(df, name):
+    """
+    DataFrameを1つの形式で出力した内容を返す（分析アプリのダウンロード用）
+    - name: DOWNLOAD_FORMATS のキー
+    - 戻り値: (バイト列, 除外した文字のCounter)
+    """
+    if name == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Parquet出力にはpyarrowが必要です: pip install pyarrow")
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue(), Counter()
+
+    # ファイルへの出力と同じ処理（正規化・除外した文字の記録）を使う
+    with tempfile.TemporaryDirectory() as workdir:
+        path, dropped = export_press_releases(df, os.path.join(workdir, 'export.csv'), [name])[name]
+        with open(path, 'rb') as f:
+            return f.read(), dropped
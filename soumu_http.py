@@ -0,0 +1,286 @@
+"""
+総務省報道資料スクレイピングのHTTP取得処理
+- レスポンスをディスクに圧縮保存するキャッシュ（URL単位）
+- ETag / Last-Modified による条件付きGETでの再検証
+- キャッシュのみを使うオフライン再生（ネットワーク接続なし）
+- 接続を再利用する共有セッションと、時間上限付きのリトライ（指数バックオフ）
+- 存在しないページ（404）を記録して次回以降の取得を省略するネガティブキャッシュ
+- 接続・応答待ち／転送の所要時間、バイト数、リトライ回数、キャッシュの利用結果の計測（soumu_metrics）
+"""
+
+import os
+import gzip
+import json
+import time
+import random
+import hashlib
+import threading
+from datetime import datetime, timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from soumu_manifest import write_atomic, DEFAULT_STATE_DIR
+from soumu_metrics import get_metrics
+
+# キャッシュの保存先（既定）
+DEFAULT_CACHE_DIR = "soumu_cache"
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# 共有セッションの接続プールの大きさ（ホストごとの最大接続数）
+DEFAULT_POOL_SIZE = 16
+
+# ネガティブキャッシュの保存先（既定）
+DEFAULT_NOT_FOUND_PATH = os.path.join(DEFAULT_STATE_DIR, "not_found.json")
+
+# ネガティブキャッシュの有効期間（日）
+DEFAULT_NOT_FOUND_TTL_DAYS = 30
+
+# リトライ対象のステータスコード
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class CacheMissError(Exception):
+    """オフライン再生時にキャッシュが存在しない"""
+
+class PageNotFoundError(requests.HTTPError):
+    """ページが存在しない（404、またはネガティブキャッシュに記録済み）"""
+
+class RetryPolicy:
+    """
+    リトライ方針
+    - max_retries: 最大リトライ回数
+    - backoff: 初回の待機時間（秒）。以降は2倍ずつ増やす（ジッター付き）
+    - budget: 1ページの取得にかける時間の上限（秒）。超える場合はリトライしない
+    """
+    def __init__(self, max_retries=3, backoff=0.5, budget=60.0):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.budget = budget
+
+    def delay(self, attempt):
+        """attempt回目（0始まり）の失敗後の待機時間"""
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+
+DEFAULT_RETRY = RetryPolicy()
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session(pool_size=DEFAULT_POOL_SIZE):
+    """
+    共有セッションを返す（Keep-Aliveで接続を再利用する）
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+        return _session
+
+class NegativeCache:
+    """
+    存在しないページ（404）のURLを記録するキャッシュ
+    - 記録から ttl_days 日以内のURLは取得せずに PageNotFoundError とする
+    """
+    def __init__(self, path, ttl_days=DEFAULT_NOT_FOUND_TTL_DAYS):
+        self.path = path
+        self.ttl = timedelta(days=ttl_days)
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        else:
+            self.entries = {}
+
+    def __contains__(self, url):
+        checked_at = self.entries.get(url)
+        if checked_at is None:
+            return False
+        return datetime.now() - datetime.fromisoformat(checked_at) < self.ttl
+
+    def add(self, url):
+        with self.lock:
+            self.entries[url] = datetime.now().isoformat(timespec="seconds")
+            self._save()
+
+    def discard(self, url):
+        with self.lock:
+            if self.entries.pop(url, None) is not None:
+                self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        write_atomic(self.path, json.dumps(self.entries, ensure_ascii=False, indent=2, sort_keys=True))
+
+class Page:
+    """
+    取得したページ
+    - content: レスポンス本文（バイト列）
+    - encoding: レスポンスヘッダーから判定した文字エンコーディング（なければNone）
+    - from_cache: キャッシュから返したかどうか
+    - not_modified: 条件付きGETで 304 Not Modified だった（キャッシュなしの場合、contentはNone）
+    """
+    def __init__(self, url, content, headers, from_cache=False, not_modified=False):
+        self.url = url
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers)
+        self.encoding = get_encoding_from_headers(self.headers)
+        self.from_cache = from_cache
+        self.not_modified = not_modified
+
+class ResponseCache:
+    """
+    URLをキーにしたレスポンスのディスクキャッシュ
+    - <key>.json: URL・ヘッダー・ETag・Last-Modified・取得日時
+    - <key>.html.gz: gzip圧縮した本文
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".html.gz"
+
+    def get(self, url):
+        """
+        キャッシュ済みのメタ情報と本文を返す（なければ (None, None)）
+        """
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None, None
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            body = gzip.decompress(f.read())
+        return meta, body
+
+    def put(self, url, content, headers):
+        """
+        レスポンスの本文とヘッダーを保存する
+        """
+        meta_path, body_path = self._paths(url)
+        write_atomic(body_path, gzip.compress(content))
+        self._write_meta(meta_path, url, dict(headers))
+
+    def touch(self, url, meta):
+        """
+        304 Not Modified のとき、取得日時だけを更新する
+        """
+        meta_path, _ = self._paths(url)
+        self._write_meta(meta_path, url, meta["headers"])
+
+    def _write_meta(self, meta_path, url, headers):
+        headers = CaseInsensitiveDict(headers)
+        meta = {
+            "url": url,
+            "headers": dict(headers),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        write_atomic(meta_path, json.dumps(meta, ensure_ascii=False))
+
+def _get_with_retry(url, headers, timeout, retry, session):
+    """
+    時間上限付きでリトライしながらGETする
+    - 接続エラー・タイムアウト・429/5xxはリトライする
+    - それ以外のレスポンスはそのまま返す
+    - 所要時間はレスポンスヘッダーの受信まで（DNS・接続・応答待ち）と本文の転送に分けて記録する
+    """
+    metrics = get_metrics()
+    deadline = time.monotonic() + retry.budget
+    attempt = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        try:
+            start = time.perf_counter()
+            response = session.get(url, headers=headers, timeout=min(timeout, max(remaining, 0.1)))
+            elapsed = time.perf_counter() - start
+            # response.elapsed はリクエスト送信からレスポンスヘッダーの解析まで
+            headers_elapsed = min(response.elapsed.total_seconds(), elapsed)
+            metrics.observe("stage_duration_seconds", headers_elapsed, stage="connect")
+            metrics.observe("stage_duration_seconds", elapsed - headers_elapsed, stage="transfer")
+            metrics.observe("request_duration_seconds", elapsed)
+            metrics.inc("http_responses_total", status=response.status_code)
+            if response.status_code not in RETRY_STATUS_CODES:
+                return response
+            error = requests.HTTPError(f"{response.status_code} Server Error: {url}", response=response)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+
+        wait = retry.delay(attempt)
+        attempt += 1
+        if attempt > retry.max_retries or time.monotonic() + wait >= deadline:
+            raise error
+        metrics.inc("http_retries_total")
+        print(f"リトライ {attempt}/{retry.max_retries}（{wait:.1f}秒後）: {error}")
+        time.sleep(wait)
+
+def fetch_page(url, cache=None, offline=False, timeout=30, retry=DEFAULT_RETRY,
+               negative_cache=None, session=None, validators=None):
+    """
+    ページを取得する
+    - cacheを指定すると、キャッシュ済みのページは条件付きGETで再検証する（304なら本文を再利用）
+    - offline=Trueの場合はネットワークに接続せず、キャッシュのみを使う
+    - retry: 接続エラー・サーバーエラー時のリトライ方針
+    - negative_cacheを指定すると、404のページを記録し、次回以降は接続せずにPageNotFoundErrorとする
+    - validators: キャッシュを使わずに条件付きGETをする場合の {'etag': ..., 'last_modified': ...}
+      （304の場合は not_modified=True、content=None のPageを返す）
+    """
+    metrics = get_metrics()
+    if negative_cache is not None and url in negative_cache:
+        metrics.inc("cache_requests_total", result="not_found")
+        raise PageNotFoundError(f"404 Not Found（記録済み）: {url}")
+
+    meta, body = cache.get(url) if cache else (None, None)
+
+    if offline:
+        if meta is None:
+            metrics.inc("cache_requests_total", result="offline_miss")
+            raise CacheMissError(f"キャッシュがありません: {url}")
+        metrics.inc("cache_requests_total", result="offline_hit")
+        return Page(url, body, meta["headers"], from_cache=True)
+
+    headers = dict(DEFAULT_HEADERS)
+    validators = meta or validators
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    response = _get_with_retry(url, headers, timeout, retry, session or get_session())
+
+    if response.status_code == 404:
+        if negative_cache is not None:
+            negative_cache.add(url)
+        raise PageNotFoundError(f"404 Not Found: {url}", response=response)
+
+    if response.status_code == 304 and meta:
+        metrics.inc("cache_requests_total", result="hit")
+        cache.touch(url, meta)
+        return Page(url, body, meta["headers"], from_cache=True, not_modified=True)
+    if response.status_code == 304 and validators:
+        return Page(url, None, response.headers, not_modified=True)
+
+    response.raise_for_status()
+    metrics.observe("page_bytes", len(response.content))
+    if negative_cache is not None:
+        negative_cache.discard(url)
+    if cache:
+        metrics.inc("cache_requests_total", result="miss")
+        cache.put(url, response.content, response.headers)
+    return Page(url, response.content, response.headers)
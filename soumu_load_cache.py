@@ -0,0 +1,307 @@
+"""
+分析アプリでアップロードされたCSVの読み込みキャッシュ
+- ファイルの内容のSHA-256をキーに、読み込んだDataFrame（soumu_schema の型）と件数の集計（soumu_rollup）・検索インデックスを保持する
+- 検索・並べ替えの結果（行の位置）と、ダウンロード用に作成したファイルは検索条件ごとに保持する
+- 文字エンコーディングはBOMとバイト列から判定する（UTF-8 BOM / UTF-8 / CP932 / Shift_JIS。save_to_csv の全形式を読める）
+- 最近使っていないものから破棄する（件数とメモリ使用量の上限）
+- キャッシュはプロセスで1つ（get_load_cache）。Streamlitの再実行時・他のセッションでも共有される
+"""
+
+import io
+import sys
+import codecs
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from soumu_dates import format_date
+from soumu_schema import load_press_releases, memory_usage
+from soumu_search import NgramIndex
+from soumu_rollup import Rollup
+from soumu_similar import SimilarityIndex
+from soumu_export import export_bytes
+
+# キャッシュするファイル数の上限
+DEFAULT_MAX_ENTRIES = 8
+
+# キャッシュするデータ（DataFrame・インデックス・検索結果・ダウンロード用のファイル）のメモリ使用量の合計の上限（バイト）
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# 1ファイルあたりに保持する検索・並べ替えの結果（グラフ用の集計を含む）の数
+MAX_CACHED_QUERIES = 16
+
+# 1ファイルあたりに保持するダウンロード用のファイルの数
+MAX_CACHED_EXPORTS = 4
+
+def sniff_encoding(data, filename=None):
+    """
+    CSVのバイト列から文字エンコーディングを判定する
+    - BOMがあればUTF-8 BOM、UTF-8として正しければUTF-8
+    - それ以外はCP932（Shift_JISのWindows拡張。NEC特殊文字なども読める）。
+      ファイル名が save_to_csv の Shift_JIS 形式（_shift_jis.csv）ならShift_JIS
+    """
+    if data.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        data.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    candidates = ['cp932', 'shift_jis']
+    if filename and filename.lower().endswith('_shift_jis.csv'):
+        candidates.reverse()
+    for encoding in candidates:
+        try:
+            data.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            pass
+    # どれにも当てはまらない場合は読めない文字を置き換えて読む（read_csv側のエラーにしない）
+    return 'cp932'
+
+class LoadedCorpus:
+    """
+    読み込んだ1ファイル分のデータと、その集計結果・検索インデックス（必要になったときに1回だけ作る）
+    - on_grow: 集計結果・インデックス・検索結果などを追加したときに呼び出す処理（LoadCache の上限の確認）
+    """
+    def __init__(self, content_hash, df, encoding, baseline_bytes, on_grow=None):
+        self.content_hash = content_hash
+        self.df = df
+        self.encoding = encoding
+        self.baseline_bytes = baseline_bytes
+        self.frame_bytes = memory_usage(df)
+        self.on_grow = on_grow
+        self._derived = {}
+        self._derived_bytes = {}
+        self._queries = OrderedDict()
+        self._exports = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def memory_bytes(self):
+        """
+        DataFrameと、作成済みの集計結果・インデックス・検索結果・ダウンロード用のファイルのメモリ使用量（バイト）
+        """
+        with self._lock:
+            return (self.frame_bytes + sum(self._derived_bytes.values())
+                    + sum(estimate_nbytes(value) for value in self._queries.values())
+                    + sum(estimate_nbytes(value) for value in self._exports.values()))
+
+    def _get(self, name, build):
+        with self._lock:
+            if name in self._derived:
+                return self._derived[name]
+            value = self._derived[name] = build()
+            self._derived_bytes[name] = estimate_nbytes(value, exclude=self.df)
+        self._grew()
+        return value
+
+    def _put(self, entries, key, value, max_entries):
+        _lru_put(entries, key, value, max_entries, self._lock)
+        self._grew()
+
+    def _grew(self):
+        if self.on_grow is not None:
+            self.on_grow(self)
+
+    def search_index(self):
+        return self._get('search_index', lambda: NgramIndex.from_frame(self.df))
+
+    def similar_index(self, previous_path=None):
+        """
+        類似の報道資料の検索インデックス
+        - previous_path: スクレイパーが保存したインデックス（soumu_state/similar_index.npz）。
+          あれば同じ内容の行は出現回数を数え直さない（IDFと重みはアップロードされたファイルの行だけから計算する）
+        """
+        def build():
+            previous = SimilarityIndex.load(previous_path) if previous_path else None
+            return SimilarityIndex.build(self.df['内容'].tolist(), previous=previous)[0]
+        return self._get('similar_index', build)
+
+    def rollup(self):
+        return self._get('rollup', lambda: Rollup.from_frame(self.df, keep_rows=True))
+
+    def chart_counts(self, search_term=None):
+        """
+        グラフ用の部局別・日付別の件数（検索中は検索結果の行だけを、行数に比例する時間で集計する）
+        - 戻り値: (部局別の件数, 日付別の件数)
+        """
+        key = ('charts', search_term or '')
+        counts = _lru_get(self._queries, key, self._lock)
+        if counts is None:
+            rollup = self.rollup()
+            if search_term:
+                rollup = rollup.subset(self.query(search_term))
+            counts = (rollup.department_counts(), rollup.daily_counts())
+            self._put(self._queries, key, counts, MAX_CACHED_QUERIES)
+        return counts
+
+    def query(self, search_term=None, sort_by=None, ascending=True):
+        """
+        検索・並べ替えの結果（DataFrameのilocで使える行の位置）
+        - search_term: 検索式（soumu_search）。空なら全ての行
+        - sort_by: 並べ替える列（Noneなら元の順）。欠損値は最後
+        """
+        key = (search_term or '', sort_by, ascending)
+        positions = _lru_get(self._queries, key, self._lock)
+        if positions is not None:
+            return positions
+
+        if search_term:
+            positions = self.search_index().search(search_term)
+        else:
+            positions = np.arange(len(self.df), dtype=np.int32)
+        if sort_by:
+            values = self.df[sort_by].iloc[positions].reset_index(drop=True)
+            order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index
+            positions = positions[np.asarray(order)]
+        self._put(self._queries, key, positions, MAX_CACHED_QUERIES)
+        return positions
+
+    def cached_export(self, name, search_term=None, sort_by=None, ascending=True):
+        """
+        作成済みのダウンロード用のファイル（なければNone）
+        """
+        return _lru_get(self._exports, (name, search_term or '', sort_by, ascending), self._lock)
+
+    def export(self, name, search_term=None, sort_by=None, ascending=True):
+        """
+        検索・並べ替えの結果をダウンロード用のファイルにする（検索条件・形式ごとに1回だけ作成する）
+        - name: soumu_export.DOWNLOAD_FORMATS のキー
+        - 戻り値: (バイト列, 除外した文字のCounter)
+        """
+        key = (name, search_term or '', sort_by, ascending)
+        result = _lru_get(self._exports, key, self._lock)
+        if result is None:
+            df = self.df.iloc[self.query(search_term, sort_by, ascending)]
+            result = export_bytes(df if name == 'parquet' else _text_export_frame(df), name)
+            self._put(self._exports, key, result, MAX_CACHED_EXPORTS)
+        return result
+
+class LoadCache:
+    """
+    ファイルの内容のハッシュをキーにした読み込みキャッシュ（LRU、スレッドセーフ）
+    """
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def load(self, data, filename=None):
+        """
+        アップロードされたファイルの内容（バイト列）を読み込む（同じ内容なら前回の結果を返す）
+        - 戻り値: LoadedCorpus
+        """
+        content_hash = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            corpus = self.entries.get(content_hash)
+            if corpus is not None:
+                self.entries.move_to_end(content_hash)
+                self.hits += 1
+                return corpus
+            self.misses += 1
+
+        encoding = sniff_encoding(data, filename)
+        df, baseline = load_press_releases(io.BytesIO(data), encoding=encoding, encoding_errors='replace')
+        corpus = LoadedCorpus(content_hash, df, encoding, baseline, on_grow=self._grown)
+
+        with self._lock:
+            # 同時に同じファイルを読み込んだ場合は先に登録されたものを使う
+            corpus = self.entries.setdefault(content_hash, corpus)
+            self.entries.move_to_end(content_hash)
+            self._evict()
+        return corpus
+
+    def _grown(self, corpus):
+        """
+        読み込み済みのファイルのインデックス・検索結果などが増えたら、上限を超えた分を破棄し直す
+        """
+        with self._lock:
+            if self.entries.get(corpus.content_hash) is corpus:
+                self.entries.move_to_end(corpus.content_hash)
+            self._evict()
+
+    def _evict(self):
+        total = sum(corpus.memory_bytes for corpus in self.entries.values())
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries or total > self.max_bytes):
+            _, corpus = self.entries.popitem(last=False)
+            total -= corpus.memory_bytes
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+def estimate_nbytes(value, exclude=None, seen=None):
+    """
+    キャッシュする値のおおよそのメモリ使用量（バイト）
+    - numpyの配列・pandasのDataFrame/Series・バイト列・文字列と、それらを含むlist/tuple/dict/オブジェクトの属性を数える
+    - exclude: 数えないオブジェクト（読み込んだDataFrameなど、別に数えているもの）
+    - 同じオブジェクトは1回だけ数える
+    """
+    if seen is None:
+        seen = set()
+        if exclude is not None:
+            seen.add(id(exclude))
+    if value is None or id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return memory_usage(value)
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(key, seen=seen) + estimate_nbytes(item, seen=seen)
+                                          for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item, seen=seen) for item in value)
+    if hasattr(value, '__dict__'):
+        return estimate_nbytes(vars(value), seen=seen)
+    return sys.getsizeof(value)
+
+def _lru_get(entries, key, lock):
+    with lock:
+        value = entries.get(key)
+        if value is not None:
+            entries.move_to_end(key)
+        return value
+
+def _lru_put(entries, key, value, max_entries, lock):
+    with lock:
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > max_entries:
+            entries.popitem(last=False)
+
+def _text_export_frame(df):
+    """
+    CSV・TSV用に、発表日をスクレイパーの出力と同じ「2025年9月9日」形式に戻し、欠損値を空文字にする
+    """
+    df = df.copy()
+    if '発表日' in df.columns and pd.api.types.is_datetime64_any_dtype(df['発表日']):
+        dates = df['発表日']
+        mapping = {value: format_date(value) for value in dates.dropna().unique()}
+        df['発表日'] = dates.map(mapping).astype(object).where(dates.notna(), '')
+    for col in df.columns:
+        if df[col].dtype == 'object' or str(df[col].dtype) in ('string', 'str'):
+            df[col] = df[col].astype(object).where(df[col].notna(), '')
+    return df
+
+_load_cache = LoadCache()
+
+def get_load_cache():
+    """
+    プロセスで共有する読み込みキャッシュ
+    """
+    return _load_cache
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+模擬サイト（soumu_mock_server）を使ったスクレイピング全体の負荷試験
+- scrape_all_months → save_to_csv を並列数・解析プロセス数の組み合わせごとに実行する
+- 計測項目: ページ/秒、HTTPリクエストの所要時間（p50/p95/p99/最大）、最大メモリ使用量（RSS）、保存時間
+- 組み合わせごとに別プロセスで実行する（メモリ使用量を正しく測るため。模擬サイトは親プロセスで動かす）
+使用方法: python soumu_load_test.py --workers 1,4,8,16 --latency 0.05 --error-rate 0.02
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import tempfile
+import itertools
+import contextlib
+import subprocess
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Windowsではメモリ使用量を計測しない
+    resource = None
+
+from soumu_mock_server import start_server, add_config_arguments, config_from_args
+
+def run_single(options):
+    """
+    1つの組み合わせを実行して計測結果を返す（子プロセスで実行する）
+    """
+    from soumu_scraper import scrape_all_months, save_to_csv, generate_date_urls
+    from soumu_metrics import get_metrics
+
+    metrics = get_metrics()
+    metrics.reset()
+    pages = len(generate_date_urls(options["start_year"], options["end_year"]))
+
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        df = scrape_all_months(options["start_year"], options["end_year"],
+                               workers=options["workers"], rate_limit=options["rate_limit"],
+                               parse_workers=options["parse_workers"], parser=options["parser"],
+                               not_found_path=None, base_url=options["base_url"])
+        scraped = time.perf_counter()
+        save_to_csv(df, os.path.join(workdir, "load_test.csv"))
+        saved = time.perf_counter()
+
+    summary = metrics.summary()
+    requests = summary["histograms"]["request_duration_seconds"][0]
+    retries = sum(counter["value"] for counter in summary["counters"].get("http_retries_total", []))
+    # Linuxのru_maxrssはKB単位
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else None
+    if peak_rss is not None and sys.platform == "darwin":
+        peak_rss /= 1024
+
+    return {
+        "workers": options["workers"],
+        "parse_workers": options["parse_workers"],
+        "pages": pages,
+        "rows": len(df),
+        "scrape_seconds": scraped - start,
+        "save_seconds": saved - scraped,
+        "pages_per_second": pages / (scraped - start),
+        "requests": requests["count"],
+        "retries": retries,
+        "latency_p50": requests["p50"],
+        "latency_p95": requests["p95"],
+        "latency_p99": requests["p99"],
+        "latency_max": requests["max"],
+        "peak_rss_mb": peak_rss,
+    }
+
+def run_in_subprocess(options):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", json.dumps(options)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def print_result(result):
+    rss = f"{result['peak_rss_mb']:.0f}MB" if result["peak_rss_mb"] is not None else "-"
+    print(f"  並列{result['workers']:>3} / 解析{result['parse_workers']:>2}: "
+          f"{result['pages_per_second']:6.1f}ページ/秒 | "
+          f"p50 {result['latency_p50'] * 1000:6.1f}ms / p95 {result['latency_p95'] * 1000:6.1f}ms / "
+          f"p99 {result['latency_p99'] * 1000:6.1f}ms | リトライ {result['retries']}回 | "
+          f"最大RSS {rss} | 保存 {result['save_seconds']:.2f}秒 | {result['rows']}件")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="模擬サイトを使ったスクレイピング全体の負荷試験")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--workers", default="1,4,8,16", help="並列取得数（カンマ区切り）")
+    parser.add_argument("--parse-workers", default="0", help="解析用のプロセス数（カンマ区切り、0はパイプラインなし）")
+    parser.add_argument("--start-year", type=int, default=2009)
+    parser.add_argument("--end-year", type=int, default=None)
+    parser.add_argument("--rate-limit", type=float, default=0,
+                        help="ホストごとの最大リクエスト数/秒（0は制限なし）")
+    parser.add_argument("--parser", choices=["bs4", "lxml"], default="bs4", help="HTMLパーサー")
+    parser.add_argument("--output", default=None, help="結果の保存先（既定: load_test_YYYYMMDD_HHMMSS.json）")
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_single(json.loads(args.child))))
+        return
+
+    server, base_url = start_server(config=config_from_args(args))
+    print("=== 総務省報道資料スクレイピング 負荷試験 ===")
+    print(f"模擬サイト: {base_url}（遅延 {args.latency}秒 / エラー率 {args.error_rate} / "
+          f"低速応答 {args.slow_rate} / {args.encoding}）")
+
+    results = []
+    try:
+        for workers, parse_workers in itertools.product(
+                [int(value) for value in args.workers.split(",")],
+                [int(value) for value in args.parse_workers.split(",")]):
+            options = dict(start_year=args.start_year, end_year=args.end_year, workers=workers,
+                           parse_workers=parse_workers, rate_limit=args.rate_limit or None,
+                           parser=args.parser, base_url=base_url)
+            result = run_in_subprocess(options)
+            print_result(result)
+            results.append(result)
+    finally:
+        server.shutdown()
+
+    output = args.output or f"load_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"server": vars(args), "server_stats": server.config.stats, "results": results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"\n📁 結果: {output}")
+
+if __name__ == "__main__":
+    main()
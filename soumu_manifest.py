@@ -0,0 +1,148 @@
+"""
+総務省報道資料スクレイピングの取得状況マニフェスト
+- 月ごとに取得日時・件数・内容ハッシュ・成否を記録する
+- 月ごとの取得結果をJSONで保存し、差分取得・中断からの再開に使う
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from datetime import datetime, date
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+# 状態ファイルの保存先（既定）
+DEFAULT_STATE_DIR = "soumu_state"
+
+# 毎回取り直す「更新中の月」の数（当月と前月）
+DEFAULT_OPEN_MONTHS = 2
+
+def month_key(url_info):
+    """
+    URL情報から月のキー（例: 2025-01）を作る
+    """
+    return f"{url_info['year']}-{url_info['month']:02d}"
+
+def open_month_keys(open_months=DEFAULT_OPEN_MONTHS, today=None):
+    """
+    更新中とみなす月のキーを返す（当月から遡ってopen_months件）
+    """
+    today = today or date.today()
+    first = date(today.year, today.month, 1)
+    return {
+        (first - relativedelta(months=i)).strftime("%Y-%m")
+        for i in range(open_months)
+    }
+
+def write_atomic(path, data):
+    """
+    一時ファイルに書き込んでから置き換える（中断時に壊れたファイルを残さない）
+    - data: 文字列（UTF-8で保存）またはバイト列
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class MonthManifest:
+    """
+    月ごとの取得状況を管理するマニフェスト
+    - state_dir/manifest.json: 月ごとの取得日時・件数・内容ハッシュ・成否
+    - state_dir/months/YYYY-MM.json: 月ごとの取得結果（レコードのリスト）
+    """
+    def __init__(self, state_dir=DEFAULT_STATE_DIR):
+        self.state_dir = state_dir
+        self.path = os.path.join(state_dir, "manifest.json")
+        self.months_dir = os.path.join(state_dir, "months")
+        os.makedirs(self.months_dir, exist_ok=True)
+
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f).get("months", {})
+        else:
+            self.entries = {}
+
+    def months_to_fetch(self, urls, open_months=DEFAULT_OPEN_MONTHS):
+        """
+        取得が必要な月を返す
+        - 未取得の月
+        - 前回失敗した月
+        - 更新中の月（当月・前月）
+        """
+        open_keys = open_month_keys(open_months)
+        targets = []
+        for url_info in urls:
+            key = month_key(url_info)
+            entry = self.entries.get(key)
+            if entry is None or entry["status"] != "success" or key in open_keys:
+                targets.append(url_info)
+        return targets
+
+    def record(self, url_info, df, validators=None):
+        """
+        1ヶ月分の取得結果を記録してチェックポイントを保存する
+        - validators: 次回の条件付きGETに使う {'etag': ..., 'last_modified': ...}
+        """
+        key = month_key(url_info)
+        entry = self.entries.get(key, {})
+        entry.update({
+            "url": url_info["url"],
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+        })
+        if validators is not None:
+            entry["validators"] = validators
+
+        if df.empty:
+            # 失敗時は前回のデータファイルを残し、次回再取得する
+            entry.update({"status": "failed", "rows": 0})
+        else:
+            text = json.dumps(df.to_dict("records"), ensure_ascii=False)
+            content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            filename = f"{key}.json"
+            if content_hash != entry.get("hash"):
+                write_atomic(os.path.join(self.months_dir, filename), text)
+            entry.update({
+                "status": "success",
+                "rows": len(df),
+                "hash": content_hash,
+                "file": filename,
+            })
+
+        self.entries[key] = entry
+        self.save()
+
+    def validators(self, url_info):
+        """
+        前回の取得時のETag / Last-Modified（なければNone）
+        """
+        return self.entries.get(month_key(url_info), {}).get("validators")
+
+    def load_month(self, url_info):
+        """
+        保存済みの1ヶ月分の取得結果をDataFrameで返す（なければ空）
+        """
+        entry = self.entries.get(month_key(url_info))
+        if not entry or "file" not in entry:
+            return pd.DataFrame()
+        path = os.path.join(self.months_dir, entry["file"])
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        with open(path, encoding="utf-8") as f:
+            return pd.DataFrame(json.load(f))
+
+    def save(self):
+        """
+        マニフェストを保存する
+        """
+        text = json.dumps({"months": self.entries}, ensure_ascii=False, indent=2, sort_keys=True)
+        write_atomic(self.path, text)
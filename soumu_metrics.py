@@ -0,0 +1,231 @@
+"""
+スクレイピングの処理段階ごとの計測（メトリクス）
+- 段階ごとの所要時間（接続・応答待ち、転送、デコード、HTML解析、DataFrame作成、保存）のヒストグラム
+- 1ヶ月ごとのページのバイト数・件数のヒストグラム
+- リトライ回数・HTTPステータス・レスポンスキャッシュのヒット率のカウンター
+- JSONの集計結果と、Prometheusのテキスト形式（node_exporterのtextfileコレクター用）で保存できる
+"""
+
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+from soumu_manifest import write_atomic
+
+# Prometheusのメトリクス名の接頭辞
+METRIC_PREFIX = "soumu_"
+
+# 所要時間のヒストグラムの区切り（秒）
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# バイト数のヒストグラムの区切り
+BYTE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# 件数のヒストグラムの区切り
+ROW_BUCKETS = (0, 10, 50, 100, 200, 500, 1000)
+
+# メトリクスの定義: 名前 → (種類, 説明, ヒストグラムの区切り)
+METRIC_DEFINITIONS = {
+    "stage_duration_seconds": ("histogram", "処理段階ごとの所要時間（秒）", DURATION_BUCKETS),
+    "request_duration_seconds": ("histogram", "HTTPリクエスト1回の所要時間（秒、リトライは別に数える）", DURATION_BUCKETS),
+    "page_bytes": ("histogram", "取得したページのバイト数", BYTE_BUCKETS),
+    "month_rows": ("histogram", "1ヶ月あたりの報道資料の件数", ROW_BUCKETS),
+    "http_responses_total": ("counter", "HTTPステータスごとのレスポンス数", None),
+    "http_retries_total": ("counter", "リトライ回数", None),
+    "cache_requests_total": ("counter", "レスポンスキャッシュの利用結果ごとの件数", None),
+}
+
+# キャッシュのヒットとみなす結果（cache_requests_total の result ラベル）
+CACHE_HIT_RESULTS = ("hit", "offline_hit")
+
+# 処理段階（stage ラベル）の表示名
+STAGE_LABELS = {
+    "connect": "DNS・接続・応答待ち",
+    "transfer": "本文の転送",
+    "decode": "文字コードのデコード",
+    "parse": "HTML解析",
+    "dataframe": "DataFrame作成",
+    "save_csv": "CSV保存",
+    "save_parquet": "Parquet保存",
+    "save_sqlite": "SQLite保存",
+    "save_stream": "逐次出力",
+}
+
+class Histogram:
+    """
+    区切りごとの件数と観測値を保持するヒストグラム
+    """
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.values = []
+
+    def observe(self, value):
+        self.values.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+
+    def quantile(self, q):
+        values = sorted(self.values)
+        return values[min(int(q * len(values)), len(values) - 1)]
+
+    def summary(self):
+        count = len(self.values)
+        total = sum(self.values)
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count,
+            "min": min(self.values),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": max(self.values),
+        }
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metrics:
+    """
+    メトリクスの集計（スレッドセーフ）
+    - observe: ヒストグラムに値を追加する
+    - inc: カウンターを加算する
+    - stage: with文で囲んだ処理の所要時間を stage_duration_seconds に記録する
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+            self.counters = {}
+
+    def observe(self, name, value, **labels):
+        buckets = METRIC_DEFINITIONS[name][2]
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            key = _label_key(labels)
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + amount
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_duration_seconds", time.perf_counter() - start, stage=name)
+
+    def cache_hit_rate(self):
+        """
+        レスポンスキャッシュのヒット率（キャッシュを使っていない場合はNone）
+        """
+        with self.lock:
+            results = {dict(key).get("result"): count
+                       for key, count in self.counters.get("cache_requests_total", {}).items()}
+        total = sum(results.values())
+        if not total:
+            return None
+        return sum(results.get(result, 0) for result in CACHE_HIT_RESULTS) / total
+
+    def summary(self):
+        """
+        JSONで保存する集計結果
+        """
+        with self.lock:
+            histograms = {
+                name: [dict(labels=dict(key), **histogram.summary()) for key, histogram in series.items()]
+                for name, series in self.histograms.items()
+            }
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self.counters.items()
+            }
+        return {"histograms": histograms, "counters": counters, "cache_hit_rate": self.cache_hit_rate()}
+
+    def to_prometheus(self):
+        """
+        Prometheusのテキスト形式に変換する
+        """
+        lines = []
+        with self.lock:
+            for name, (kind, description, _) in METRIC_DEFINITIONS.items():
+                metric = METRIC_PREFIX + name
+                if kind == "histogram" and name in self.histograms:
+                    lines.append(f"# HELP {metric} {description}")
+                    lines.append(f"# TYPE {metric} histogram")
+                    for key, histogram in sorted(self.histograms[name].items()):
+                        for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                            bucket_labels = _format_labels(key + (("le", _format_number(float(bound))),))
+                            lines.append(f"{metric}_bucket{bucket_labels} {count}")
+                        lines.append(f"{metric}_bucket{_format_labels(key + (('le', '+Inf'),))} {len(histogram.values)}")
+                        lines.append(f"{metric}_sum{_format_labels(key)} {_format_number(float(sum(histogram.values)))}")
+                        lines.append(f"{metric}_count{_format_labels(key)} {len(histogram.values)}")
+                elif kind == "counter" and name in self.counters:
+                    lines.append(f"# HELP {metric} {description}")
+                    lines.append(f"# TYPE {metric} counter")
+                    for key, value in sorted(self.counters[name].items()):
+                        lines.append(f"{metric}{_format_labels(key)} {value}")
+        hit_rate = self.cache_hit_rate()
+        if hit_rate is not None:
+            lines.append(f"# HELP {METRIC_PREFIX}cache_hit_ratio レスポンスキャッシュのヒット率")
+            lines.append(f"# TYPE {METRIC_PREFIX}cache_hit_ratio gauge")
+            lines.append(f"{METRIC_PREFIX}cache_hit_ratio {_format_number(hit_rate)}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        write_atomic(path, json.dumps(self.summary(), ensure_ascii=False, indent=2))
+
+    def write_prometheus(self, path):
+        # textfileコレクターが書きかけのファイルを読まないように置き換えで保存する
+        write_atomic(path, self.to_prometheus())
+
+    def print_summary(self):
+        """
+        処理段階ごとの所要時間の内訳を表示する
+        """
+        print("\n=== 処理時間の内訳 ===")
+        with self.lock:
+            stages = dict(self.histograms.get("stage_duration_seconds", {}))
+            retries = sum(self.counters.get("http_retries_total", {}).values())
+        for key, histogram in stages.items():
+            stage = dict(key)["stage"]
+            summary = histogram.summary()
+            print(f"  {STAGE_LABELS.get(stage, stage)}: 合計 {summary['sum']:.2f}秒 / {summary['count']}回 / "
+                  f"平均 {summary['mean'] * 1000:.1f}ms / p95 {summary['p95'] * 1000:.1f}ms")
+        print(f"  リトライ: {retries}回")
+        hit_rate = self.cache_hit_rate()
+        if hit_rate is not None:
+            print(f"  キャッシュヒット率: {hit_rate:.1%}")
+
+# プロセス全体で共有するメトリクス
+_metrics = Metrics()
+
+def get_metrics():
+    """
+    共有のメトリクスを返す
+    """
+    return _metrics
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+総務省の報道資料一覧ページの模擬サイト（ローカルでの負荷試験用）
+- generate_date_urls と同じ YYMMm.html 形式の一覧ページを生成して返す（2023年10月のみ 2310.html）
+- 存在しない月（既定: 2013年5月・2018年11月、未来の月）は404を返す
+- 応答の遅延・サーバーエラー（503）・低速な転送・Shift_JIS / UTF-8 のエンコーディングを指定できる
+- ETag / Last-Modified による条件付きGET（304）に対応する
+使用方法: python soumu_mock_server.py --port 8765 --latency 0.05 --error-rate 0.05
+         python soumu_scraper.py --base-url http://127.0.0.1:8765/menu_news/s-news/ --workers 8
+"""
+
+import re
+import time
+import random
+import hashlib
+import argparse
+import threading
+from datetime import date
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 一覧ページのパス（YYMMm.html、2023年10月のみ 2310.html）
+PATH_PATTERN = re.compile(r"^/menu_news/s-news/(\d{2})(\d{2})(m?)\.html$")
+
+# 既定で404を返す月（YYMM）
+DEFAULT_MISSING_MONTHS = ("1305", "1811")
+
+# 1ヶ月あたりの既定の件数（実際の一覧ページの平均程度）
+DEFAULT_ROWS_PER_MONTH = 90
+
+# 本文のエンコーディング（mixed: 奇数月はShift_JIS、偶数月はUTF-8）
+ENCODINGS = ("shift_jis", "utf-8", "mixed")
+
+DEPARTMENTS = [
+    ("情報流通行政局", "ryutsu"), ("総合通信基盤局", "kiban"), ("自治行政局", "gyosei"),
+    ("自治財政局", "zaisei"), ("自治税務局", "zeimu"), ("統計局", "toukei"),
+    ("大臣官房", "kanbo"), ("行政評価局", "hyouka"), ("国際戦略局", "kokusai"), ("消防庁", "syoubo"),
+]
+
+TITLES = [
+    "{law}の一部を改正する省令案に関する意見募集",
+    "{law}の一部を改正する省令案に対する意見募集の結果",
+    "情報通信審議会 {group}（第{n}回）の開催について",
+    "家計調査報告（二人以上の世帯）{year}年{month}月分",
+    "消費者物価指数 全国 {year}年{month}月分",
+    "{group}の開催",
+    "「{group}」報告書の公表",
+    "令和{reiwa}年度{law}に基づく交付額の決定",
+]
+
+LAWS = ["電波法施行規則", "放送法施行規則", "電気通信事業法施行規則", "地方財政法", "地方税法", "統計法"]
+GROUPS = ["電波政策懇談会", "デジタル変革時代のICTグローバル戦略懇談会", "地方財政審議会", "統計委員会", "消防審議会"]
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="{charset}">
+<title>報道資料一覧（{year}年{month}月）｜総務省</title>
+</head>
+<body>
+<div id="header"><a href="/index.html">総務省</a></div>
+<div id="contentsWrapper">
+<h1>報道資料一覧（{year}年{month}月）</h1>
+<table class="tableList">
+<tr><th scope="col">日付</th><th scope="col">報道資料件名</th><th scope="col">担当</th></tr>
+"""
+
+PAGE_ROW = """<tr>
+<td>{year}年{month}月{day}日</td>
+<td><a href="/menu_news/s-news/01{code}{n:02d}_{id:08d}.html">{title}</a></td>
+<td>{department}</td>
+</tr>
+"""
+
+PAGE_FOOT = """</table>
+<table class="pageLink"><tr><td><a href="#">前月</a></td><td><a href="#">翌月</a></td></tr></table>
+</div>
+<div id="footer"><p>Copyright &copy; Ministry of Internal Affairs and Communications</p></div>
+</body>
+</html>
+"""
+
+def render_month(year, month, rows=DEFAULT_ROWS_PER_MONTH):
+    """
+    1ヶ月分の一覧ページのHTML（文字列）を生成する（同じ月は常に同じ内容）
+    """
+    rng = random.Random(year * 100 + month)
+    count = max(1, int(rows * rng.uniform(0.7, 1.3)))
+    days = sorted((rng.randint(1, 28) for _ in range(count)), reverse=True)
+    body = []
+    for i, day in enumerate(days):
+        department, code = rng.choice(DEPARTMENTS)
+        title = rng.choice(TITLES).format(
+            law=rng.choice(LAWS), group=rng.choice(GROUPS), n=rng.randint(1, 50),
+            year=year, month=month, reiwa=max(year - 2018, 1),
+        )
+        body.append(PAGE_ROW.format(year=year, month=month, day=day, code=code, n=rng.randint(1, 9),
+                                    id=year * 100000 + month * 1000 + i, title=title, department=department))
+    return "".join(body)
+
+class MockSiteConfig:
+    """
+    模擬サイトの設定
+    - latency / jitter: 応答前の待ち時間（秒、latency + 0～jitter）
+    - error_rate: 503を返す割合
+    - slow_rate / slow_seconds: 本文を少しずつ送る応答の割合と、本文の送信にかける時間（秒）
+    - encoding: 'shift_jis'（Content-Typeにcharsetなし）、'utf-8'（charset=UTF-8）、'mixed'
+    - missing_months: 404を返す月（YYMM）
+    """
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, slow_rate=0.0, slow_seconds=1.0,
+                 encoding="shift_jis", rows=DEFAULT_ROWS_PER_MONTH, missing_months=DEFAULT_MISSING_MONTHS,
+                 seed=0):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"encodingは {', '.join(ENCODINGS)} のいずれかです: {encoding}")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.encoding = encoding
+        self.rows = rows
+        self.missing_months = set(missing_months)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.pages = {}
+        self.stats = {"requests": 0, "200": 0, "304": 0, "404": 0, "503": 0, "slow": 0}
+
+    def random(self):
+        with self.lock:
+            return self.rng.random()
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def page(self, year, month):
+        """
+        一覧ページの (本文のバイト列, Content-Type, ETag) を返す（生成結果は使い回す）
+        """
+        key = (year, month)
+        if key not in self.pages:
+            encoding = self.encoding
+            if encoding == "mixed":
+                encoding = "shift_jis" if month % 2 else "utf-8"
+            charset = "Shift_JIS" if encoding == "shift_jis" else "UTF-8"
+            html = (PAGE_HEAD.format(charset=charset, year=year, month=month)
+                    + render_month(year, month, self.rows) + PAGE_FOOT)
+            content = html.encode(encoding, errors="xmlcharrefreplace")
+            # 実際のサイトと同じく、Shift_JISの場合はContent-Typeにcharsetを付けない
+            content_type = "text/html" if encoding == "shift_jis" else "text/html; charset=UTF-8"
+            etag = '"' + hashlib.md5(content).hexdigest() + '"'
+            with self.lock:
+                self.pages[key] = (content, content_type, etag)
+        return self.pages[key]
+
+def make_handler(config):
+    class MockSiteHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        last_modified = "Mon, 01 Sep 2025 00:00:00 GMT"
+
+        def log_message(self, *args):
+            pass
+
+        def send_empty(self, status):
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            config.count(str(status))
+
+        def do_GET(self):
+            config.count("requests")
+            delay = config.latency + (config.jitter * config.random() if config.jitter else 0)
+            if delay:
+                time.sleep(delay)
+
+            match = PATH_PATTERN.match(self.path.split("?")[0])
+            if not match:
+                self.send_empty(404)
+                return
+            year, month = 2000 + int(match.group(1)), int(match.group(2))
+            irregular = (year, month) == (2023, 10)
+            if (not 1 <= month <= 12 or bool(match.group(3)) == irregular
+                    or match.group(1) + match.group(2) in config.missing_months
+                    or date(year, month, 1) > date.today()):
+                self.send_empty(404)
+                return
+            if config.error_rate and config.random() < config.error_rate:
+                self.send_empty(503)
+                return
+
+            content, content_type, etag = config.page(year, month)
+            if self.headers.get("If-None-Match") == etag:
+                self.send_empty(304)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(content)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", self.last_modified)
+            self.end_headers()
+            if config.slow_rate and config.random() < config.slow_rate:
+                # 本文を10回に分けて送る
+                config.count("slow")
+                size = -(-len(content) // 10)
+                for start in range(0, len(content), size):
+                    self.wfile.write(content[start:start + size])
+                    self.wfile.flush()
+                    time.sleep(config.slow_seconds / 10)
+            else:
+                self.wfile.write(content)
+            config.count("200")
+
+    return MockSiteHandler
+
+def start_server(host="127.0.0.1", port=0, config=None):
+    """
+    模擬サイトを別スレッドで起動する
+    - port=0 の場合は空いているポートを使う
+    - 戻り値: (サーバー, 一覧ページのURLの先頭)
+    """
+    config = config or MockSiteConfig()
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    server.config = config
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://{host}:{server.server_address[1]}/menu_news/s-news/"
+    return server, base_url
+
+def add_config_arguments(parser):
+    """
+    模擬サイトの設定の引数を追加する（負荷試験のハーネスと共通）
+    """
+    parser.add_argument("--latency", type=float, default=0.0, help="応答前の待ち時間（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="待ち時間に加える0～指定秒のばらつき")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503を返す割合（0～1）")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="本文を少しずつ送る応答の割合（0～1）")
+    parser.add_argument("--slow-seconds", type=float, default=1.0, help="低速な応答で本文の送信にかける時間（秒）")
+    parser.add_argument("--encoding", choices=ENCODINGS, default="shift_jis",
+                        help="本文のエンコーディング（mixed: 奇数月Shift_JIS・偶数月UTF-8）")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS_PER_MONTH, help="1ヶ月あたりの平均件数")
+    parser.add_argument("--missing", default=",".join(DEFAULT_MISSING_MONTHS),
+                        help="404を返す月（YYMMのカンマ区切り）")
+    parser.add_argument("--seed", type=int, default=0, help="エラー・低速応答の乱数の種")
+
+def config_from_args(args):
+    return MockSiteConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                          slow_rate=args.slow_rate, slow_seconds=args.slow_seconds, encoding=args.encoding,
+                          rows=args.rows, missing_months=[m for m in args.missing.split(",") if m],
+                          seed=args.seed)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="総務省の報道資料一覧ページの模擬サイト")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server, base_url = start_server(args.host, args.port, config_from_args(args))
+    print(f"模擬サイトを起動しました: {base_url}")
+    print(f"💡 python soumu_scraper.py --base-url {base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n停止しました: {server.config.stats}")
+
+if __name__ == "__main__":
+    main()
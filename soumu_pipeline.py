@@ -0,0 +1,93 @@
+"""
+取得と解析を分離したパイプライン処理
+- 取得（I/O待ち）はスレッドプールで並列に行う
+- 解析（CPU処理）はプロセスプールで全コアを使って行う
+- 取得は次に返すものから上限件数先までに限り、取得済み・解析済みで返していないデータを上限件数までに保つ
+  （時間のかかる月があってもメモリ使用量を一定に保つ）
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# 取得済み・解析済みで返していないデータを保持する上限件数（既定）
+DEFAULT_QUEUE_SIZE = 32
+
+def _put(q, item, stop):
+    """
+    キューに空きができるまで待って追加する（中断時は諦める）
+    """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+def run_pipeline(items, fetch, parse, fetch_workers=4, parse_workers=None, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    itemsを取得・解析し、(item, 解析結果, 例外) を入力と同じ順序で返すジェネレーター
+    - fetch(item): スレッドで実行。parseに渡す引数のタプルを返す（Noneなら解析しない）
+    - parse(*args): プロセスで実行。モジュールのトップレベル関数であること（pickle可能）
+    - 取得時・解析時の例外は3番目の要素で返す（解析結果はNone）
+    """
+    items = list(items)
+    parse_workers = parse_workers or os.cpu_count() or 1
+    fetched = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def fetch_stage(index):
+        payload, error = None, None
+        try:
+            payload = fetch(items[index])
+        except Exception as e:
+            error = e
+        _put(fetched, (index, payload, error), stop)
+
+    fetchers = ThreadPoolExecutor(max_workers=fetch_workers)
+    parsers = ProcessPoolExecutor(max_workers=parse_workers)
+    try:
+        pending = {}   # index -> (Future または None, 取得時の例外)
+        next_index = 0
+        submitted = 0
+        received = 0
+
+        while next_index < len(items):
+            # 取得は次に返すものから queue_size 件先までに限る（時間のかかる月があっても、
+            # それ以降の取得済み・解析済みのデータは queue_size 件までしか溜まらない）
+            while submitted < len(items) and submitted - next_index < queue_size:
+                fetchers.submit(fetch_stage, submitted)
+                submitted += 1
+
+            # 入力順に、解析の終わったものから返す（取得を始めたものを全て受け取った後は終わるまで待つ）
+            entry = pending.get(next_index)
+            if entry is not None and (_is_ready(entry) or received == submitted):
+                future, error = pending.pop(next_index)
+                yield _result(items[next_index], future, error)
+                next_index += 1
+                continue
+
+            # 取得済みのデータを解析に回す
+            index, payload, error = fetched.get()
+            received += 1
+            if payload is None:
+                pending[index] = (None, error)
+            else:
+                pending[index] = (parsers.submit(parse, *payload), None)
+    finally:
+        stop.set()
+        fetchers.shutdown(wait=True, cancel_futures=True)
+        parsers.shutdown(wait=True, cancel_futures=True)
+
+def _is_ready(entry):
+    future, _ = entry
+    return future is None or future.done()
+
+def _result(item, future, error):
+    if future is None:
+        return item, None, error
+    try:
+        return item, future.result(), None
+    except Exception as e:
+        return item, None, e
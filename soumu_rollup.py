@@ -0,0 +1,175 @@
+"""
+報道資料の件数の集計（ロールアップ）
+- 部局×日の件数を対象期間（月の一覧ページ）ごとに持ち、部局×月・部局×年の件数はそこから作る
+- 差分の反映は対象期間単位（取得し直した月の件数だけを置き換える。差分取得・監視モード・逐次出力で共通）
+- soumu_state/rollup.json.gz に保存し、一括スクレイピングの統計表示で使う
+- 行ごとの集計セルの番号を持たせると（from_frame(keep_rows=True)）、検索結果などの一部の行の集計を
+  該当する行数に比例する時間で作れる（分析アプリのグラフ用）
+"""
+
+import os
+import json
+import gzip
+
+import numpy as np
+import pandas as pd
+
+from soumu_manifest import write_atomic, DEFAULT_STATE_DIR
+from soumu_dates import parse_dates
+
+# 集計のファイル名（差分取得のマニフェストと同じディレクトリに置く）
+ROLLUP_FILENAME = "rollup.json.gz"
+
+# 集計の保存先（既定）
+DEFAULT_ROLLUP_PATH = os.path.join(DEFAULT_STATE_DIR, ROLLUP_FILENAME)
+
+# 集計の列（部局×日、対象期間ごと）
+CELL_COLUMNS = ['対象期間', '部局', '日付', '件数']
+
+class Rollup:
+    """
+    部局×日の件数（対象期間ごと）
+    - cells: 対象期間・部局・日付（datetime64、発表日を解釈できない行はNaT）・件数 のDataFrame
+    - row_cells: 行ごとの集計セルの番号（cellsの位置。from_frame(keep_rows=True) の場合のみ）
+    """
+    def __init__(self, cells=None, row_cells=None):
+        if cells is None:
+            cells = pd.DataFrame({'対象期間': pd.Series(dtype=object), '部局': pd.Series(dtype=object),
+                                  '日付': pd.Series(dtype='datetime64[ns]'), '件数': pd.Series(dtype='int64')})
+        self.cells = cells.reset_index(drop=True)
+        self.row_cells = row_cells
+
+    @classmethod
+    def from_frame(cls, df, keep_rows=False):
+        """
+        報道資料のDataFrameから集計を作る
+        - 発表日は文字列（「2025年9月9日」）・日付型のどちらでもよい
+        """
+        dates = df['発表日']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = parse_dates(dates)
+        keys = pd.DataFrame({
+            '対象期間': df['対象期間'].astype(object).where(df['対象期間'].notna(), '').to_numpy(),
+            '部局': df['部局'].astype(object).where(df['部局'].notna(), '').to_numpy(),
+            '日付': pd.to_datetime(dates).to_numpy(),
+        })
+        # 日付がNaTの行も1つのセルにまとめる（部局別の件数に含めるため）
+        codes = keys.groupby(CELL_COLUMNS[:3], sort=True, dropna=False).ngroup().to_numpy()
+        counts = np.bincount(codes, minlength=codes.max() + 1 if len(codes) else 0)
+        first = np.unique(codes, return_index=True)[1]
+        cells = keys.iloc[first].reset_index(drop=True)
+        cells['件数'] = counts[:len(cells)].astype('int64')
+        return cls(cells, codes.astype(np.int32) if keep_rows else None)
+
+    def subset(self, positions):
+        """
+        一部の行（DataFrameのilocの位置）だけの集計（from_frame(keep_rows=True) で作った場合のみ）
+        """
+        counts = np.bincount(self.row_cells[positions], minlength=len(self.cells))
+        cells = self.cells.assign(件数=counts)
+        return Rollup(cells[cells['件数'] > 0])
+
+    def update(self, df):
+        """
+        DataFrameに含まれる対象期間の件数を置き換える（それ以外の対象期間はそのまま）
+        """
+        if df.empty:
+            return self
+        new = Rollup.from_frame(df).cells
+        kept = self.cells[~self.cells['対象期間'].isin(set(new['対象期間']))]
+        self.cells = pd.concat([kept, new], ignore_index=True) if len(kept) else new
+        self.row_cells = None
+        return self
+
+    @property
+    def total(self):
+        return int(self.cells['件数'].sum())
+
+    def department_counts(self):
+        """
+        部局別の件数（多い順）
+        """
+        counts = self.cells.groupby('部局', sort=False)['件数'].sum()
+        return counts.sort_values(ascending=False, kind='stable')
+
+    def by_day(self):
+        """
+        部局×日の件数（発表日を解釈できない行を除く）
+        """
+        return self.cells.dropna(subset=['日付']).groupby(['部局', '日付'], as_index=False)['件数'].sum()
+
+    def by_month(self):
+        """
+        部局×月の件数（月は pandas.Period）
+        """
+        dated = self.cells.dropna(subset=['日付'])
+        return dated.groupby([dated['部局'], dated['日付'].dt.to_period('M').rename('月')])['件数'].sum().reset_index()
+
+    def by_year(self):
+        """
+        部局×年の件数
+        """
+        dated = self.cells.dropna(subset=['日付'])
+        return dated.groupby([dated['部局'], dated['日付'].dt.year.rename('年')])['件数'].sum().reset_index()
+
+    def daily_counts(self):
+        """
+        日付別の件数（日付はdatetime.date）
+        """
+        dated = self.cells.dropna(subset=['日付'])
+        return dated.groupby(dated['日付'].dt.date)['件数'].sum()
+
+    def monthly_counts(self):
+        dated = self.cells.dropna(subset=['日付'])
+        return dated.groupby(dated['日付'].dt.to_period('M'))['件数'].sum()
+
+    def yearly_counts(self):
+        dated = self.cells.dropna(subset=['日付'])
+        return dated.groupby(dated['日付'].dt.year)['件数'].sum()
+
+    def save(self, path=DEFAULT_ROLLUP_PATH):
+        """
+        集計を保存する（部局×日は対象期間ごと。部局×月・部局×年は他のツールから読めるように一緒に保存する）
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        day = [[period, department, None if pd.isna(date) else date.strftime('%Y-%m-%d'), int(count)]
+               for period, department, date, count in self.cells[CELL_COLUMNS].itertuples(index=False)]
+        data = {
+            'version': 1,
+            'day': day,
+            'month': [[department, str(month), int(count)] for department, month, count in self.by_month().itertuples(index=False)],
+            'year': [[department, int(year), int(count)] for department, year, count in self.by_year().itertuples(index=False)],
+        }
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        write_atomic(path, gzip.compress(text.encode('utf-8')))
+
+    @classmethod
+    def load(cls, path=DEFAULT_ROLLUP_PATH):
+        """
+        保存した集計を読み込む（なければ空の集計）
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'rb') as f:
+            data = json.loads(gzip.decompress(f.read()).decode('utf-8'))
+        cells = pd.DataFrame(data['day'], columns=CELL_COLUMNS)
+        cells['日付'] = pd.to_datetime(cells['日付'])
+        cells['件数'] = cells['件数'].astype('int64')
+        return cls(cells)
+
+class RollupSink:
+    """
+    逐次出力（1ヶ月分ずつ）に合わせて集計を更新する出力先（閉じるときに保存する）
+    """
+    def __init__(self, path=DEFAULT_ROLLUP_PATH):
+        self.path = path
+        self.rollup = Rollup.load(path)
+
+    def write(self, records):
+        if records:
+            self.rollup.update(pd.DataFrame(records))
+
+    def close(self):
+        self.rollup.save(self.path)
@@ -0,0 +1,111 @@
+"""
+報道資料のDataFrameのメモリ上の表現（スクレイパーとStreamlitアプリで共通）
+- 部局・対象期間（種類が少ない）はカテゴリ型
+- 内容・リンクURL・id はArrowの文字列型（pyarrowがない場合は従来のobject型のまま）
+- 年・月は小さい整数型、発表日は日付型（文字列を出力するときは restore_date_strings で「2025年9月9日」形式に戻す）
+- 変換前後のメモリ使用量を表示できる
+"""
+
+import pandas as pd
+
+from soumu_dates import parse_dates, format_date
+
+# カテゴリ型にする列（種類が少ない）
+CATEGORY_COLUMNS = ('部局', '対象期間')
+
+# Arrowの文字列型にする列
+STRING_COLUMNS = ('id', '内容', 'リンクURL')
+
+# 小さい整数型にする列（欠損値を扱えるnullable型）
+INTEGER_COLUMNS = {'年': 'Int16', '月': 'Int8'}
+
+def string_dtype():
+    """
+    Arrowの文字列型（pyarrowがない場合はNone）
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return pd.StringDtype('pyarrow')
+
+def compact_frame(df, parse_date_column=False):
+    """
+    報道資料のDataFrameをメモリ使用量の少ない型に変換したものを返す
+    - parse_date_column: Trueなら発表日を日付型（datetime64、変換できない値はNaT）にする。
+      Falseなら発表日の文字列をそのままカテゴリ型で保持する（CSVなどへの出力の形式を変えない）
+    """
+    df = df.copy(deep=False)
+    strings = string_dtype()
+    for col in df.columns:
+        if col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype('category')
+        elif col in STRING_COLUMNS and strings is not None:
+            df[col] = df[col].astype(strings)
+        elif col in INTEGER_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(INTEGER_COLUMNS[col])
+    if '発表日' in df.columns:
+        if parse_date_column:
+            df['発表日'] = parse_dates(df['発表日']).to_numpy()
+        else:
+            df['発表日'] = df['発表日'].astype('category')
+    return df
+
+def restore_date_strings(df):
+    """
+    発表日を日付型から「2025年9月9日」形式の文字列（カテゴリ型）に戻したものを返す
+    - CSV・SQLite・変更セットなど、発表日の文字列を使う出力に渡す前に使う（日付型でなければそのまま返す）
+    """
+    if '発表日' not in df.columns or not pd.api.types.is_datetime64_any_dtype(df['発表日']):
+        return df
+    df = df.copy(deep=False)
+    codes, uniques = pd.factorize(df['発表日'])
+    df['発表日'] = pd.Categorical.from_codes(codes, categories=[format_date(value) for value in uniques])
+    return df
+
+def load_press_releases(source, encoding='utf-8-sig', parse_date_column=True, encoding_errors='strict'):
+    """
+    報道資料のCSVをメモリ使用量の少ない型で読み込む
+    - source: ファイルのパスまたはファイルオブジェクト
+    - encoding_errors: 文字エンコーディングで読めないバイトの扱い（'replace' で置き換える）
+    - 戻り値: (DataFrame, 読み込み時の型のままの場合のメモリ使用量（バイト）)
+    """
+    dtype = {col: 'category' for col in CATEGORY_COLUMNS}
+    dtype['発表日'] = 'category'
+    strings = string_dtype()
+    if strings is not None:
+        dtype.update({col: strings for col in STRING_COLUMNS})
+    df = pd.read_csv(source, encoding=encoding, encoding_errors=encoding_errors, dtype=dtype)
+    baseline = estimate_object_memory(df)
+    return compact_frame(df, parse_date_column=parse_date_column), baseline
+
+def memory_usage(df):
+    """
+    DataFrameのメモリ使用量（バイト、文字列の中身も含む）
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+def estimate_object_memory(df):
+    """
+    全ての文字列の列をobject型で保持した場合のメモリ使用量（バイト）
+    - 型を指定せずに読み込んだ場合（従来の読み込み方）との比較に使う
+    """
+    converted = df.copy(deep=False)
+    for col in converted.columns:
+        if not pd.api.types.is_numeric_dtype(converted[col]) and not pd.api.types.is_datetime64_any_dtype(converted[col]):
+            converted[col] = converted[col].astype(object)
+    return memory_usage(converted)
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GB"
+
+def memory_report(before, after):
+    """
+    変換前後のメモリ使用量の説明（例: 「メモリ使用量: 12.3MB → 2.1MB（約5.9分の1）」）
+    """
+    ratio = before / after if after else 0
+    return f"メモリ使用量: {format_bytes(before)} → {format_bytes(after)}（約{ratio:.1f}分の1）"
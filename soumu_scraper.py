@@ -1,15 +1,106 @@
 import requests
 from bs4 import BeautifulSoup
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
 import pandas as pd
+import os
 import re
 from datetime import datetime, date
 import time
+import threading
+import argparse
+import cProfile
+import pstats
 import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dateutil.relativedelta import relativedelta
+from soumu_manifest import MonthManifest, month_key, open_month_keys, DEFAULT_STATE_DIR, DEFAULT_OPEN_MONTHS
+from soumu_pipeline import run_pipeline, DEFAULT_QUEUE_SIZE
+from soumu_sinks import CsvSink, ParquetSink
+from soumu_store import PressReleaseStore, DEFAULT_DB_PATH
+from soumu_dates import parse_date, parse_dates, normalize_dates, format_date
+from soumu_dataset import write_dataset, stable_ids, DEFAULT_DATASET_DIR
+from soumu_changes import record_changes, DEFAULT_CHANGES_DIR
+from soumu_schema import compact_frame, restore_date_strings, memory_usage, estimate_object_memory, memory_report
+from soumu_rollup import Rollup, RollupSink, ROLLUP_FILENAME
+from soumu_similar import update_similarity_index, SIMILAR_INDEX_FILENAME
+from soumu_export import export_press_releases, EXPORT_FORMATS, DEFAULT_EXPORT_FORMATS
+from soumu_metrics import get_metrics
+from soumu_http import (fetch_page, ResponseCache, NegativeCache, CacheMissError, PageNotFoundError,
+                        DEFAULT_CACHE_DIR, DEFAULT_NOT_FOUND_PATH)
 
-def generate_date_urls(start_year=2009, end_year=None):
+# 並列取得時のホスト単位のレート制限（リクエスト/秒）
+DEFAULT_RATE_PER_HOST = 5.0
+
+# 報道資料一覧ページのURLの先頭（ローカルの模擬サイトで試す場合などに変更する）
+BASE_URL = "https://www.soumu.go.jp/menu_news/s-news/"
+
+class TokenBucket:
+    """
+    トークンバケット方式のレート制限
+    - rate: 1秒あたりに補充されるトークン数
+    - capacity: バケットの最大容量（バースト許容量）
+    """
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """トークンを1つ取得する（取得できるまで待機）"""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def try_acquire(self):
+        """トークンを1つ取得する（待機しない）。取得できた場合は0、できなければ補充までの秒数を返す"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+class HostRateLimiter:
+    """
+    ホストごとにトークンバケットを持つレート制限
+    """
+    def __init__(self, rate=DEFAULT_RATE_PER_HOST, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        """URLのホストに対応するバケットからトークンを取得する"""
+        self._bucket(url).acquire()
+
+    def try_acquire(self, url):
+        """待機せずにトークンを取得する（戻り値は TokenBucket.try_acquire と同じ）"""
+        return self._bucket(url).try_acquire()
+
+    def _bucket(self, url):
+        host = urllib.parse.urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.capacity)
+                self.buckets[host] = bucket
+        return bucket
+
+def generate_date_urls(start_year=2009, end_year=None, base_url=BASE_URL):
     """
     2009年1月から指定年まで（または現在まで）のURLを生成する
+    - base_url: 一覧ページのURLの先頭
     """
     if end_year is None:
         end_year = datetime.now().year
@@ -30,7 +121,7 @@ def generate_date_urls(start_year=2009, end_year=None):
         else:
             url_suffix = f"{year_short}{month}m.html"
         
-        url = f"https://www.soumu.go.jp/menu_news/s-news/{url_suffix}"
+        url = f"{base_url}{url_suffix}"
         
         urls.append({
             'url': url,
@@ -44,149 +135,596 @@ def generate_date_urls(start_year=2009, end_year=None):
     
     return urls
 
-def scrape_soumu_press_releases(url, period_info=None):
+def decode_page(page):
     """
-    総務省の報道資料一覧ページをスクレイピングする
+    ページ本文を文字列にデコードする
     """
-    if period_info:
-        print(f"スクレイピング開始: {period_info['period']} ({url})")
+    return decode_content(page.content, page.encoding)
+
+def content_encoding(header_encoding):
+    """
+    レスポンスヘッダーの文字エンコーディングから、本文のデコードに使う文字エンコーディングを決める
+    """
+    # 文字エンコーディングを自動検出（ヘッダーのcharsetは大文字・小文字を区別しない）
+    header_encoding = header_encoding.lower() if header_encoding else header_encoding
+    if header_encoding == 'iso-8859-1':
+        # 総務省のページはShift_JISの可能性が高い
+        return 'shift_jis'
+    elif header_encoding == 'utf-8':
+        # UTF-8の場合はそのまま
+        return 'utf-8'
     else:
-        print(f"スクレイピング開始: {url}")
+        # その他の場合はShift_JISを試す
+        return 'shift_jis'
+
+def decode_content(content, header_encoding):
+    """
+    レスポンス本文（バイト列）を文字列にデコードする
+    - header_encoding: レスポンスヘッダーから判定した文字エンコーディング
+    """
+    return content.decode(content_encoding(header_encoding), errors='replace')
+
+def clean_text(text):
+    """
+    データの前処理（文字化け対策）
+    """
+    if not text:
+        return text
+    # 文字列を正規化
+    text = str(text).strip()
+    # 不要な空白文字を除去
+    text = ' '.join(text.split())
+    return text
+
+def _iter_rows_bs4(html, header_encoding=None):
+    """
+    BeautifulSoup（html.parser）で最初のテーブルの行を取り出す（従来の処理）
+    - html: 文字列、またはレスポンス本文のバイト列（header_encoding でデコードする）
+    - (日付, 内容, リンク, 部局) を返す。リンクがない場合はNone
+    """
+    if isinstance(html, bytes):
+        html = decode_content(html, header_encoding)
+    soup = BeautifulSoup(html, 'html.parser')
     
-    try:
-        # ページの取得
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        # 文字エンコーディングを自動検出
-        if response.encoding == 'ISO-8859-1':
-            # 総務省のページはShift_JISの可能性が高い
-            response.encoding = 'shift_jis'
-        elif response.encoding == 'utf-8':
-            # UTF-8の場合はそのまま
+    # テーブル内の行を取得
+    table = soup.find('table')
+    if not table:
+        return
+    
+    rows = table.find_all('tr')
+    for row in rows[1:]:  # ヘッダー行をスキップ
+        cells = row.find_all('td')
+        if len(cells) >= 3:
+            content_link = cells[1].find('a')
+            if content_link:
+                yield (cells[0].get_text(strip=True), content_link.get_text(strip=True),
+                       content_link.get('href', ''), cells[2].get_text(strip=True))
+            else:
+                yield (cells[0].get_text(strip=True), cells[1].get_text(strip=True),
+                       None, cells[2].get_text(strip=True))
+
+def _lxml_text(element):
+    """
+    BeautifulSoupの get_text(strip=True) と同じ規則でテキストを取り出す
+    （コメントは除き、各文字列の前後の空白を除去して文書の順に連結）
+    """
+    parts = [element.text] if element.text else []
+    for child in element:
+        if isinstance(child.tag, str):
+            parts.append(_lxml_text(child))
+        if child.tail:
+            parts.append(child.tail)
+    return ''.join(part.strip() for part in parts if part.strip())
+
+def lxml_source(html, header_encoding=None):
+    """
+    lxmlに渡すUTF-8のバイト列
+    - UTF-8のページはレスポンス本文のバイト列をそのまま渡す
+    - Shift_JISのページ・正しいUTF-8でないページはPythonでデコードしてUTF-8にする
+      （libxml2のShift_JISの変換は \\ と ~ を ¥ と ‾ にし、NEC特殊文字などで解析を止める。
+      不正なバイトの置き換え方もPythonのdecodeと異なる）
+    """
+    if isinstance(html, str):
+        return html.encode('utf-8')
+    if content_encoding(header_encoding) == 'utf-8':
+        try:
+            html.decode('utf-8')
+            return html
+        except UnicodeDecodeError:
             pass
+    return decode_content(html, header_encoding).encode('utf-8')
+
+def _first_table_lxml(source, chunk_size=64 * 1024):
+    """
+    lxmlで最初の<table>の終了タグまでだけを解析し、そのテーブル要素を返す
+    - source: UTF-8のバイト列（XML宣言・metaタグの文字エンコーディングの指定は使わない）
+    """
+    parser = etree.HTMLPullParser(events=('start', 'end'), encoding='utf-8')
+    table = None
+    for offset in range(0, len(source), chunk_size):
+        parser.feed(source[offset:offset + chunk_size])
+        for event, element in parser.read_events():
+            if element.tag != 'table':
+                continue
+            if event == 'start' and table is None:
+                table = element
+            elif event == 'end' and element is table:
+                return table
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        # 空のページなど
+        pass
+    return table
+
+# 終了タグのない要素（html.parserとlibxml2で扱いが同じ）
+VOID_TAGS = frozenset([b'area', b'base', b'br', b'col', b'embed', b'hr', b'img', b'input', b'link', b'meta',
+                       b'param', b'source', b'track', b'wbr'])
+
+# タグ（コメント・script・styleの中身は読み飛ばす）
+_MARKUP = re.compile(rb'<!--.*?-->|<(?:script|style)\b.*?</(?:script|style)\s*>|<(/?)([A-Za-z][A-Za-z0-9]*)\b[^>]*>',
+                     re.S | re.I)
+
+def _first_table_is_well_formed(source):
+    """
+    最初の<table>の中の全ての要素に、対応する終了タグがあるか
+    - 終了タグの省略（<td>a<td>b</tr> など）があると、html.parser（入れ子にする）とlibxml2（閉じる）で
+      セルの区切りが変わるため、lxmlの結果がbs4と一致しない
+    """
+    stack = None
+    for match in _MARKUP.finditer(source):
+        closing, tag = match.group(1), match.group(2)
+        if tag is None:
+            continue
+        tag = tag.lower()
+        if stack is None:
+            if closing or tag != b'table':
+                continue
+            stack = []
+        if tag in VOID_TAGS:
+            continue
+        if closing:
+            if not stack or stack.pop() != tag:
+                return False
+            if not stack:
+                return True
+        elif match.group(0).endswith(b'/>'):
+            # <td/> はhtml.parserでは空の要素、libxml2では開始タグ
+            return False
         else:
-            # その他の場合はShift_JISを試す
-            response.encoding = 'shift_jis'
-        
-        # HTMLの解析
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # 報道資料のテーブルを探す
-        press_releases = []
-        
-        # テーブル内の行を取得
-        table = soup.find('table')
-        if table:
-            rows = table.find_all('tr')
-            
-            for row in rows[1:]:  # ヘッダー行をスキップ
-                cells = row.find_all('td')
-                if len(cells) >= 3:
-                    # 日付の抽出
-                    date_cell = cells[0].get_text(strip=True)
-                    
-                    # 内容の抽出（リンクテキスト）
-                    content_cell = cells[1]
-                    content_link = content_cell.find('a')
-                    if content_link:
-                        content = content_link.get_text(strip=True)
-                        # リンクURLも取得
-                        link_url = content_link.get('href', '')
-                        if link_url and not link_url.startswith('http'):
-                            link_url = urllib.parse.urljoin(url, link_url)
-                    else:
-                        content = content_cell.get_text(strip=True)
-                        link_url = ''
-                    
-                    # 部局の抽出
-                    department = cells[2].get_text(strip=True)
-                    
-                    # データの前処理（文字化け対策）
-                    def clean_text(text):
-                        if not text:
-                            return text
-                        # 文字列を正規化
-                        text = str(text).strip()
-                        # 不要な空白文字を除去
-                        text = ' '.join(text.split())
-                        return text
-                    
-                    # データの追加
-                    press_releases.append({
-                        '発表日': clean_text(date_cell),
-                        '内容': clean_text(content),
-                        '部局': clean_text(department),
-                        'リンクURL': clean_text(link_url),
-                        '対象期間': clean_text(period_info['period'] if period_info else '')
-                    })
+            stack.append(tag)
+    # テーブルがない場合は比べるものがない（終了タグがない場合は不一致）
+    return stack is None
+
+def _iter_rows_lxml(html, header_encoding=None):
+    """
+    lxmlで最初のテーブルの行を取り出す（高速版）
+    - html: レスポンス本文のバイト列（header_encoding の文字エンコーディング）または文字列
+    - 最初のテーブル以降は解析しない
+    - 取り出す内容は _iter_rows_bs4 と同じ。終了タグが省略されたテーブル・NUL文字（libxml2は置き換える）を
+      含むページは _iter_rows_bs4 で解析する
+    """
+    source = lxml_source(html, header_encoding)
+    if b'\x00' in source or not _first_table_is_well_formed(source):
+        yield from _iter_rows_bs4(source.decode('utf-8'))
+        return
+    table = _first_table_lxml(source)
+    if table is None:
+        return
+    
+    rows = list(table.iter('tr'))
+    for row in rows[1:]:  # ヘッダー行をスキップ
+        cells = list(row.iter('td'))
+        if len(cells) >= 3:
+            content_link = cells[1].find('.//a')
+            if content_link is not None:
+                yield (_lxml_text(cells[0]), _lxml_text(content_link),
+                       content_link.get('href', ''), _lxml_text(cells[2]))
+            else:
+                yield (_lxml_text(cells[0]), _lxml_text(cells[1]),
+                       None, _lxml_text(cells[2]))
+
+# HTMLパーサーの実装（どちらも同じレコードを返す）
+PARSER_BACKENDS = {
+    'bs4': _iter_rows_bs4,
+    'lxml': _iter_rows_lxml,
+}
+
+DEFAULT_PARSER = 'bs4'
+
+def parse_press_releases(html, url, period_info=None, parser=DEFAULT_PARSER, header_encoding=None):
+    """
+    報道資料一覧ページのHTMLから報道資料のレコードを抽出する
+    - html: HTMLの文字列、またはレスポンス本文のバイト列（header_encoding はレスポンスヘッダーの文字エンコーディング）
+    - parser: 'bs4'（BeautifulSoup、従来の処理）または 'lxml'（高速版。バイト列のまま解析する）
+    """
+    if parser == 'lxml' and etree is None:
+        print("⚠️  lxmlがインストールされていないため、bs4パーサーを使用します")
+        parser = 'bs4'
+    iter_rows = PARSER_BACKENDS[parser]
+    
+    # 報道資料のテーブルを探す
+    press_releases = []
+    
+    for date_cell, content, link_url, department in iter_rows(html, header_encoding):
+        if link_url is None:
+            link_url = ''
+        elif link_url and not link_url.startswith('http'):
+            # リンクURLを絶対URLに変換
+            link_url = urllib.parse.urljoin(url, link_url)
         
+        # データの追加
+        press_releases.append({
+            '発表日': clean_text(date_cell),
+            '内容': clean_text(content),
+            '部局': clean_text(department),
+            'リンクURL': clean_text(link_url),
+            '対象期間': clean_text(period_info['period'] if period_info else '')
+        })
+    
+    return press_releases
+
+def parse_page_content(content, header_encoding, url, period_info=None, parser=DEFAULT_PARSER):
+    """
+    レスポンス本文（バイト列）をデコード・解析して (レコードのリスト, 段階ごとの所要時間) を返す（lxmlはデコードしない）
+    - プロセスプールの解析処理から呼び出すため、引数・戻り値はpickle可能な値のみ
+    - 子プロセスではメトリクスを共有できないため、デコード・解析の所要時間（秒）を返して呼び出し元で記録する
+    """
+    start = time.perf_counter()
+    if parser == 'lxml':
+        # lxmlはレスポンス本文のバイト列から解析する
+        press_releases = parse_press_releases(content, url, period_info, parser=parser, header_encoding=header_encoding)
+        return press_releases, {'parse': time.perf_counter() - start}
+    html = decode_content(content, header_encoding)
+    decoded = time.perf_counter()
+    press_releases = parse_press_releases(html, url, period_info, parser=parser)
+    return press_releases, {'decode': decoded - start, 'parse': time.perf_counter() - decoded}
+
+def records_to_dataframe(press_releases, quiet=False):
+    """
+    レコードのリストをDataFrameに変換する
+    - quiet: 件数を表示しない（並列取得のワーカースレッドから呼び出す場合）
+    """
+    if not quiet:
         print(f"取得した報道資料数: {len(press_releases)}件")
-        
+    metrics = get_metrics()
+    metrics.observe('month_rows', len(press_releases))
+    
+    with metrics.stage('dataframe'):
         # DataFrameに変換
         df = pd.DataFrame(press_releases)
         
         if not df.empty:
             # 日付の正規化
-            df['発表日'] = df['発表日'].apply(normalize_date)
-            
-            return df
-        else:
+            df['発表日'] = normalize_dates(df['発表日'])
+    
+    if not df.empty:
+        return df
+    else:
+        if not quiet:
             print("報道資料が見つかりませんでした")
-            return pd.DataFrame()
-            
-    except requests.RequestException as e:
-        print(f"HTTPリクエストエラー: {e}")
         return pd.DataFrame()
-    except Exception as e:
+
+def print_fetch_error(e):
+    """
+    取得・解析時のエラーを表示する
+    """
+    if isinstance(e, PageNotFoundError):
+        print(f"ページが存在しません: {e}")
+    elif isinstance(e, requests.RequestException):
+        print(f"HTTPリクエストエラー: {e}")
+    elif isinstance(e, CacheMissError):
+        print(f"キャッシュエラー: {e}")
+    else:
         print(f"スクレイピングエラー: {e}")
-        return pd.DataFrame()
 
-def scrape_all_months(start_year=2009, end_year=None):
+def not_found_frame():
+    """
+    ページが存在しない月（404・記録済みの404）を表す空のDataFrame
+    - 取得の失敗と区別して「ページなし」として数える
+    """
+    df = pd.DataFrame()
+    df.attrs['not_found'] = True
+    return df
+
+def is_not_found(df):
+    return df.attrs.get('not_found', False)
+
+def _error_frame(e):
+    """
+    取得・解析時のエラーを表示し、その月の結果（空のDataFrame）を返す
+    """
+    print_fetch_error(e)
+    return not_found_frame() if isinstance(e, PageNotFoundError) else pd.DataFrame()
+
+def _print_start(url, period_info):
+    if period_info:
+        print(f"スクレイピング開始: {period_info['period']} ({url})")
+    else:
+        print(f"スクレイピング開始: {url}")
+
+def scrape_soumu_press_releases(url, period_info=None, cache=None, offline=False, negative_cache=None,
+                                parser=DEFAULT_PARSER, quiet=False):
+    """
+    総務省の報道資料一覧ページをスクレイピングする
+    - cache: レスポンスキャッシュ（ResponseCache）。指定時は条件付きGETで再検証する
+    - offline: Trueの場合はネットワークに接続せずキャッシュから再解析する
+    - negative_cache: 404のページの記録（NegativeCache）。記録済みのページは接続せずにスキップする
+    - parser: HTMLパーサー（'bs4' または 'lxml'）
+    - quiet: 何も表示せず、エラーは例外のまま返す（並列取得のワーカースレッドから呼び出し、
+      表示は呼び出し元でまとめて行う場合）
+    """
+    if not quiet:
+        _print_start(url, period_info)
+    
+    try:
+        # ページの取得
+        page = fetch_page(url, cache=cache, offline=offline, negative_cache=negative_cache)
+        
+        metrics = get_metrics()
+        if parser == 'lxml':
+            # lxmlはレスポンス本文のバイト列から解析する
+            with metrics.stage('parse'):
+                press_releases = parse_press_releases(page.content, url, period_info, parser=parser,
+                                                      header_encoding=page.encoding)
+        else:
+            with metrics.stage('decode'):
+                html = decode_page(page)
+            with metrics.stage('parse'):
+                press_releases = parse_press_releases(html, url, period_info, parser=parser)
+        
+        return records_to_dataframe(press_releases, quiet=quiet)
+            
+    except Exception as e:
+        if quiet:
+            raise
+        return _error_frame(e)
+
+def scrape_all_months(start_year=2009, end_year=None, **options):
     """
     指定期間の全ての月の報道資料をスクレイピングする
+    - optionsは iter_months を参照
     """
+    _print_header(start_year, end_year)
+    results = [df for _, df in iter_months(start_year, end_year, **options)]
+    return _combine_results(results)
+
+def stream_all_months(sinks, start_year=2009, end_year=None, **options):
+    """
+    指定期間の全ての月の報道資料をスクレイピングし、1ヶ月ごとに出力先へ書き込む
+    - 全期間のデータを保持しないため、期間が長くてもメモリ使用量は一定
+    - sinks: 出力先（soumu_sinks の CsvSink / ParquetSink、soumu_store の PressReleaseStore など）
+    - 出力は月順（古い月から）
+    - optionsは iter_months を参照
+    """
+    _print_header(start_year, end_year)
+    total = 0
+    successful_count = 0
+    not_found_count = 0
+    failed_count = 0
+    for _, df in iter_months(start_year, end_year, **options):
+        if is_not_found(df):
+            not_found_count += 1
+            continue
+        if df.empty:
+            failed_count += 1
+            continue
+        records = df.to_dict('records')
+        with get_metrics().stage('save_stream'):
+            for sink in sinks:
+                sink.write(records)
+        successful_count += 1
+        total += len(records)
+    
+    print(f"\n=== スクレイピング結果 ===")
+    print(f"成功: {successful_count}件")
+    print(f"ページなし: {not_found_count}件")
+    print(f"失敗: {failed_count}件")
+    print(f"総取得件数: {total}件")
+    return total
+
+def iter_records(start_year=2009, end_year=None, **options):
+    """
+    指定期間の報道資料を1件ずつ（dict）返すジェネレーター
+    - optionsは iter_months を参照
+    """
+    for _, df in iter_months(start_year, end_year, **options):
+        yield from df.to_dict('records')
+
+def _print_header(start_year, end_year):
     print(f"=== 総務省報道資料一括スクレイピング ===")
     print(f"期間: {start_year}年1月 ～ {end_year or datetime.now().year}年{datetime.now().month}月")
     print("-" * 60)
-    
+
+def iter_months(start_year=2009, end_year=None, workers=1, rate_limit=DEFAULT_RATE_PER_HOST,
+                incremental=False, state_dir=DEFAULT_STATE_DIR, open_months=DEFAULT_OPEN_MONTHS,
+                cache_dir=None, offline=False, not_found_path=DEFAULT_NOT_FOUND_PATH,
+                parser=DEFAULT_PARSER, parse_workers=0, base_url=BASE_URL):
+    """
+    指定期間の月ごとの (URL情報, DataFrame) を月順に返すジェネレーター
+    - workers: 並列取得数（1の場合は従来どおり逐次取得）
+    - rate_limit: 並列取得時のホストごとの最大リクエスト数/秒
+    - incremental: 差分取得（未取得・前回失敗・更新中の月のみ取得し、残りは保存済みデータを使う）
+    - state_dir: 差分取得のマニフェストと月ごとのデータの保存先
+    - open_months: 毎回取り直す直近の月数（既定: 当月と前月）
+    - cache_dir: レスポンスキャッシュの保存先（指定時は条件付きGETで再検証する）
+    - offline: ネットワークに接続せず、キャッシュ済みのページを再解析する（オフライン再生）
+    - not_found_path: 404だったページの記録先（Noneで無効）。記録済みの月は次回以降スキップする
+    - parser: HTMLパーサー（'bs4': 従来の処理、'lxml': 高速版。結果は同じ）
+    - parse_workers: 解析用のプロセス数（1以上で取得と解析を分離したパイプラインで処理する）
+    - base_url: 一覧ページのURLの先頭（soumu_mock_server の模擬サイトで試す場合など）
+    """
     # URLリストを生成
-    urls = generate_date_urls(start_year, end_year)
+    urls = generate_date_urls(start_year, end_year, base_url)
     print(f"対象URL数: {len(urls)}件")
     
-    all_data = []
-    successful_count = 0
-    failed_count = 0
+    if incremental:
+        # 1ヶ月ごとにチェックポイントを保存し、中断しても次回は続きから取得する
+        manifest = MonthManifest(state_dir)
+        targets = manifest.months_to_fetch(urls, open_months)
+        print(f"差分取得: {len(targets)}件を取得（{len(urls) - len(targets)}件は保存済みデータを使用）")
+    else:
+        targets = urls
+    
+    if offline and cache_dir is None:
+        cache_dir = DEFAULT_CACHE_DIR
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    negative_cache = NegativeCache(not_found_path) if not_found_path else None
+    # 当月・前月はこれから公開される可能性があるため、404の記録があっても取得する
+    open_keys = open_month_keys(open_months)
+    
+    def scrape(url_info, quiet=False):
+        skip_cache = None if month_key(url_info) in open_keys else negative_cache
+        return scrape_soumu_press_releases(url_info['url'], url_info, cache=cache, offline=offline,
+                                           negative_cache=skip_cache, parser=parser, quiet=quiet)
+    
+    def fetch(url_info):
+        skip_cache = None if month_key(url_info) in open_keys else negative_cache
+        return fetch_page(url_info['url'], cache=cache, offline=offline, negative_cache=skip_cache)
+    
+    if parse_workers > 0:
+        fetched = _iter_months_pipeline(targets, fetch, parser, max(workers, 1), parse_workers,
+                                        None if offline else rate_limit)
+    elif workers > 1:
+        fetched = _iter_months_concurrent(targets, scrape, workers, None if offline else rate_limit)
+    else:
+        # オフライン再生ではサーバーに接続しないため待機しない
+        fetched = _iter_months_sequential(targets, scrape, delay=0 if offline else 0.1)
+    
+    if not incremental:
+        yield from fetched
+        return
     
+    # 保存済みデータと今回の取得結果を月順に並べる
+    target_keys = {month_key(url_info) for url_info in targets}
+    for url_info in urls:
+        if month_key(url_info) in target_keys:
+            url_info, df = next(fetched)
+            manifest.record(url_info, df)
+            if df.empty and not is_not_found(df):
+                # 取得に失敗した場合は前回のデータを使う
+                df = manifest.load_month(url_info)
+        else:
+            df = manifest.load_month(url_info)
+        yield url_info, df
+
+def _iter_months_sequential(urls, scrape, delay=0.1):
+    """
+    月ごとのページを1件ずつ順番に取得する（従来の処理）
+    """
     for i, url_info in enumerate(urls, 1):
         print(f"\n[{i}/{len(urls)}] 処理中...")
         
         # スクレイピング実行
-        df = scrape_soumu_press_releases(url_info['url'], url_info)
-        
-        if not df.empty:
-            all_data.append(df)
-            successful_count += 1
-            print(f"✅ 成功: {len(df)}件取得")
-        else:
-            failed_count += 1
-            print(f"❌ 失敗: データなし")
+        df = scrape(url_info)
+        _print_month_result(df)
+        yield url_info, df
         
         # リクエスト間隔を空ける（サーバー負荷軽減）
-        time.sleep(0.1)
+        if delay:
+            time.sleep(delay)
+
+def _iter_months_concurrent(urls, scrape, workers, rate_limit, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    月ごとのページをスレッドプールで並列取得する
+    - ホストごとのトークンバケットでリクエスト間隔を制御（rate_limit=Noneなら制限なし）
+    - 結果はURLリストと同じ順序で返す
+    - 取得は次に返す月から workers + queue_size 件先までに限る（時間のかかる月があっても、
+      取得済みで返していない月のデータは一定数までしか溜まらない。逐次出力のメモリ使用量を保つ）
+    - ワーカースレッドは何も表示せず、月ごとの表示は全て結果を返すときに行う
+    """
+    if rate_limit:
+        print(f"並列取得: {workers}スレッド（{rate_limit}件/秒/ホスト）")
+        limiter = HostRateLimiter(rate_limit)
+    else:
+        print(f"並列取得: {workers}スレッド")
+        limiter = None
+    
+    def fetch(url_info):
+        if limiter:
+            limiter.acquire(url_info['url'])
+        return scrape(url_info, quiet=True)
+    
+    window = workers + queue_size
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = deque()
+        submitted = 0
+        for i, url_info in enumerate(urls, 1):
+            while submitted < len(urls) and submitted - (i - 1) < window:
+                futures.append(executor.submit(fetch, urls[submitted]))
+                submitted += 1
+            
+            # 入力順に結果を受け取るため、逐次取得と同じ順序になる
+            print(f"\n[{i}/{len(urls)}] {url_info['period']}")
+            _print_start(url_info['url'], url_info)
+            try:
+                df = futures.popleft().result()
+            except Exception as e:
+                df = _error_frame(e)
+            _print_month_result(df)
+            yield url_info, df
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def _iter_months_pipeline(urls, fetch, parser, fetch_workers, parse_workers, rate_limit):
+    """
+    取得と解析を分離したパイプラインで月ごとのページを処理する
+    - 取得: スレッドプール（ホストごとのトークンバケットでリクエスト間隔を制御）
+    - 解析: プロセスプール（上限付きキューで取得済みデータの滞留を抑える）
+    - 結果はURLリストと同じ順序で返す
+    """
+    print(f"パイプライン処理: 取得{fetch_workers}スレッド / 解析{parse_workers}プロセス")
+    limiter = HostRateLimiter(rate_limit) if rate_limit else None
+    
+    def fetch_stage(url_info):
+        if limiter:
+            limiter.acquire(url_info['url'])
+        page = fetch(url_info)
+        return (page.content, page.encoding, url_info['url'], url_info, parser)
+    
+    stream = run_pipeline(urls, fetch_stage, parse_page_content,
+                          fetch_workers=fetch_workers, parse_workers=parse_workers)
+    metrics = get_metrics()
+    for i, (url_info, result, error) in enumerate(stream, 1):
+        print(f"\n[{i}/{len(urls)}] 処理中...")
+        _print_start(url_info['url'], url_info)
+        if error is not None:
+            df = _error_frame(error)
+        else:
+            press_releases, timings = result
+            for stage, seconds in timings.items():
+                metrics.observe('stage_duration_seconds', seconds, stage=stage)
+            df = records_to_dataframe(press_releases)
+        _print_month_result(df)
+        yield url_info, df
+
+def _print_month_result(df):
+    if not df.empty:
+        print(f"✅ 成功: {len(df)}件取得")
+    elif is_not_found(df):
+        print(f"⚪ ページなし")
+    else:
+        print(f"❌ 失敗: データなし")
+
+def _combine_results(results):
+    """
+    月ごとのDataFrameを結合して日付順に並び替える
+    """
+    all_data = [df for df in results if not df.empty]
+    successful_count = len(all_data)
+    not_found_count = sum(is_not_found(df) for df in results)
+    failed_count = len(results) - successful_count - not_found_count
     
     # 全データを結合
     if all_data:
         combined_df = pd.concat(all_data, ignore_index=True)
-        # データの並び替え（日付順）
-        combined_df = combined_df.sort_values('発表日', ascending=False)
+        # データの並び替え（日付順。文字列ではなく日付として比較する）
+        combined_df = combined_df.sort_values('発表日', ascending=False, key=parse_dates, kind='stable')
         
         print(f"\n=== スクレイピング結果 ===")
         print(f"成功: {successful_count}件")
+        print(f"ページなし: {not_found_count}件")
         print(f"失敗: {failed_count}件")
         print(f"総取得件数: {len(combined_df)}件")
         
@@ -197,164 +735,320 @@ def scrape_all_months(start_year=2009, end_year=None):
 
 def normalize_date(date_str):
     """
-    日付文字列を正規化する
+    日付文字列を「2025年9月9日」形式に正規化する
+    - 和暦・全角数字・期間（開始日を使う）にも対応。解釈できない場合はそのまま返す
     """
-    try:
-        # 日付の形式を統一
-        if '年' in date_str and '月' in date_str and '日' in date_str:
-            # 既に正しい形式の場合
-            return date_str
-        else:
-            # その他の形式の場合はそのまま返す
-            return date_str
-    except:
+    timestamp = parse_date(date_str)
+    if pd.isna(timestamp):
         return date_str
+    return format_date(timestamp)
 
-def save_to_csv(df, filename):
+def save_to_csv(df, filename, formats=DEFAULT_EXPORT_FORMATS):
     """
     DataFrameをCSVファイルに保存
-    - 文字化けを完全に防ぐための複数エンコーディング対応
+    - 文字化けを防ぐための複数エンコーディング対応
+    - formats: 出力形式（'utf8', 'tsv', 'shift_jis', 'cp932', 'excel'）。
+      Shift_JIS / CP932 / Excel専用は指定したときだけ出力する
     """
     try:
-        # データの前処理（文字化け対策強化）
-        df_clean = df.copy()
-        for col in df_clean.columns:
-            if df_clean[col].dtype == 'object':
-                # 文字列の正規化
-                df_clean[col] = df_clean[col].astype(str)
-                # 改行文字を除去
-                df_clean[col] = df_clean[col].str.replace('\n', ' ').str.replace('\r', ' ')
-                # タブ文字を除去
-                df_clean[col] = df_clean[col].str.replace('\t', ' ')
-                # 連続する空白を単一の空白に
-                df_clean[col] = df_clean[col].str.replace(r'\s+', ' ', regex=True)
-                # 前後の空白を除去
-                df_clean[col] = df_clean[col].str.strip()
-
-        # 1. UTF-8 with BOM（Mac/最新Excel向け）
-        utf8_path = filename
-        df_clean.to_csv(utf8_path, index=False, encoding='utf-8-sig')
-        print(f"CSVファイルを保存しました(UTF-8 BOM): {utf8_path}")
-
-        # 2. Shift_JIS（Windows Excel用 - 最も確実）
-        if utf8_path.lower().endswith('.csv'):
-            shift_jis_path = utf8_path[:-4] + '_shift_jis.csv'
-        else:
-            shift_jis_path = utf8_path + '_shift_jis.csv'
+        with get_metrics().stage('save_csv'):
+            report = export_press_releases(df, filename, formats)
         
-        # Shift_JISで保存（エラーは無視）
-        df_clean.to_csv(shift_jis_path, index=False, encoding='shift_jis', errors='ignore')
-        print(f"CSVファイルを保存しました(Shift_JIS): {shift_jis_path}")
+        print("\n📁 保存されたファイル（文字化け対策済み）:")
+        for name, (path, dropped) in report.items():
+            print(f"  - {path} ({EXPORT_FORMATS[name][4]})")
+            if dropped:
+                # エンコーディングで表現できずに除外した文字
+                chars = ', '.join(f"'{char}'×{count}" for char, count in dropped.most_common(20))
+                print(f"    ⚠️  {sum(dropped.values())}文字を除外しました: {chars}")
 
-        # 3. CP932（Windows Excel用）
-        if utf8_path.lower().endswith('.csv'):
-            cp932_path = utf8_path[:-4] + '_cp932.csv'
-        else:
-            cp932_path = utf8_path + '_cp932.csv'
-        df_clean.to_csv(cp932_path, index=False, encoding='cp932', errors='ignore')
-        print(f"CSVファイルを保存しました(CP932): {cp932_path}")
+        return True
+    except Exception as e:
+        print(f"CSV保存エラー: {e}")
+        return False
 
-        # 4. Excel専用（手動でBOM付きShift_JIS）
-        if utf8_path.lower().endswith('.csv'):
-            excel_path = utf8_path[:-4] + '_excel.csv'
-        else:
-            excel_path = utf8_path + '_excel.csv'
-        
-        # 手動でBOM付きShift_JISで保存
-        with open(excel_path, 'w', encoding='utf-8-sig', newline='') as f:
-            # まずUTF-8で書き込み
-            df_clean.to_csv(f, index=False, encoding='utf-8')
-        
-        # ファイルを読み込んでShift_JISで再保存
-        with open(excel_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        with open(excel_path, 'w', encoding='shift_jis', newline='') as f:
-            f.write(content)
-        
-        print(f"CSVファイルを保存しました(Excel専用): {excel_path}")
+def save_to_parquet(df, root=DEFAULT_DATASET_DIR):
+    """
+    DataFrameを年ごとに分割したParquetデータセットとして保存
+    """
+    try:
+        with get_metrics().stage('save_parquet'):
+            write_dataset(df, root)
+        print(f"📁 Parquetデータセットを保存しました: {root}/year=YYYY/")
+        return True
+    except Exception as e:
+        print(f"Parquet保存エラー: {e}")
+        return False
 
-        # 5. テキストファイル（確実に読める形式）
-        if utf8_path.lower().endswith('.csv'):
-            txt_path = utf8_path[:-4] + '_text.txt'
-        else:
-            txt_path = utf8_path + '_text.txt'
-        
-        with open(txt_path, 'w', encoding='utf-8', newline='') as f:
-            f.write("発表日\t内容\t部局\tリンクURL\t対象期間\n")
-            for _, row in df_clean.iterrows():
-                f.write(f"{row['発表日']}\t{row['内容']}\t{row['部局']}\t{row['リンクURL']}\t{row['対象期間']}\n")
-        print(f"テキストファイルを保存しました(TSV形式): {txt_path}")
+def save_to_sqlite(df, path=DEFAULT_DB_PATH):
+    """
+    DataFrameをSQLiteデータベースに追加・更新（リンクURLをキーにUPSERT）
+    """
+    try:
+        with get_metrics().stage('save_sqlite'), PressReleaseStore(path) as store:
+            inserted, updated = store.upsert(df[['発表日', '内容', '部局', 'リンクURL', '対象期間']])
+        print(f"📁 SQLiteに保存しました: {path}（追加 {inserted}件 / 更新 {updated}件）")
+        return True
+    except Exception as e:
+        print(f"SQLite保存エラー: {e}")
+        return False
 
-        print("\n📁 保存されたファイル（文字化け対策済み）:")
-        print(f"  - {excel_path} (Excel専用 - 最も推奨)")
-        print(f"  - {shift_jis_path} (Shift_JIS - Windows Excel用)")
-        print(f"  - {cp932_path} (CP932 - Windows Excel用)")
-        print(f"  - {utf8_path} (UTF-8 BOM - Mac/Googleスプレッドシート用)")
-        print(f"  - {txt_path} (テキスト形式 - 確実に読める)")
+def save_changes(df, changes_dir=DEFAULT_CHANGES_DIR):
+    """
+    前回の取得結果と比べた変更セット（追加・削除・内容の変更）を保存する
+    """
+    try:
+        path, counts = record_changes(df, changes_dir=changes_dir)
+        if path is None:
+            print("📁 今回の取得結果を保存しました（次回から変更セットを作成します）")
+        else:
+            print(f"📁 変更セット: {path}（追加 {counts['added']}件 / 削除 {counts['removed']}件 / "
+                  f"内容の変更 {counts['modified']}件）")
+        return True
+    except Exception as e:
+        print(f"変更セット保存エラー: {e}")
+        return False
 
+def save_similarity_index(df, path):
+    """
+    類似の報道資料の検索インデックスを更新する（前回から内容が増えた行だけを数え直す）
+    """
+    try:
+        index, counted = update_similarity_index(df['内容'].tolist(), path)
+        print(f"📁 類似検索インデックス: {path}（{len(index)}件、うち新規 {counted}件）")
         return True
     except Exception as e:
-        print(f"CSV保存エラー: {e}")
+        print(f"類似検索インデックス保存エラー: {e}")
         return False
 
-def main():
+def parse_args(argv=None):
+    """
+    コマンドライン引数の解析
+    """
+    parser = argparse.ArgumentParser(description="総務省報道資料一括スクレイピング")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="並列取得数（既定: 1 = 逐次取得）")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_PER_HOST,
+                        help="並列取得時のホストごとの最大リクエスト数/秒")
+    parser.add_argument("--incremental", action="store_true",
+                        help="差分取得（未取得・前回失敗・当月/前月のみ取得、中断時は続きから再開）")
+    parser.add_argument("--state-dir", default=DEFAULT_STATE_DIR,
+                        help="差分取得のマニフェストの保存先")
+    parser.add_argument("--open-months", type=int, default=DEFAULT_OPEN_MONTHS,
+                        help="差分取得で毎回取り直す直近の月数")
+    parser.add_argument("--cache-dir", default=None,
+                        help=f"レスポンスキャッシュの保存先（例: {DEFAULT_CACHE_DIR}）。指定時は条件付きGETで再検証")
+    parser.add_argument("--replay", action="store_true",
+                        help="ネットワークに接続せず、キャッシュ済みのページを再解析する")
+    parser.add_argument("--no-skip-not-found", action="store_true",
+                        help="404だった月の記録を使わず、全ての月に接続する")
+    parser.add_argument("--parser", choices=sorted(PARSER_BACKENDS), default=DEFAULT_PARSER,
+                        help="HTMLパーサー（lxmlは最初のテーブルのみを解析する高速版）")
+    parser.add_argument("--parse-workers", type=int, default=0,
+                        help="解析用のプロセス数（1以上で取得と解析を分離したパイプラインで処理）")
+    parser.add_argument("--stream-csv", metavar="PATH",
+                        help="1ヶ月ごとにCSV（UTF-8 BOM）へ逐次書き込む")
+    parser.add_argument("--stream-parquet", metavar="PATH",
+                        help="1ヶ月ごとにParquetへ逐次書き込む（pyarrowが必要）")
+    parser.add_argument("--stream-sqlite", metavar="PATH",
+                        help="1ヶ月ごとにSQLiteへ逐次書き込む（リンクURLをキーに追加・更新）")
+    parser.add_argument("--base-url", default=BASE_URL,
+                        help="一覧ページのURLの先頭（例: soumu_mock_server.py の http://127.0.0.1:8765/menu_news/s-news/）")
+    parser.add_argument("--formats", default=",".join(DEFAULT_EXPORT_FORMATS),
+                        help=f"保存するファイル形式（カンマ区切り: {', '.join(EXPORT_FORMATS)}）")
+    parser.add_argument("--parquet-dir", metavar="DIR",
+                        help=f"年ごとに分割したParquetデータセットも保存する（例: {DEFAULT_DATASET_DIR}、pyarrowが必要）")
+    parser.add_argument("--sqlite", metavar="PATH",
+                        help=f"SQLiteデータベースにも追加・更新する（例: {DEFAULT_DB_PATH}）")
+    parser.add_argument("--changes-dir", default=DEFAULT_CHANGES_DIR,
+                        help="前回の取得結果と比べた変更セット（追加・削除・内容の変更）の保存先")
+    parser.add_argument("--no-changes", action="store_true",
+                        help="変更セットを作成しない")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="処理段階ごとの所要時間・バイト数・リトライ回数・キャッシュヒット率をJSONで保存する")
+    parser.add_argument("--metrics-prom", metavar="PATH",
+                        help="同じメトリクスをPrometheusのテキスト形式で保存する（例: soumu_scraper.prom）")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="cProfileでプロファイルを取り、pstats形式で保存する（並列取得のワーカースレッドは含まない）")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """
     メイン処理
+    - 中断・エラー時も、それまでのメトリクスとプロファイルを保存する
+    """
+    args = parse_args(argv)
+    metrics = get_metrics()
+    metrics.reset()
+    profiler = cProfile.Profile() if args.profile else None
+    
+    if profiler:
+        profiler.enable()
+    try:
+        run(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            save_profile(profiler, args.profile)
+        if args.metrics_json or args.metrics_prom:
+            metrics.print_summary()
+            if args.metrics_json:
+                metrics.write_json(args.metrics_json)
+                print(f"📁 メトリクス（JSON）: {args.metrics_json}")
+            if args.metrics_prom:
+                metrics.write_prometheus(args.metrics_prom)
+                print(f"📁 メトリクス（Prometheus）: {args.metrics_prom}")
+
+def save_profile(profiler, path, limit=20):
+    """
+    プロファイルをpstats形式で保存し、累積時間の上位を表示する
+    """
+    profiler.dump_stats(path)
+    print(f"\n=== プロファイル（累積時間の上位{limit}件）===")
+    pstats.Stats(profiler).strip_dirs().sort_stats('cumulative').print_stats(limit)
+    print(f"📁 プロファイル: {path}（python -m pstats {path} で詳細を確認できます）")
+
+def run(args):
+    """
+    一括スクレイピングの実行
     """
     print("=== 総務省報道資料一括スクレイピング ===")
     print("2009年1月から現在まで全ての月のデータを取得します")
     print("-" * 60)
     
+    options = dict(workers=args.workers, rate_limit=args.rate_limit,
+                   incremental=args.incremental, state_dir=args.state_dir,
+                   open_months=args.open_months, cache_dir=args.cache_dir,
+                   offline=args.replay,
+                   not_found_path=None if args.no_skip_not_found else DEFAULT_NOT_FOUND_PATH,
+                   parser=args.parser, parse_workers=args.parse_workers, base_url=args.base_url)
+    
+    if args.stream_csv or args.stream_parquet or args.stream_sqlite:
+        # 逐次出力（全期間のデータをメモリに保持しない）
+        main_stream(args, options)
+        return
+    
     # 一括スクレイピング実行
-    df = scrape_all_months(start_year=2009)
+    df = scrape_all_months(start_year=2009, **options)
     
     if not df.empty:
-        # 結果の表示
-        print("\n=== 詳細統計 ===")
-        print(f"総取得件数: {len(df)}件")
+        # 安定したレコードID（リンクURLと発表日から作る。次回以降の差分の照合に使う）
+        df.insert(0, 'id', stable_ids(df))
         
-        print("\n部局別集計:")
-        dept_counts = df['部局'].value_counts()
-        for dept, count in dept_counts.head(10).items():  # 上位10件のみ表示
-            print(f"  {dept}: {count}件")
+        # 件数の集計を更新（取得した対象期間の分だけ置き換える）し、結果を表示
+        rollup_path = os.path.join(args.state_dir, ROLLUP_FILENAME)
+        rollup = Rollup.load(rollup_path).update(df)
+        rollup.save(rollup_path)
+        print_statistics(df, rollup)
         
-        print("\n年別集計:")
-        df['年'] = df['発表日'].str.extract(r'(\d{4})年')
-        year_counts = df['年'].value_counts().sort_index()
-        for year, count in year_counts.items():
-            print(f"  {year}年: {count}件")
+        # 年・月の列（従来のCSVの列）
+        df = add_year_month_columns(df)
         
-        print("\n月別集計（直近12ヶ月）:")
-        df['月'] = df['発表日'].str.extract(r'(\d{1,2})月')
-        recent_data = df.head(100)  # 直近100件で月別集計
-        month_counts = recent_data['月'].value_counts().sort_index()
-        for month, count in month_counts.items():
-            print(f"  {month}月: {count}件")
+        # メモリ使用量の少ない型に変換（部局・対象期間はカテゴリ型、内容などはArrowの文字列型、発表日は日付型）
+        # 変換前は分析アプリと同じく、全ての文字列をobject型で持つ場合のメモリ使用量と比べる
+        before = estimate_object_memory(df)
+        # 解釈できない発表日がある場合は、出力で元の文字列を失わないようにカテゴリ型のままにする
+        parse_date_column = bool(parse_dates(df['発表日']).notna().all())
+        df = compact_frame(df, parse_date_column=parse_date_column)
+        print(f"\n{memory_report(before, memory_usage(df))}")
+        
+        # 出力する発表日は「2025年9月9日」形式の文字列（カテゴリ型）
+        output = restore_date_strings(df)
         
         # CSVファイルに保存
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"soumu_press_releases_all_{timestamp}.csv"
         
-        if save_to_csv(df, filename):
+        if save_to_csv(output, filename, args.formats.split(",")):
             print(f"\n✅ スクレイピング完了！")
             print(f"📁 保存ファイル: {filename}")
             print(f"📊 データ件数: {len(df)}件")
             print(f"📅 期間: 2009年1月 ～ 現在")
             
+            if args.parquet_dir:
+                save_to_parquet(output, args.parquet_dir)
+            if args.sqlite:
+                save_to_sqlite(output, args.sqlite)
+            if not args.no_changes:
+                save_changes(output, args.changes_dir)
+            save_similarity_index(output, os.path.join(args.state_dir, SIMILAR_INDEX_FILENAME))
+            
             # サンプルデータの表示
             print("\n=== サンプルデータ（最新5件）===")
-            print(df.head().to_string(index=False))
+            print(output.head().to_string(index=False))
         else:
             print("❌ CSVファイルの保存に失敗しました")
     else:
         print("❌ スクレイピングに失敗しました")
 
+def print_statistics(df, rollup=None):
+    """
+    部局別・年別・月別（直近12ヶ月）の件数を表示する
+    - rollup: 件数の集計（soumu_rollup.Rollup）。省略時はdfから作る。
+      保存済みの集計には今回取得していない対象期間も含まれるため、件数は全て集計から表示する
+    """
+    if rollup is None:
+        rollup = Rollup.from_frame(df)
+    
+    print("\n=== 詳細統計 ===")
+    print(f"総取得件数: {rollup.total}件")
+    if rollup.total != len(df):
+        print(f"（今回の取得: {len(df)}件。保存済みの集計の他の対象期間を含みます）")
+    
+    print("\n部局別集計:")
+    dept_counts = rollup.department_counts()
+    for dept, count in dept_counts.head(10).items():  # 上位10件のみ表示
+        print(f"  {dept}: {count}件")
+    
+    print("\n年別集計:")
+    for year, count in rollup.yearly_counts().items():
+        print(f"  {year}年: {count}件")
+    
+    print("\n月別集計（直近12ヶ月）:")
+    month_counts = rollup.monthly_counts()
+    for month, count in month_counts[month_counts.index > month_counts.index.max() - 12].items():
+        print(f"  {month.year}年{month.month}月: {count}件")
+
+def add_year_month_columns(df):
+    """
+    発表日の年・月の列を追加したDataFrameを返す（従来から一括スクレイピングのCSVに含まれる列。
+    発表日を解釈できない行は空）
+    """
+    dates = df['発表日']
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = parse_dates(dates)
+    return df.assign(年=dates.dt.year.astype('Int64'), 月=dates.dt.month.astype('Int64'))
+
+def main_stream(args, options):
+    """
+    1ヶ月ごとに出力先へ逐次書き込むスクレイピング
+    """
+    sinks = []
+    try:
+        if args.stream_csv:
+            sinks.append(CsvSink(args.stream_csv))
+        if args.stream_parquet:
+            sinks.append(ParquetSink(args.stream_parquet))
+        if args.stream_sqlite:
+            sinks.append(PressReleaseStore(args.stream_sqlite))
+        # 件数の集計も1ヶ月ごとに更新する
+        sinks.append(RollupSink(os.path.join(args.state_dir, ROLLUP_FILENAME)))
+        
+        total = stream_all_months(sinks, start_year=2009, **options)
+    finally:
+        for sink in sinks:
+            sink.close()
+    
+    print(f"\n✅ スクレイピング完了！")
+    for sink in sinks:
+        print(f"📁 保存ファイル: {sink.path}")
+    print(f"📊 データ件数: {total}件")
+
 def main_single_month():
     """
     単一月のスクレイピング（従来の機能）
     """
-    url = "https://www.soumu.go.jp/menu_news/s-news/2501m.html"
+    url = f"{BASE_URL}2501m.html"
     
     print("=== 総務省報道資料スクレイピング（単一月） ===")
     print(f"対象URL: {url}")
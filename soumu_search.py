@@ -0,0 +1,138 @@
+"""
+報道資料のキーワード検索（文字n-gramの転置インデックス）
+- 内容・部局をNFKCで正規化し（全角英数字を半角に、英字は小文字に）、1〜3文字のn-gramごとに該当する行を記録する
+  （単語の区切りがない日本語でも、部分一致の検索ができる）
+- 検索語のn-gramの行を積集合で絞り込み、4文字以上の検索語だけ実際の文字列で確認する
+- 検索式: 空白区切りはAND、OR（または |）でOR、"..." は空白を含む語句
+  例: 電波 法 / 放送 OR 電波 / "情報通信 審議会"
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# インデックスに登録するn-gramの長さ
+NGRAM_SIZES = (1, 2, 3)
+
+# 検索する列
+SEARCH_COLUMNS = ('内容', '部局')
+
+_QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+def normalize_text(text):
+    """
+    検索用の正規化（NFKC・小文字・連続する空白を1つに）
+    """
+    if not isinstance(text, str):
+        return ''
+    return ' '.join(unicodedata.normalize('NFKC', text).lower().split())
+
+def parse_query(query):
+    """
+    検索式をORで区切ったANDの組（検索語のリストのリスト）に変換する
+    - 例: '電波 法 OR "情報通信 審議会"' → [['電波', '法'], ['情報通信 審議会']]
+    """
+    groups = [[]]
+    for match in _QUERY_TOKEN.finditer(query or ''):
+        phrase, word = match.groups()
+        if word in ('OR', '|'):
+            groups.append([])
+            continue
+        term = normalize_text(phrase if phrase is not None else word)
+        if term:
+            groups[-1].append(term)
+    return [group for group in groups if group]
+
+class NgramIndex:
+    """
+    文字n-gramの転置インデックス
+    - texts: 行ごとの文字列（列の境界は改行。改行をまたぐn-gramは登録しない）
+    - positions: n-gram → 該当する行の位置（昇順のint32配列）
+    - search(query) は該当する行の位置（DataFrameのilocで使える昇順の配列）を返す
+    """
+    def __init__(self, texts):
+        self.texts = ['\n'.join(normalize_text(part) for part in text.split('\n')) if isinstance(text, str) else ''
+                      for text in texts]
+        grams = []
+        rows = []
+        for row, text in enumerate(self.texts):
+            row_grams = {text[i:i + n] for n in NGRAM_SIZES for i in range(len(text) - n + 1)}
+            row_grams = [gram for gram in row_grams if '\n' not in gram]
+            grams.extend(row_grams)
+            rows.extend([row] * len(row_grams))
+
+        self.positions = {}
+        if grams:
+            # n-gramごとに行の位置をまとめる（n-gramの順に並べてから区切る）
+            codes, uniques = pd.factorize(pd.Series(grams, dtype=object))
+            order = np.argsort(codes, kind='stable')
+            rows = np.asarray(rows, dtype=np.int32)[order]
+            bounds = np.flatnonzero(np.diff(codes[order])) + 1
+            self.positions = dict(zip(uniques, np.split(rows, bounds)))
+
+    @classmethod
+    def from_frame(cls, df, columns=SEARCH_COLUMNS):
+        """
+        DataFrameの検索する列（内容・部局）からインデックスを作る
+        """
+        values = [df[col].astype(object).where(df[col].notna(), '') for col in columns if col in df.columns]
+        return cls(['\n'.join(parts) for parts in zip(*values)] if values else [])
+
+    def __len__(self):
+        return len(self.texts)
+
+    def term_positions(self, term):
+        """
+        検索語を含む行の位置
+        """
+        if len(term) <= max(NGRAM_SIZES):
+            # n-gramそのものなので確認は不要
+            return self.positions.get(term, np.empty(0, dtype=np.int32))
+
+        # 検索語に含まれる全ての3文字のn-gramで絞り込む
+        size = max(NGRAM_SIZES)
+        grams = {term[i:i + size] for i in range(len(term) - size + 1)}
+        lists = sorted((self.positions.get(gram) for gram in grams), key=lambda p: -1 if p is None else len(p))
+        if lists[0] is None or not len(lists[0]):
+            return np.empty(0, dtype=np.int32)
+        candidates = lists[0]
+        for positions in lists[1:]:
+            candidates = self._intersect(candidates, positions)
+            if not len(candidates):
+                return candidates
+        return np.array([row for row in candidates if term in self.texts[row]], dtype=np.int32)
+
+    def search(self, query):
+        """
+        検索式に一致する行の位置（昇順）
+        """
+        results = []
+        for group in parse_query(query):
+            # 行数の少ない検索語から積集合をとる
+            lists = sorted((self.term_positions(term) for term in group), key=len)
+            matched = lists[0]
+            for positions in lists[1:]:
+                if not len(matched):
+                    break
+                matched = self._intersect(matched, positions)
+            results.append(matched)
+        if not results:
+            return np.empty(0, dtype=np.int32)
+        if len(results) == 1:
+            return results[0]
+        mask = np.zeros(len(self.texts), dtype=bool)
+        for matched in results:
+            mask[matched] = True
+        return np.flatnonzero(mask).astype(np.int32)
+
+    def _intersect(self, a, b):
+        """
+        昇順の行の位置の積集合（行数分のマスクを使う。ソートが不要なため、件数の多い検索語でも速い）
+        """
+        if len(a) > len(b):
+            a, b = b, a
+        mask = np.zeros(len(self.texts), dtype=bool)
+        mask[a] = True
+        return b[mask[b]]
@@ -0,0 +1,213 @@
+"""
+類似の報道資料の検索（内容の文字n-gramのTF-IDF）
+- 内容をNFKCで正規化し（soumu_search と同じ）、2〜3文字のn-gramの出現回数を疎行列（CSR）で持つ
+- 重みは 1+log(出現回数) × IDF、行ごとにL2正規化。類似度はコサイン類似度
+- 検索はn-gramごとの転置リスト（CSC）から、検索元と共通のn-gramを持つ行だけを加算して上位k件を返す
+- 出現回数は内容のハッシュごとに保存し（soumu_state/similar_index.npz）、再作成時は新しい内容だけを数える
+  （IDFと重みは全体から計算し直す）
+- scipy / scikit-learn は使わず、numpyの配列で疎行列を表す
+"""
+
+import os
+import hashlib
+from collections import Counter
+
+import numpy as np
+
+from soumu_manifest import DEFAULT_STATE_DIR
+from soumu_search import normalize_text
+
+# インデックスのファイル名（差分取得のマニフェストと同じディレクトリに置く）
+SIMILAR_INDEX_FILENAME = "similar_index.npz"
+
+# インデックスの保存先（既定）
+DEFAULT_SIMILAR_INDEX_PATH = os.path.join(DEFAULT_STATE_DIR, SIMILAR_INDEX_FILENAME)
+
+# 特徴量にするn-gramの長さ
+NGRAM_SIZES = (2, 3)
+
+# 既定で返す件数
+DEFAULT_TOP_K = 10
+
+def text_key(text):
+    """
+    内容のハッシュ（出現回数の再利用のキー）
+    """
+    return hashlib.sha1(normalize_text(text).encode('utf-8')).hexdigest()[:16]
+
+def count_ngrams(text):
+    """
+    内容のn-gramごとの出現回数
+    """
+    text = normalize_text(text)
+    return Counter(text[i:i + n] for n in NGRAM_SIZES for i in range(len(text) - n + 1))
+
+class SimilarityIndex:
+    """
+    内容の文字n-gramのTF-IDFによる類似検索のインデックス
+    - keys: 行ごとの内容のハッシュ（行の順はインデックスを作ったDataFrameの順）
+    - vocabulary: n-gramのリスト（列番号 → n-gram）
+    - indptr / features / counts: 行ごとのn-gramの出現回数（CSR形式）
+    """
+    def __init__(self, keys, vocabulary, indptr, features, counts):
+        self.keys = list(keys)
+        self.vocabulary = list(vocabulary)
+        self.columns = {gram: column for column, gram in enumerate(self.vocabulary)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.features = np.asarray(features, dtype=np.int32)
+        self.counts = np.asarray(counts, dtype=np.float32)
+        self._fit()
+
+    @classmethod
+    def build(cls, texts, previous=None):
+        """
+        内容のリストからインデックスを作る
+        - previous: 前回のインデックス。同じ内容の行は出現回数を数え直さない
+        - 戻り値: (インデックス, 新しく数えた行数)
+        """
+        vocabulary = list(previous.vocabulary) if previous is not None else []
+        columns = dict(previous.columns) if previous is not None else {}
+        reusable = {}
+        if previous is not None:
+            for row, key in enumerate(previous.keys):
+                reusable.setdefault(key, row)
+
+        keys = []
+        row_features = []
+        row_counts = []
+        counted = 0
+        for text in texts:
+            key = text_key(text)
+            keys.append(key)
+            row = reusable.get(key)
+            if row is not None:
+                start, end = previous.indptr[row], previous.indptr[row + 1]
+                row_features.append(previous.features[start:end])
+                row_counts.append(previous.counts[start:end])
+                continue
+            counted += 1
+            grams = count_ngrams(text)
+            for gram in grams:
+                if gram not in columns:
+                    columns[gram] = len(vocabulary)
+                    vocabulary.append(gram)
+            row_features.append(np.fromiter((columns[gram] for gram in grams), dtype=np.int32, count=len(grams)))
+            row_counts.append(np.fromiter(grams.values(), dtype=np.float32, count=len(grams)))
+
+        lengths = np.fromiter((len(features) for features in row_features), dtype=np.int64, count=len(row_features))
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        features = np.concatenate(row_features) if row_features else np.empty(0, dtype=np.int32)
+        counts = np.concatenate(row_counts) if row_counts else np.empty(0, dtype=np.float32)
+        return cls(keys, vocabulary, indptr, features, counts), counted
+
+    def _fit(self):
+        """
+        IDF・行ごとのノルム・n-gramごとの転置リスト（CSC形式）を計算する
+        """
+        size = len(self.keys)
+        self.rows = np.repeat(np.arange(size, dtype=np.int32), np.diff(self.indptr))
+        self.document_frequency = document_frequency = np.bincount(self.features, minlength=len(self.vocabulary))
+        self.idf = (np.log((1 + size) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        weights = (1 + np.log(self.counts)) * self.idf[self.features]
+        norms = np.sqrt(np.bincount(self.rows, weights=weights * weights, minlength=size)).astype(np.float32)
+        self.norms = np.where(norms > 0, norms, 1)
+        weights /= self.norms[self.rows]
+
+        order = np.argsort(self.features, kind='stable')
+        self.posting_rows = self.rows[order]
+        self.posting_weights = weights[order].astype(np.float32)
+        self.posting_indptr = np.concatenate([[0], np.cumsum(document_frequency)])
+
+    def __len__(self):
+        return len(self.keys)
+
+    def row_vector(self, row):
+        """
+        行のTF-IDFベクトル（n-gramの列番号, 重み）
+        """
+        start, end = self.indptr[row], self.indptr[row + 1]
+        features = self.features[start:end]
+        weights = (1 + np.log(self.counts[start:end])) * self.idf[features] / self.norms[row]
+        return features, weights
+
+    def text_vector(self, text):
+        """
+        任意の文字列のTF-IDFベクトル（インデックスにないn-gramは使わない）
+        """
+        grams = {self.columns[gram]: count for gram, count in count_ngrams(text).items() if gram in self.columns}
+        features = np.fromiter(grams.keys(), dtype=np.int32, count=len(grams))
+        weights = (1 + np.log(np.fromiter(grams.values(), dtype=np.float32, count=len(grams)))) * self.idf[features]
+        norm = np.sqrt((weights * weights).sum())
+        return features, weights / norm if norm > 0 else weights
+
+    def scores(self, features, weights):
+        """
+        全ての行とのコサイン類似度（共通のn-gramを持つ行だけを加算する）
+        """
+        starts = self.posting_indptr[features]
+        lengths = self.posting_indptr[features + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.zeros(len(self.keys), dtype=np.float32)
+        # 各n-gramの転置リストの位置を連結する
+        offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+        positions = np.arange(total) + offsets
+        values = self.posting_weights[positions] * np.repeat(weights, lengths)
+        return np.bincount(self.posting_rows[positions], weights=values, minlength=len(self.keys))
+
+    def most_similar(self, row=None, text=None, k=DEFAULT_TOP_K):
+        """
+        類似度の高い行を返す
+        - row: 検索元の行の位置（自分自身は除く）
+        - text: 検索元の文字列（rowの代わり）
+        - 戻り値: [(行の位置, 類似度), ...]（類似度の高い順）
+        """
+        if row is not None:
+            scores = self.scores(*self.row_vector(row))
+            scores[row] = 0
+        else:
+            scores = self.scores(*self.text_vector(text))
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(int(position), float(scores[position])) for position in candidates]
+
+    def save(self, path=DEFAULT_SIMILAR_INDEX_PATH):
+        """
+        出現回数（CSR形式）とn-gram・内容のハッシュを保存する（IDFなどは読み込み時に計算する）
+        - どの行にも現れないn-gram（前回のインデックスにあり、内容が削除・変更された行のもの）は保存しない
+        - 出現回数は uint16 に収まれば uint16、収まらなければ uint32 で保存する
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        used = self.document_frequency > 0
+        columns = np.cumsum(used) - 1
+        vocabulary = [gram for gram, keep in zip(self.vocabulary, used) if keep]
+        counts_dtype = np.uint16 if not len(self.counts) or self.counts.max() <= np.iinfo(np.uint16).max else np.uint32
+        temporary = f"{path}.tmp.npz"
+        np.savez_compressed(temporary, keys=np.array(self.keys, dtype=str), vocabulary=np.array(vocabulary, dtype=str),
+                            indptr=self.indptr, features=columns[self.features].astype(np.int32),
+                            counts=self.counts.astype(counts_dtype))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_SIMILAR_INDEX_PATH):
+        """
+        保存したインデックスを読み込む（なければNone）
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['keys'].tolist(), data['vocabulary'].tolist(), data['indptr'], data['features'], data['counts'])
+
+def update_similarity_index(texts, path=DEFAULT_SIMILAR_INDEX_PATH):
+    """
+    保存済みのインデックスを使って、新しい内容だけを数え直したインデックスを作って保存する
+    - 戻り値: (インデックス, 新しく数えた行数)
+    """
+    index, counted = SimilarityIndex.build(texts, previous=SimilarityIndex.load(path))
+    index.save(path)
+    return index, counted
@@ -0,0 +1,70 @@
+"""
+報道資料レコードの逐次出力先（シンク）
+- 1ヶ月分などのレコードのまとまりを受け取るたびにファイルへ書き込む
+- 全期間のデータをメモリに保持しないため、期間が長くてもメモリ使用量は一定
+- SQLiteへの出力は soumu_store.PressReleaseStore を使う
+"""
+
+import os
+import csv
+
+# 報道資料の列
+COLUMNS = ['発表日', '内容', '部局', 'リンクURL', '対象期間']
+
+class CsvSink:
+    """
+    CSVファイルへの逐次出力
+    - append=True の場合は既存のファイルに追記する（ヘッダーは新しいファイルのときだけ書く）
+    """
+    def __init__(self, path, encoding='utf-8-sig', append=False):
+        self.path = path
+        exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, 'a' if append else 'w', encoding=encoding, newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=COLUMNS, extrasaction='ignore')
+        if not exists:
+            self.writer.writeheader()
+
+    def write(self, records):
+        self.writer.writerows(records)
+        # 書き込んだ行をすぐにディスクへ反映する
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ParquetSink:
+    """
+    Parquetファイルへの逐次出力（1回の書き込みごとに1つの行グループ）
+    - pyarrowが必要
+    """
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet出力にはpyarrowが必要です: pip install pyarrow")
+        self.pa = pa
+        self.path = path
+        self.schema = pa.schema([(column, pa.string()) for column in COLUMNS])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, records):
+        if not records:
+            return
+        table = self.pa.Table.from_pylist(records, schema=self.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+複数サイト（省庁）の報道資料一覧を共通のスケジューラーで取得する
+- サイトごとの違い（URLの生成・文字エンコーディング・表の解析）はアダプター（SiteAdapter）にまとめる
+- 総務省のアダプター（SoumuAdapter）は soumu_scraper の処理をそのまま使う
+- 全サイトのページを1つのスケジューラーで取得し、ホストごとと全体の同時接続数を制限する
+  （サイトごとに順番に取得しないため、全体の所要時間は最も時間のかかるサイト程度になる）
+使用方法: python soumu_sites.py --sites soumu --start-year 2024 --workers 16 --per-host 2
+"""
+
+import sys
+import time
+import argparse
+from abc import ABC, abstractmethod
+import urllib.parse
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import pandas as pd
+
+from soumu_http import fetch_page
+from soumu_scraper import (HostRateLimiter, generate_date_urls, decode_page, parse_press_releases,
+                           records_to_dataframe, print_fetch_error, save_to_csv,
+                           PARSER_BACKENDS, DEFAULT_PARSER, DEFAULT_RATE_PER_HOST, BASE_URL)
+from soumu_dates import parse_dates
+
+# 全体の同時接続数（既定）
+DEFAULT_MAX_WORKERS = 16
+
+# ホストごとの同時接続数（既定）
+DEFAULT_PER_HOST = 2
+
+class SiteAdapter(ABC):
+    """
+    サイトごとの処理のインターフェース（month_urls と parse を実装していないアダプターは作成時にエラー）
+    - name: サイトの名前（出力ファイル名の先頭にも使う）
+    - label: 表示名
+    - month_urls(start_year, end_year): 取得するページのURL情報（'url' と 'period' を含むdict）のリスト
+    - decode(page): 取得したページ（soumu_http.Page）を文字列にする
+    - parse(html, url_info): 報道資料のレコード（soumu_sinks.COLUMNS の列を持つdict）のリスト
+    - parse_page(page, url_info): 取得したページからレコードのリストを返す（既定は decode して parse。
+      バイト列のまま解析できるアダプターは上書きする）
+    """
+    name = None
+    label = None
+
+    @abstractmethod
+    def month_urls(self, start_year, end_year=None):
+        pass
+
+    def decode(self, page):
+        return decode_page(page)
+
+    @abstractmethod
+    def parse(self, html, url_info):
+        pass
+
+    def parse_page(self, page, url_info):
+        return self.parse(self.decode(page), url_info)
+
+class SoumuAdapter(SiteAdapter):
+    """
+    総務省の報道資料一覧（YYMMm.html、Shift_JIS、最初の表）
+    """
+    name = "soumu"
+    label = "総務省"
+
+    def __init__(self, base_url=BASE_URL, parser=DEFAULT_PARSER):
+        self.base_url = base_url
+        self.parser = parser
+
+    def month_urls(self, start_year, end_year=None):
+        return generate_date_urls(start_year, end_year, self.base_url)
+
+    def parse(self, html, url_info):
+        return parse_press_releases(html, url_info['url'], url_info, parser=self.parser)
+
+    def parse_page(self, page, url_info):
+        if self.parser == 'lxml':
+            # lxmlはレスポンス本文のバイト列から解析する（scrape_soumu_press_releases と同じ）
+            return parse_press_releases(page.content, url_info['url'], url_info, parser=self.parser,
+                                        header_encoding=page.encoding)
+        return super().parse_page(page, url_info)
+
+# 利用できるアダプター（名前 → クラス）
+SITE_ADAPTERS = {
+    SoumuAdapter.name: SoumuAdapter,
+}
+
+class HostScheduler:
+    """
+    ホストごとと全体の同時実行数を制限して処理を実行するスケジューラー
+    - max_workers: 全体の同時実行数
+    - per_host: ホストごとの同時実行数
+    - rate_limit: ホストごとの最大リクエスト数/秒（Noneで制限なし）
+    - 空きのあるホストの処理から順に実行するため、遅いホストの処理が他のホストの処理を待たせない
+    - レート制限のトークンは投入前に取得する（トークンを待つ間、ホストの枠とスレッドを占有しない）
+    """
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, per_host=DEFAULT_PER_HOST, rate_limit=DEFAULT_RATE_PER_HOST):
+        # 0以下では処理を1件も実行できず、run() が終わらない
+        if max_workers < 1:
+            raise ValueError(f"max_workersは1以上です: {max_workers}")
+        if per_host < 1:
+            raise ValueError(f"per_hostは1以上です: {per_host}")
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.limiter = HostRateLimiter(rate_limit) if rate_limit else None
+
+    def run(self, tasks):
+        """
+        (URL, 処理) のリストを実行し、(URL, 処理, 結果, 例外) を終わった順に返すジェネレーター
+        - 処理は引数なしで呼び出す
+        """
+        queues = {}
+        for url, func in tasks:
+            queues.setdefault(urllib.parse.urlparse(url).netloc, deque()).append((url, func))
+        hosts = deque(queues)
+        running = {host: 0 for host in queues}
+        futures = {}
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while hosts or futures:
+                # ホストを順番に見て、空きがあれば1件ずつ投入する（特定のホストに偏らないように）
+                # トークンのないホストは飛ばし、最も早く補充されるまでの秒数を覚えておく
+                next_token = None
+                submitted = True
+                while submitted and len(futures) < self.max_workers:
+                    submitted = False
+                    for _ in range(len(hosts)):
+                        host = hosts[0]
+                        hosts.rotate(-1)
+                        if running[host] >= self.per_host or len(futures) >= self.max_workers:
+                            continue
+                        url, func = queues[host][0]
+                        delay = self.limiter.try_acquire(url) if self.limiter else 0
+                        if delay:
+                            next_token = delay if next_token is None else min(next_token, delay)
+                            continue
+                        queues[host].popleft()
+                        futures[executor.submit(func)] = (host, url, func)
+                        running[host] += 1
+                        submitted = True
+                        if not queues[host]:
+                            hosts.remove(host)
+                            break
+
+                if not futures:
+                    # 実行中の処理がなく、全てのホストがトークンの補充待ち
+                    time.sleep(next_token)
+                    continue
+                done, _ = wait(futures, timeout=next_token, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, url, func = futures.pop(future)
+                    running[host] -= 1
+                    error = future.exception()
+                    yield url, func, None if error else future.result(), error
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+def scrape_sites(adapters, start_year=2009, end_year=None, max_workers=DEFAULT_MAX_WORKERS,
+                 per_host=DEFAULT_PER_HOST, rate_limit=DEFAULT_RATE_PER_HOST):
+    """
+    複数サイトの報道資料を1つのスケジューラーで取得する
+    - adapters: SiteAdapter のリスト
+    - 戻り値: {サイトの名前: DataFrame（日付の新しい順）}
+    """
+    tasks = []
+    for adapter in adapters:
+        urls = adapter.month_urls(start_year, end_year)
+        print(f"{adapter.label}: {len(urls)}ページ")
+        for url_info in urls:
+            tasks.append((url_info['url'], _make_task(adapter, url_info)))
+
+    print(f"共通スケジューラー: 全体{max_workers}件 / ホストごと{per_host}件まで同時に取得")
+    results = {adapter.name: [] for adapter in adapters}
+    scheduler = HostScheduler(max_workers, per_host, rate_limit)
+    for i, (url, task, records, error) in enumerate(scheduler.run(tasks), 1):
+        print(f"[{i}/{len(tasks)}] {task.adapter.label} {task.url_info['period']}")
+        if error is not None:
+            print_fetch_error(error)
+            continue
+        results[task.adapter.name].append(records_to_dataframe(records))
+
+    frames = {}
+    for adapter in adapters:
+        months = [df for df in results[adapter.name] if not df.empty]
+        if months:
+            df = pd.concat(months, ignore_index=True)
+            df = df.sort_values('発表日', ascending=False, key=parse_dates, kind='stable').reset_index(drop=True)
+        else:
+            df = pd.DataFrame()
+        print(f"{adapter.label}: 成功 {len(months)}ページ / 総取得件数 {len(df)}件")
+        frames[adapter.name] = df
+    return frames
+
+def _make_task(adapter, url_info):
+    def task():
+        return adapter.parse_page(fetch_page(url_info['url']), url_info)
+    task.adapter = adapter
+    task.url_info = url_info
+    return task
+
+def positive_int(value):
+    """
+    1以上の整数（argparseの型）
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"1以上の整数を指定してください: {value}")
+    return number
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="複数サイトの報道資料一覧の取得（共通スケジューラー）")
+    parser.add_argument("--sites", default=",".join(SITE_ADAPTERS),
+                        help=f"取得するサイト（カンマ区切り: {', '.join(SITE_ADAPTERS)}）")
+    parser.add_argument("--start-year", type=int, default=2009)
+    parser.add_argument("--end-year", type=int, default=None)
+    parser.add_argument("--workers", type=positive_int, default=DEFAULT_MAX_WORKERS, help="全体の同時接続数")
+    parser.add_argument("--per-host", type=positive_int, default=DEFAULT_PER_HOST, help="ホストごとの同時接続数")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_PER_HOST,
+                        help="ホストごとの最大リクエスト数/秒")
+    parser.add_argument("--parser", choices=sorted(PARSER_BACKENDS), default=DEFAULT_PARSER,
+                        help="HTMLパーサー（総務省）")
+    args = parser.parse_args(argv)
+
+    adapters = []
+    for name in args.sites.split(","):
+        if name not in SITE_ADAPTERS:
+            parser.error(f"不明なサイト: {name}（{', '.join(SITE_ADAPTERS)}）")
+        adapter_class = SITE_ADAPTERS[name]
+        adapters.append(adapter_class(parser=args.parser) if adapter_class is SoumuAdapter else adapter_class())
+
+    print("=== 報道資料一括スクレイピング（複数サイト） ===")
+    frames = scrape_sites(adapters, args.start_year, args.end_year, max_workers=args.workers,
+                          per_host=args.per_host, rate_limit=args.rate_limit)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    for adapter in adapters:
+        df = frames[adapter.name]
+        if df.empty:
+            print(f"❌ {adapter.label}: データが取得できませんでした")
+            continue
+        filename = f"{adapter.name}_press_releases_all_{timestamp}.csv"
+        if save_to_csv(df, filename):
+            print(f"✅ {adapter.label}: {len(df)}件 → {filename}")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  スクレイピングが中断されました")
+        sys.exit(1)
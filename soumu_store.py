@@ -0,0 +1,195 @@
+"""
+報道資料のSQLiteストア
+- リンクURLをキーにした追加・更新（UPSERT）。内容が変わらない行は書き換えない
+- 発表日・部局のインデックス
+- 内容のFTS5全文検索インデックス（日本語向けにtrigramトークナイザー）
+"""
+
+import sqlite3
+
+import pandas as pd
+
+from soumu_dataset import stable_id
+from soumu_dates import parse_dates
+
+# データベースの保存先（既定）
+DEFAULT_DB_PATH = "soumu_press_releases.db"
+
+# 保存する列（日付は発表日から作るISO形式の日付）
+STORE_COLUMNS = ['id', '発表日', '日付', '内容', '部局', 'リンクURL', '対象期間']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS press_releases (
+    key TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    発表日 TEXT,
+    日付 TEXT,
+    内容 TEXT,
+    部局 TEXT,
+    リンクURL TEXT,
+    対象期間 TEXT,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_press_releases_date ON press_releases(日付);
+CREATE INDEX IF NOT EXISTS idx_press_releases_department ON press_releases(部局, 日付);
+"""
+
+# 外部コンテンツ型のFTS5テーブルと、本体テーブルとの同期用トリガー
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS press_releases_fts USING fts5(
+    内容, content='press_releases', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS press_releases_ai AFTER INSERT ON press_releases BEGIN
+    INSERT INTO press_releases_fts(rowid, 内容) VALUES (new.rowid, new.内容);
+END;
+CREATE TRIGGER IF NOT EXISTS press_releases_ad AFTER DELETE ON press_releases BEGIN
+    INSERT INTO press_releases_fts(press_releases_fts, rowid, 内容) VALUES ('delete', old.rowid, old.内容);
+END;
+CREATE TRIGGER IF NOT EXISTS press_releases_au AFTER UPDATE OF 内容 ON press_releases BEGIN
+    INSERT INTO press_releases_fts(press_releases_fts, rowid, 内容) VALUES ('delete', old.rowid, old.内容);
+    INSERT INTO press_releases_fts(rowid, 内容) VALUES (new.rowid, new.内容);
+END;
+"""
+
+# 内容が変わった行だけを更新する
+UPSERT_SQL = """
+INSERT INTO press_releases (key, id, 発表日, 日付, 内容, 部局, リンクURL, 対象期間)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET
+    id = excluded.id,
+    発表日 = excluded.発表日,
+    日付 = excluded.日付,
+    内容 = excluded.内容,
+    部局 = excluded.部局,
+    対象期間 = excluded.対象期間,
+    updated_at = CURRENT_TIMESTAMP
+WHERE excluded.発表日 IS NOT press_releases.発表日
+   OR excluded.内容 IS NOT press_releases.内容
+   OR excluded.部局 IS NOT press_releases.部局
+   OR excluded.対象期間 IS NOT press_releases.対象期間
+"""
+
+# trigramトークナイザーで索引を使える最小の文字数
+MIN_FTS_QUERY_LENGTH = 3
+
+def _row_key(record):
+    """
+    UPSERTのキー（リンクURL。リンクがない場合は発表日と内容から作る）
+    """
+    if record.get('リンクURL'):
+        return record['リンクURL']
+    return "nolink:" + stable_id(None, record.get('発表日'), record.get('内容'))
+
+class PressReleaseStore:
+    """
+    報道資料のSQLiteストア
+    - 逐次出力先（シンク）としても使える（write / close）
+    """
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # FTS5 / trigramに対応していないSQLiteでは、LIKE検索のみ
+            print("⚠️  このSQLiteはFTS5（trigram）に対応していないため、全文検索インデックスを作成しません")
+            self.has_fts = False
+
+    def upsert(self, records):
+        """
+        レコードを追加・更新する
+        - records: レコード（dict）のリストまたはDataFrame
+        - 戻り値: (追加件数, 更新件数)
+        """
+        if isinstance(records, pd.DataFrame):
+            records = records.to_dict('records')
+        if not records:
+            return 0, 0
+
+        dates = parse_dates(pd.Series([record.get('発表日') for record in records], dtype=object))
+        iso_dates = dates.dt.strftime('%Y-%m-%d')
+        rows = [
+            (
+                _row_key(record),
+                stable_id(record.get('リンクURL'), record.get('発表日'), record.get('内容')),
+                record.get('発表日'),
+                None if pd.isna(iso_date) else iso_date,
+                record.get('内容'),
+                record.get('部局'),
+                record.get('リンクURL'),
+                record.get('対象期間'),
+            )
+            for record, iso_date in zip(records, iso_dates)
+        ]
+
+        before_count = self.count()
+        with self.conn:
+            # rowcountは追加・更新した行数（内容が同じでスキップした行、トリガーによる更新は含まない）
+            changed = self.conn.executemany(UPSERT_SQL, rows).rowcount
+        inserted = self.count() - before_count
+        return inserted, changed - inserted
+
+    # 逐次出力先（シンク）として使う場合
+    def write(self, records):
+        self.upsert(records)
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM press_releases").fetchone()[0]
+
+    def search(self, keyword=None, start=None, end=None, department=None, limit=100):
+        """
+        報道資料を検索する（新しい順）
+        - keyword: 内容のキーワード（3文字以上は全文検索インデックスを使う）
+        - start / end: 発表日の範囲（'YYYY-MM-DD'、両端を含む）
+        - department: 部局
+        """
+        conditions = []
+        params = []
+        if keyword:
+            if self.has_fts and len(keyword) >= MIN_FTS_QUERY_LENGTH:
+                phrase = '"' + keyword.replace('"', '""') + '"'
+                conditions.append("p.rowid IN (SELECT rowid FROM press_releases_fts WHERE press_releases_fts MATCH ?)")
+                params.append(phrase)
+            else:
+                conditions.append("p.内容 LIKE ? ESCAPE '\\'")
+                escaped = keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                params.append(f"%{escaped}%")
+        conditions, params = self._range_conditions(conditions, params, start, end, department)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = (f"SELECT {', '.join('p.' + column for column in STORE_COLUMNS)} FROM press_releases p "
+               f"{where} ORDER BY p.日付 DESC LIMIT ?")
+        return pd.read_sql_query(sql, self.conn, params=params + [limit])
+
+    def department_counts(self, start=None, end=None):
+        """
+        部局別の件数（多い順）
+        """
+        conditions, params = self._range_conditions([], [], start, end, None)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = (f"SELECT p.部局 AS 部局, COUNT(*) AS 件数 FROM press_releases p {where} "
+               f"GROUP BY p.部局 ORDER BY 件数 DESC")
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def _range_conditions(self, conditions, params, start, end, department):
+        if start:
+            conditions.append("p.日付 >= ?")
+            params.append(str(start))
+        if end:
+            conditions.append("p.日付 <= ?")
+            params.append(str(end))
+        if department:
+            conditions.append("p.部局 = ?")
+            params.append(department)
+        return conditions, params
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
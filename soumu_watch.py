@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+総務省報道資料の監視モード（当月の一覧ページを定期的に確認し、新着だけを追記する）
+- 1回の確認は当月の一覧ページへの条件付きGET（ETag / Last-Modified）1回だけ。変更がなければ304で終わる
+- 保存済みのデータ（差分取得と同じ soumu_state のマニフェスト）と比べて、新しい報道資料だけを出力先に追記する
+- 月が変わったら前月の一覧ページを最後に1回確認してから、新しい月の監視に移る
+- 件数の集計（soumu_state/rollup.json.gz）も更新があった月の分だけ置き換える
+使用方法: python soumu_watch.py --csv soumu_press_releases_watch.csv --interval 300
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import date, datetime
+
+from soumu_http import fetch_page, PageNotFoundError
+from soumu_manifest import MonthManifest, DEFAULT_STATE_DIR
+from soumu_dataset import stable_ids
+from soumu_sinks import CsvSink
+from soumu_store import PressReleaseStore
+from soumu_rollup import Rollup, ROLLUP_FILENAME
+from soumu_scraper import (generate_date_urls, parse_press_releases, records_to_dataframe,
+                           print_fetch_error, PARSER_BACKENDS, DEFAULT_PARSER, BASE_URL)
+
+# 確認の間隔（秒）
+DEFAULT_WATCH_INTERVAL = 300
+
+def month_url_info(year, month, base_url=BASE_URL):
+    """
+    指定した月のURL情報（generate_date_urls と同じ形式）
+    """
+    return next(url_info for url_info in generate_date_urls(year, year, base_url) if url_info['month'] == month)
+
+def poll_month(url_info, manifest, sinks, parser=DEFAULT_PARSER, rollup_path=None):
+    """
+    1ヶ月分の一覧ページを条件付きGETで確認し、新しい報道資料を出力先に追記する
+    - rollup_path: 件数の集計の保存先（Noneなら更新しない）
+    - 戻り値: 新着の件数（変更なし・取得失敗の場合は0）
+    """
+    try:
+        page = fetch_page(url_info['url'], validators=manifest.validators(url_info))
+    except PageNotFoundError:
+        # 月初めで一覧ページがまだ公開されていない場合など
+        print(f"[{datetime.now():%H:%M:%S}] {url_info['period']}: 一覧ページがまだありません")
+        return 0
+    if page.not_modified:
+        print(f"[{datetime.now():%H:%M:%S}] {url_info['period']}: 変更なし")
+        return 0
+
+    df = records_to_dataframe(parse_press_releases(page.content, url_info['url'], url_info, parser=parser,
+                                                   header_encoding=page.encoding))
+    if df.empty:
+        return 0
+
+    stored = manifest.load_month(url_info)
+    stored_ids = set(stable_ids(stored)) if not stored.empty else set()
+    new_rows = df[[record not in stored_ids for record in stable_ids(df)]]
+    if not new_rows.empty:
+        records = new_rows.to_dict('records')
+        for sink in sinks:
+            sink.write(records)
+
+    # 追記してから保存済みのデータを更新する（中断時は次回もう一度追記の対象になる）
+    validators = {'etag': page.headers.get('ETag'), 'last_modified': page.headers.get('Last-Modified')}
+    manifest.record(url_info, df, validators=validators)
+    if rollup_path:
+        Rollup.load(rollup_path).update(df).save(rollup_path)
+    print(f"[{datetime.now():%H:%M:%S}] {url_info['period']}: 新着 {len(new_rows)}件（全{len(df)}件）")
+    for record in new_rows.to_dict('records'):
+        print(f"  🆕 {record['発表日']} {record['部局']}: {record['内容']}")
+    return len(new_rows)
+
+def watch(sinks, interval=DEFAULT_WATCH_INTERVAL, state_dir=DEFAULT_STATE_DIR, parser=DEFAULT_PARSER,
+          base_url=BASE_URL, max_polls=None, today=date.today):
+    """
+    当月の一覧ページを定期的に確認し、新しい報道資料を出力先に追記し続ける
+    - sinks: 出力先（write / close を持つもの。CsvSink(append=True)、PressReleaseStore など）
+    - interval: 確認の間隔（秒）
+    - state_dir: 保存済みデータ（差分取得と共通のマニフェスト）
+    - max_polls: 確認の回数の上限（Noneで無制限）
+    - 戻り値: 新着の合計件数
+    """
+    manifest = MonthManifest(state_dir)
+    rollup_path = os.path.join(state_dir, ROLLUP_FILENAME)
+    current = None
+    total = 0
+    polls = 0
+    while max_polls is None or polls < max_polls:
+        now = today()
+        month = (now.year, now.month)
+        if current is None:
+            # 前回の監視中に月が変わっていた場合に備えて、前月も確認済みなら1回だけ確認する
+            previous = (now.year, now.month - 1) if now.month > 1 else (now.year - 1, 12)
+            if manifest.validators(month_url_info(*previous, base_url)):
+                total += _poll_safely(month_url_info(*previous, base_url), manifest, sinks, parser, rollup_path)
+        elif month != current:
+            # 月が変わった場合、前月の最後の更新を取りこぼさないようにもう一度確認する
+            print(f"\n📅 {now.year}年{now.month}月の監視に移ります")
+            total += _poll_safely(month_url_info(*current, base_url), manifest, sinks, parser, rollup_path)
+        current = month
+        total += _poll_safely(month_url_info(*current, base_url), manifest, sinks, parser, rollup_path)
+        polls += 1
+        if max_polls is None or polls < max_polls:
+            time.sleep(interval)
+    return total
+
+def _poll_safely(url_info, manifest, sinks, parser, rollup_path):
+    try:
+        return poll_month(url_info, manifest, sinks, parser, rollup_path)
+    except Exception as e:
+        # 一時的なエラーでは監視を止めない
+        print_fetch_error(e)
+        return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="総務省報道資料の監視モード（新着だけを追記）")
+    parser.add_argument("--interval", type=float, default=DEFAULT_WATCH_INTERVAL, help="確認の間隔（秒）")
+    parser.add_argument("--csv", metavar="PATH", help="新着をCSV（UTF-8 BOM）に追記する")
+    parser.add_argument("--sqlite", metavar="PATH", help="新着をSQLiteデータベースに追加する")
+    parser.add_argument("--state-dir", default=DEFAULT_STATE_DIR,
+                        help="保存済みデータ（差分取得と共通のマニフェスト）の保存先")
+    parser.add_argument("--parser", choices=sorted(PARSER_BACKENDS), default=DEFAULT_PARSER, help="HTMLパーサー")
+    parser.add_argument("--base-url", default=BASE_URL, help="一覧ページのURLの先頭")
+    args = parser.parse_args(argv)
+
+    print("=== 総務省報道資料 監視モード ===")
+    print(f"確認の間隔: {args.interval:.0f}秒（Ctrl+Cで終了）")
+    sinks = []
+    try:
+        if args.csv:
+            sinks.append(CsvSink(args.csv, append=True))
+        if args.sqlite:
+            sinks.append(PressReleaseStore(args.sqlite))
+        for sink in sinks:
+            print(f"📁 出力先: {sink.path}")
+        watch(sinks, args.interval, args.state_dir, args.parser, args.base_url)
+    finally:
+        for sink in sinks:
+            sink.close()
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  監視を終了しました")
+        sys.exit(0)
@@ -0,0 +1,171 @@
+"""
+添付ファイルのダウンロード（soumu_attachments）の再開・リトライの確認
+使用方法: python -m pytest -q test_soumu_attachments.py
+"""
+
+import os
+import json
+import hashlib
+
+import pytest
+import requests
+
+import soumu_attachments
+from soumu_attachments import AttachmentStore, download_attachment
+from soumu_http import RetryPolicy
+
+URL = 'https://www.soumu.go.jp/main_content/000000001.pdf'
+
+class FakeResponse:
+    def __init__(self, status_code, body=b'', headers=None, fail_after=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+        self.fail_after = fail_after
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+    def iter_content(self, chunk_size=1):
+        if self.fail_after is not None:
+            yield self.body[:self.fail_after]
+            raise requests.exceptions.ChunkedEncodingError("接続が切れました")
+        yield self.body
+
+class FakeSession:
+    """
+    決められた順にレスポンスを返し、送られたヘッダーを記録する
+    """
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, stream=False, timeout=None):
+        self.requests.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waits = []
+    monkeypatch.setattr(soumu_attachments.time, 'sleep', waits.append)
+    return waits
+
+def stored_bytes(store, digest):
+    with open(store.object_path(digest), 'rb') as f:
+        return f.read()
+
+def test_retries_server_errors_with_backoff(tmp_path, sleeps):
+    store = AttachmentStore(str(tmp_path))
+    session = FakeSession([FakeResponse(503), FakeResponse(502), FakeResponse(200, b'%PDF-1.4 body')])
+    digest, size, created = download_attachment(URL, store, session=session,
+                                                retry=RetryPolicy(max_retries=3, backoff=0.5))
+    assert stored_bytes(store, digest) == b'%PDF-1.4 body'
+    assert size == len(b'%PDF-1.4 body') and created
+    assert len(sleeps) == 2 and all(wait > 0 for wait in sleeps)
+
+def test_gives_up_after_max_retries(tmp_path, sleeps):
+    store = AttachmentStore(str(tmp_path))
+    session = FakeSession([FakeResponse(503)] * 3)
+    with pytest.raises(requests.HTTPError):
+        download_attachment(URL, store, session=session, retry=RetryPolicy(max_retries=2, backoff=0.01))
+    assert len(session.requests) == 3
+
+def test_client_errors_are_not_retried(tmp_path, sleeps):
+    store = AttachmentStore(str(tmp_path))
+    session = FakeSession([FakeResponse(404)])
+    with pytest.raises(requests.HTTPError):
+        download_attachment(URL, store, session=session)
+    assert sleeps == []
+
+def test_resumes_with_if_range(tmp_path, sleeps):
+    store = AttachmentStore(str(tmp_path))
+    body = b'0123456789' * 10
+    session = FakeSession([
+        FakeResponse(200, body, {'ETag': '"v1"'}, fail_after=30),
+        FakeResponse(206, body[30:], {'ETag': '"v1"', 'Content-Range': 'bytes 30-99/100'}),
+    ])
+    digest, size, _ = download_attachment(URL, store, session=session, retry=RetryPolicy(backoff=0.01))
+    assert session.requests[1] == {'Range': 'bytes=30-', 'If-Range': '"v1"'}
+    assert stored_bytes(store, digest) == body
+    assert digest == hashlib.sha256(body).hexdigest()
+    assert not os.path.exists(store.partial_path(URL))
+
+def test_resumes_with_last_modified(tmp_path, sleeps):
+    store = AttachmentStore(str(tmp_path))
+    body = b'abcdefghij' * 5
+    last_modified = 'Tue, 07 Jan 2025 01:00:00 GMT'
+    session = FakeSession([
+        FakeResponse(200, body, {'Last-Modified': last_modified}, fail_after=20),
+        FakeResponse(206, body[20:], {'Last-Modified': last_modified, 'Content-Range': 'bytes 20-49/50'}),
+    ])
+    digest, _, _ = download_attachment(URL, store, session=session, retry=RetryPolicy(backoff=0.01))
+    assert session.requests[1] == {'Range': 'bytes=20-', 'If-Range': last_modified}
+    assert stored_bytes(store, digest) == body
+
+def test_restarts_without_validator(tmp_path, sleeps):
+    store = AttachmentStore(str(tmp_path))
+    old, new = b'old content, partially saved', b'new content from the server'
+    session = FakeSession([
+        FakeResponse(200, old, fail_after=10),
+        FakeResponse(200, new),
+    ])
+    digest, _, _ = download_attachment(URL, store, session=session, retry=RetryPolicy(backoff=0.01))
+    # Rangeを送らずに最初から取得し直す（古い内容の途中に新しい内容をつながない）
+    assert session.requests[1] == {}
+    assert stored_bytes(store, digest) == new
+
+def test_discards_partial_left_without_metadata(tmp_path, sleeps):
+    store = AttachmentStore(str(tmp_path))
+    part_path = store.partial_path(URL)
+    with open(part_path, 'wb') as f:
+        f.write(b'stale')
+    with open(part_path + '.json', 'w', encoding='utf-8') as f:
+        json.dump({'url': URL, 'etag': None}, f)
+    session = FakeSession([FakeResponse(200, b'fresh')])
+    digest, _, _ = download_attachment(URL, store, session=session)
+    assert session.requests == [{}]
+    assert stored_bytes(store, digest) == b'fresh'
+
+def test_restarts_when_content_range_does_not_continue(tmp_path, sleeps):
+    store = AttachmentStore(str(tmp_path))
+    body = b'0123456789' * 10
+    session = FakeSession([
+        FakeResponse(200, body, {'ETag': '"v1"'}, fail_after=30),
+        # 保存済みの30バイトではなく、20バイト目からの部分が返る
+        FakeResponse(206, body[20:], {'ETag': '"v1"', 'Content-Range': 'bytes 20-99/100'}),
+        FakeResponse(200, body, {'ETag': '"v1"'}),
+    ])
+    digest, size, _ = download_attachment(URL, store, session=session, retry=RetryPolicy(backoff=0.01))
+    assert session.requests[2] == {}
+    assert stored_bytes(store, digest) == body and size == len(body)
+
+def test_range_not_satisfiable_keeps_complete_partial(tmp_path, sleeps):
+    store = AttachmentStore(str(tmp_path))
+    body = b'complete body'
+    session = FakeSession([
+        FakeResponse(200, body, {'ETag': '"v1"'}, fail_after=len(body)),
+        FakeResponse(416, headers={'Content-Range': f'bytes */{len(body)}'}),
+    ])
+    digest, _, _ = download_attachment(URL, store, session=session, retry=RetryPolicy(backoff=0.01))
+    assert len(session.requests) == 2
+    assert stored_bytes(store, digest) == body
+
+def test_range_not_satisfiable_with_other_size_restarts(tmp_path, sleeps):
+    store = AttachmentStore(str(tmp_path))
+    old, new = b'old content, partially saved', b'short'
+    session = FakeSession([
+        FakeResponse(200, old, {'ETag': '"v1"'}, fail_after=10),
+        # サーバー側のファイルが保存済みの部分より短くなった
+        FakeResponse(416, headers={'Content-Range': f'bytes */{len(new)}'}),
+        FakeResponse(200, new, {'ETag': '"v2"'}),
+    ])
+    digest, _, _ = download_attachment(URL, store, session=session, retry=RetryPolicy(backoff=0.01))
+    assert session.requests[2] == {}
+    assert stored_bytes(store, digest) == new
@@ -0,0 +1,108 @@
+"""
+詳細ページの取得（soumu_crawler）の確認
+使用方法: python -m pytest -q test_soumu_crawler.py
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import soumu_crawler
+from soumu_crawler import extract_detail, DetailLog, crawl_details
+
+pytest.importorskip('lxml')
+
+URL = 'https://www.soumu.go.jp/menu_news/s-news/01kiban01_02000001.html'
+
+# 古い詳細ページに多い、XML宣言のあるXHTML（Shift_JIS）
+XHTML = '''<?xml version="1.0" encoding="Shift_JIS"?>
+<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
+<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="ja" lang="ja">
+<head><meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS" /><title>電波法施行規則の一部改正</title></head>
+<body>
+<div id="header"><p>総務省</p></div>
+<div id="contentsWrapper">
+<h1>電波法施行規則の一部改正</h1>
+<p>総務省は、電波法施行規則の一部を改正する省令案について意見を募集します。</p>
+<script>var x = 1;</script>
+<ul>
+<li><a href="../main_content/000000001.pdf">別紙1（PDF）</a></li>
+<li><a href="/main_content/000000002.xlsx">別紙2（Excel）</a></li>
+<li><a href="01kiban01_02000002.html">関連報道資料</a></li>
+</ul>
+</div>
+</body>
+</html>
+'''
+
+def test_extract_detail_xhtml_shift_jis_bytes():
+    detail = extract_detail(XHTML.encode('shift_jis'), URL, 'ISO-8859-1')
+    assert detail['タイトル'] == '電波法施行規則の一部改正'
+    assert detail['本文'].splitlines() == [
+        '電波法施行規則の一部改正',
+        '総務省は、電波法施行規則の一部を改正する省令案について意見を募集します。',
+        '別紙1（PDF）',
+        '別紙2（Excel）',
+        '関連報道資料',
+    ]
+    assert detail['添付ファイル'] == [
+        {'名前': '別紙1（PDF）', 'URL': 'https://www.soumu.go.jp/menu_news/main_content/000000001.pdf'},
+        {'名前': '別紙2（Excel）', 'URL': 'https://www.soumu.go.jp/main_content/000000002.xlsx'},
+    ]
+
+def test_extract_detail_xhtml_string_and_utf8_bytes():
+    expected = extract_detail(XHTML.encode('shift_jis'), URL, 'ISO-8859-1')
+    assert extract_detail(XHTML, URL) == expected
+    assert extract_detail(XHTML.encode('utf-8'), URL, 'utf-8') == expected
+
+def test_detail_log_validators(tmp_path):
+    path = tmp_path / 'details.jsonl'
+    entries = [
+        {'URL': 'a', 'ETag': '"abc"', '最終更新日': None},
+        {'URL': 'b', 'ETag': None, '最終更新日': 'Tue, 07 Jan 2025 01:00:00 GMT'},
+        {'URL': 'c', 'ETag': None, '最終更新日': None},
+    ]
+    path.write_text(''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries), encoding='utf-8')
+    log = DetailLog(str(path))
+    try:
+        assert log.validators('a') == {'etag': '"abc"', 'last_modified': None}
+        assert log.validators('b') == {'etag': None, 'last_modified': 'Tue, 07 Jan 2025 01:00:00 GMT'}
+        assert log.validators('c') is None
+        assert log.validators('missing') is None
+    finally:
+        log.close()
+
+class FakePage:
+    not_modified = False
+    encoding = 'utf-8'
+    headers = {}
+
+    def __init__(self, url):
+        self.content = f'<html><head><title>{url}</title></head><body><p>本文</p></body></html>'.encode('utf-8')
+
+def test_crawl_details_limits_pending_pages(tmp_path, monkeypatch):
+    in_flight = []
+
+    class CountingExecutor(ThreadPoolExecutor):
+        futures = []
+
+        def submit(self, fn, *args):
+            future = super().submit(fn, *args)
+            self.futures.append(future)
+            in_flight.append(sum(not f.done() for f in self.futures))
+            return future
+
+    def fake_fetch_page(url, **kwargs):
+        time.sleep(0.001)
+        return FakePage(url)
+
+    monkeypatch.setattr(soumu_crawler, 'ThreadPoolExecutor', CountingExecutor)
+    monkeypatch.setattr(soumu_crawler, 'fetch_page', fake_fetch_page)
+    urls = [f'https://www.soumu.go.jp/menu_news/s-news/{i}.html' for i in range(50)]
+    stats = crawl_details(urls, output=str(tmp_path / 'details.jsonl'), workers=2, rate_limit=1000,
+                          not_found_path=None)
+    assert stats['取得'] == 50
+    assert max(in_flight) <= 4
+    assert len((tmp_path / 'details.jsonl').read_text(encoding='utf-8').splitlines()) == 50
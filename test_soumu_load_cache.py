@@ -0,0 +1,39 @@
+"""
+分析アプリの読み込みキャッシュ（soumu_load_cache）のメモリ使用量の上限の確認
+使用方法: python -m pytest -q test_soumu_load_cache.py
+"""
+
+from soumu_load_cache import LoadCache
+
+HEADER = '発表日,内容,部局,リンクURL,対象期間\n'
+
+def make_csv(prefix, rows=200):
+    lines = [f'2025年1月{i % 28 + 1}日,{prefix}の報道資料その{i},総合通信基盤局,https://example.jp/{prefix}/{i}.html,2025年1月\n'
+             for i in range(rows)]
+    return (HEADER + ''.join(lines)).encode('utf-8')
+
+def test_memory_bytes_counts_indexes_and_exports():
+    corpus = LoadCache().load(make_csv('電波法'))
+    frame_bytes = corpus.memory_bytes
+    assert frame_bytes == corpus.frame_bytes
+
+    corpus.search_index()
+    with_index = corpus.memory_bytes
+    assert with_index > frame_bytes
+
+    data, _ = corpus.export('utf8', '電波法')
+    assert corpus.memory_bytes >= with_index + len(data)
+
+def test_lazy_index_build_evicts_older_files():
+    first, second = make_csv('電波法'), make_csv('放送法')
+    probe = LoadCache()
+    frame_bytes = probe.load(first).memory_bytes + probe.load(second).memory_bytes
+
+    # 2ファイルのDataFrameは上限内だが、インデックスを作ると上限を超える
+    cache = LoadCache(max_bytes=frame_bytes + 1024)
+    cache.load(first)
+    corpus = cache.load(second)
+    assert len(cache.entries) == 2
+
+    corpus.search_index()
+    assert list(cache.entries) == [corpus.content_hash]
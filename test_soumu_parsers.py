@@ -0,0 +1,84 @@
+"""
+HTMLパーサー（bs4 / lxml）が同じレコードを返すことの確認
+使用方法: python -m pytest -q test_soumu_parsers.py
+"""
+
+import pytest
+
+from soumu_scraper import PARSER_BACKENDS, parse_press_releases, _first_table_is_well_formed
+
+pytest.importorskip('lxml')
+
+HEADER = '<tr><th>発表日</th><th>内容</th><th>部局</th></tr>'
+
+# 古い一覧ページに多い、終了タグを省略したテーブルなど
+MALFORMED = {
+    'td_without_end_tag': '<table><tr><th>発表日<th>内容<th>部局</tr>'
+                          '<tr><td>令和7年1月6日<td><a href="/a.html">件名A</a><td>総合通信基盤局</tr>'
+                          '<tr><td>令和7年1月7日<td>件名B<td>情報流通行政局</tr></table>',
+    'tr_without_end_tag': '<table>' + HEADER + '<tr><td>1月6日</td><td><a href="a.html">件名A</a></td><td>局A</td>'
+                          '<tr><td>1月7日</td><td>件名B</td><td>局B</td></table>',
+    'all_end_tags_omitted': '<table><tr><th>h<tr><td>d1<td><a href=x.html>c1</a><td>p1<tr><td>d2<td>c2<td>p2</table>'
+                            '<table><tr><td>次の表</table>',
+    'paragraph_in_cell': '<table>' + HEADER + '<tr><td><p>d1<td><p>c1<br>補足<td><p>p1</tr></table>',
+    'table_not_closed': '<table>' + HEADER + '<tr><td>d1<td>c1<td>p1',
+    'self_closing_cell': '<table>' + HEADER + '<tr><td/><td>c1</td><td>p1</td><td>x</td></tr></table>',
+    'stray_end_tag': '<table>' + HEADER + '<tr><td>d1</td></td><td>c1</td><td>p1</td></tr></table>',
+}
+
+WELL_FORMED = {
+    'simple': '<html><body><table>' + HEADER + '<tr><td>2025年1月6日</td><td><a href="/a.html">件名A</a></td>'
+              '<td>局A</td></tr><tr><td>2025年1月7日</td><td>件名B</td><td>局B</td></tr></table></body></html>',
+    'tbody_and_comment': '<table><thead>' + HEADER + '</thead><tbody><tr><td>d1<!-- <td>x</td> --></td>'
+                         '<td>c&amp;1&nbsp;</td><td> p1 </td></tr></tbody></table>',
+    'nested_table': '<table>' + HEADER + '<tr><td>d1</td><td><table><tr><td>x</td></tr></table>c</td>'
+                    '<td>p</td></tr></table>',
+    'script_before_table': '<script>var s = "<table><tr><td>";</script><table>' + HEADER +
+                           '<tr><td>d1</td><td>c1</td><td>p1</td></tr></table>',
+    'no_table': '<html><body><p>ページがありません</p></body></html>',
+}
+
+def parse(html, parser, header_encoding=None):
+    return parse_press_releases(html, 'https://www.soumu.go.jp/menu_news/s-news/2501m.html',
+                                {'period': '2025年1月'}, parser=parser, header_encoding=header_encoding)
+
+@pytest.mark.parametrize('name', sorted(MALFORMED))
+def test_malformed_markup_parity(name):
+    html = MALFORMED[name]
+    assert not _first_table_is_well_formed(html.encode('utf-8'))
+    assert parse(html, 'lxml') == parse(html, 'bs4')
+
+@pytest.mark.parametrize('name', sorted(WELL_FORMED))
+def test_well_formed_markup_parity(name):
+    html = WELL_FORMED[name]
+    assert _first_table_is_well_formed(html.encode('utf-8'))
+    assert parse(html, 'lxml') == parse(html, 'bs4')
+
+@pytest.mark.parametrize('html', sorted(MALFORMED.values()) + sorted(WELL_FORMED.values()))
+@pytest.mark.parametrize('encoding,header_encoding', [('shift_jis', 'ISO-8859-1'), ('utf-8', 'utf-8')])
+def test_bytes_parity(html, encoding, header_encoding):
+    content = html.encode(encoding)
+    expected = parse(content.decode(encoding), 'bs4')
+    assert parse(content, 'bs4', header_encoding) == expected
+    assert parse(content, 'lxml', header_encoding) == expected
+
+def test_shift_jis_bytes_parity():
+    # XML宣言・metaタグ、\ と ~、Shift_JISにない文字（NEC特殊文字）、不正なバイトを含むページ
+    content = ('<?xml version="1.0" encoding="Shift_JIS"?>\n<html><head>'
+               '<meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS"></head><body><table>'
+               + HEADER + '<tr><td>2025年1月6日</td><td><a href="/~soumu/a.html">C:\\data ~ 件名</a></td>'
+               '<td>局A</td></tr><tr><td>2025年1月7日</td><td>').encode('shift_jis')
+    content += '①'.encode('cp932') + b'\xff\x80' + '件名B</td><td>局B</td></tr></table></body></html>'.encode('shift_jis')
+    expected = parse(content, 'bs4', 'ISO-8859-1')
+    assert len(expected) == 2
+    assert expected[0]['内容'] == 'C:\\data ~ 件名'
+    assert expected[0]['リンクURL'] == 'https://www.soumu.go.jp/~soumu/a.html'
+    assert parse(content, 'lxml', 'ISO-8859-1') == expected
+
+def test_invalid_utf8_bytes_parity():
+    content = ('<table>' + HEADER + '<tr><td>d1</td><td>件名').encode('utf-8')
+    content += b'\xe3\x81\x00' + '</td><td>局A</td></tr></table>'.encode('utf-8')
+    assert parse(content, 'lxml', 'utf-8') == parse(content, 'bs4', 'utf-8')
+
+def test_backends_registered():
+    assert set(PARSER_BACKENDS) == {'bs4', 'lxml'}
@@ -0,0 +1,50 @@
+"""
+類似の報道資料の検索（soumu_similar）の保存・差分更新の確認
+使用方法: python -m pytest -q test_soumu_similar.py
+"""
+
+import numpy as np
+
+from soumu_similar import SimilarityIndex, update_similarity_index
+from soumu_load_cache import LoadCache
+
+def test_large_counts_survive_save(tmp_path):
+    path = str(tmp_path / 'index.npz')
+    index, _ = SimilarityIndex.build(['あ' * 70000, '電波法'])
+    index.save(path)
+    loaded = SimilarityIndex.load(path)
+    assert loaded.counts.max() == 69999
+    np.testing.assert_array_equal(loaded.counts, index.counts)
+
+def test_update_drops_terms_of_removed_rows(tmp_path):
+    path = str(tmp_path / 'index.npz')
+    update_similarity_index(['電波法の改正について', '統計調査の結果'], path)
+    texts = ['電波法の改正について', '情報通信白書の公表']
+    updated, counted = update_similarity_index(texts, path)
+    assert counted == 1
+
+    loaded = SimilarityIndex.load(path)
+    fresh, _ = SimilarityIndex.build(texts)
+    assert sorted(loaded.vocabulary) == sorted(fresh.vocabulary)
+    assert '統計' not in loaded.columns
+    assert loaded.most_similar(text='電波法の公表') == fresh.most_similar(text='電波法の公表')
+
+def test_app_index_reuses_saved_scraper_index(tmp_path):
+    # 別の内容も含む、スクレイパーの保存済みインデックス
+    path = str(tmp_path / 'state' / 'similar_index.npz')
+    update_similarity_index(['無関係な報道資料', '電波法の改正について'], path)
+
+    csv = ('発表日,内容,部局,リンクURL,対象期間\n'
+           '2025年1月6日,電波法の改正について,総合通信基盤局,https://example.jp/a.html,2025年1月\n'
+           '2025年1月7日,放送法の改正について,情報流通行政局,https://example.jp/b.html,2025年1月\n'
+           '2025年1月8日,電波法の公表について,総合通信基盤局,https://example.jp/c.html,2025年1月\n').encode('utf-8')
+    texts = ['電波法の改正について', '放送法の改正について', '電波法の公表について']
+    index = LoadCache().load(csv).similar_index(path)
+    fresh, _ = SimilarityIndex.build(texts)
+    _, counted = SimilarityIndex.build(texts, previous=SimilarityIndex.load(path))
+    assert counted == 2
+    # 保存済みのn-gramが残っていても、類似度はアップロードされた行だけから計算する
+    assert '無関' in index.columns
+    for position in range(len(texts)):
+        assert index.most_similar(position) == fresh.most_similar(position)
+    np.testing.assert_allclose(index.norms, fresh.norms)
@@ -0,0 +1,72 @@
+"""
+複数サイトの取得（soumu_sites）のアダプターとスケジューラーの確認
+使用方法: python -m pytest -q test_soumu_sites.py
+"""
+
+import time
+
+import pytest
+
+from soumu_sites import SiteAdapter, SoumuAdapter, HostScheduler, main
+
+def test_adapter_without_parse_fails_at_construction():
+    class NoParse(SiteAdapter):
+        name = "no_parse"
+
+        def month_urls(self, start_year, end_year=None):
+            return []
+
+    with pytest.raises(TypeError):
+        NoParse()
+    SoumuAdapter()
+
+@pytest.mark.parametrize('options', [{'max_workers': 0}, {'per_host': 0}, {'per_host': -1}])
+def test_scheduler_rejects_non_positive_limits(options):
+    with pytest.raises(ValueError):
+        HostScheduler(rate_limit=None, **options)
+
+@pytest.mark.parametrize('option', ['--workers', '--per-host'])
+def test_cli_rejects_non_positive_limits(option):
+    with pytest.raises(SystemExit):
+        main([option, '0'])
+
+def test_scheduler_runs_every_task():
+    tasks = [(f'http://{host}.example/{i}', lambda i=i: i) for host in 'abc' for i in range(5)]
+    scheduler = HostScheduler(max_workers=2, per_host=1, rate_limit=None)
+    results = sorted(result for _, _, result, error in scheduler.run(tasks) if error is None)
+    assert results == sorted(i for i in range(5) for _ in 'abc')
+
+def test_scheduler_respects_rate_limit():
+    # 各ホスト4件（20件/秒）: トークンは投入前に取得し、補充を待つ間も全件を実行する
+    tasks = [(f'http://{host}.example/{i}', lambda: time.monotonic()) for host in 'ab' for i in range(4)]
+    scheduler = HostScheduler(max_workers=1, per_host=1, rate_limit=20)
+    start = time.monotonic()
+    results = {}
+    for url, _, finished, error in scheduler.run(tasks):
+        assert error is None
+        results[url] = finished - start
+    assert len(results) == 8
+    for host in 'ab':
+        times = [results[f'http://{host}.example/{i}'] for i in range(4)]
+        assert times[-1] >= 0.14
+
+class FakePage:
+    encoding = 'ISO-8859-1'
+
+    def __init__(self, content):
+        self.content = content
+
+@pytest.mark.parametrize('parser', ['bs4', 'lxml'])
+def test_soumu_adapter_parses_page_bytes(parser, monkeypatch):
+    if parser == 'lxml':
+        pytest.importorskip('lxml')
+    html = ('<html><head><meta charset="Shift_JIS"></head><body><table><tr><th>発表日</th><th>内容</th><th>部局</th></tr>'
+            '<tr><td>2025年1月6日</td><td><a href="/a.html">件名</a></td><td>局A</td></tr></table></body></html>')
+    page = FakePage(html.encode('shift_jis'))
+    url_info = {'url': 'https://www.soumu.go.jp/menu_news/s-news/2501m.html', 'period': '2025年1月'}
+    adapter = SoumuAdapter(parser=parser)
+    if parser == 'lxml':
+        # lxmlでは文字列に変換せずにバイト列のまま解析する
+        monkeypatch.setattr(adapter, 'decode', None)
+    records = adapter.parse_page(page, url_info)
+    assert [record['内容'] for record in records] == ['件名']